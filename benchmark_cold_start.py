@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Cold-start benchmark: launches the app (or the headless core) repeatedly in
+fresh processes with the boot tracer enabled and reports medians per phase.
+
+    python benchmark_cold_start.py --runs 7
+    python benchmark_cold_start.py --target core --runs 15 --json results.json
+    python benchmark_cold_start.py --keep-traces traces/
+
+Each run gets an empty HOME unless --reuse-home is given, so stores start
+from scratch (PBKDF2, key generation, first JSON writes) as on a first launch.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Constructs every registered service without Kivy, then exits.
+CORE_SCRIPT = '''
+from src.utils.boot_trace import boot_tracer
+from src.services import (
+    app_state_store, contact_service, maximum_ai_manager, messaging_service,
+    obfuscation_monitor_service, preferences_store, typing_state_manager,
+)
+from src.services.registry import services
+for name in services.names():
+    services.get(name)
+boot_tracer.mark('services_started')
+'''
+
+
+def _phases(trace):
+    """Milliseconds per phase from one Chrome trace."""
+    events = trace['traceEvents']
+    spans = [e for e in events if e.get('ph') == 'X']
+    marks = {e['name']: e['ts'] / 1000.0 for e in events if e.get('ph') == 'i'}
+    phases = {}
+
+    # Imports nest, so each module is charged its self time (excluding the
+    # imports it triggered) and the total counts top-level imports only.
+    imports = sorted((e for e in spans if e['cat'] == 'import'), key=lambda e: (e['ts'], -e['dur']))
+    stack = []
+    total = 0.0
+    for e in imports:
+        while stack and e['ts'] >= stack[-1][0]['ts'] + stack[-1][0]['dur']:
+            stack.pop()
+        if stack:
+            stack[-1][1] -= e['dur']
+        else:
+            total += e['dur']
+        entry = [e, e['dur']]
+        stack.append(entry)
+        phases.setdefault(e['name'], entry)
+    for name, value in list(phases.items()):
+        phases[name] = value[1] / 1000.0
+    phases['imports (total)'] = total / 1000.0
+
+    for e in spans:
+        if e['cat'] in ('service', 'screen', 'boot'):
+            phases[e['name']] = phases.get(e['name'], 0.0) + e['dur'] / 1000.0
+    for name, ts in marks.items():
+        phases[f'@{name}'] = ts
+    return phases
+
+
+def _run_once(target, trace_path, home):
+    env = dict(os.environ)
+    env.update(
+        TOR_DASHBOARD_BOOT_TRACE=trace_path,
+        TOR_DASHBOARD_BOOT_EXIT='1',
+        HOME=home,
+        PYTHONPATH=REPO_ROOT,
+    )
+    if target == 'core':
+        env['TOR_DASHBOARD_HEADLESS'] = '1'
+        cmd = [sys.executable, '-c', CORE_SCRIPT]
+    else:
+        os.makedirs(os.path.join(home, '.config'), exist_ok=True)
+        cmd = [sys.executable, '-m', 'src.main']
+
+    started = time.perf_counter()
+    result = subprocess.run(cmd, cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=300)
+    wall = (time.perf_counter() - started) * 1000.0
+    if result.returncode != 0 or not os.path.exists(trace_path):
+        raise RuntimeError(f'run failed ({result.returncode}):\n{result.stderr[-2000:]}')
+    with open(trace_path, 'r', encoding='utf-8') as f:
+        phases = _phases(json.load(f))
+    phases['process wall'] = wall
+    return phases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', choices=('app', 'core'), default='app')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs to fill the OS file cache')
+    parser.add_argument('--reuse-home', action='store_true', help='keep one HOME across runs (warm data files)')
+    parser.add_argument('--keep-traces', metavar='DIR', help='copy each run\'s trace JSON here')
+    parser.add_argument('--top', type=int, default=25, help='phases to print, slowest first')
+    parser.add_argument('--json', metavar='PATH', help='write all samples and medians as JSON')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='cold_start_')
+    shared_home = os.path.join(workdir, 'home')
+    samples = []
+    try:
+        for i in range(args.warmup + args.runs):
+            home = shared_home if args.reuse_home else os.path.join(workdir, f'home_{i}')
+            trace_path = os.path.join(workdir, f'trace_{i}.json')
+            phases = _run_once(args.target, trace_path, home)
+            if i < args.warmup:
+                continue
+            samples.append(phases)
+            if args.keep_traces:
+                os.makedirs(args.keep_traces, exist_ok=True)
+                shutil.copy(trace_path, os.path.join(args.keep_traces, f'{args.target}_{i - args.warmup}.json'))
+            print(f"run {i - args.warmup + 1}/{args.runs}: {phases['process wall']:.0f} ms wall")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    names = sorted({name for s in samples for name in s})
+    medians = {name: statistics.median(s.get(name, 0.0) for s in samples) for name in names}
+
+    print(f'\nMedians over {len(samples)} {args.target} runs (ms):')
+    timeline = sorted((n for n in names if n.startswith('@')), key=medians.get)
+    for name in ['process wall'] + timeline:
+        print(f'  {name:<45} {medians[name]:>9.1f}')
+    print()
+    durations = sorted((n for n in names if n != 'process wall' and not n.startswith('@')), key=lambda n: -medians[n])
+    for name in durations[: args.top]:
+        print(f'  {name:<45} {medians[name]:>9.1f}')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'target': args.target, 'runs': samples, 'median': medians}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+from src.utils.boot_trace import install_from_env
+
+# Must run before any other src.* import so the boot trace sees them.
+install_from_env()
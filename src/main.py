@@ -19,6 +19,10 @@ from src.services.app_state_store import app_state_store
 from src.widgets.app_onboarding_wizard import AppOnboardingWizard
 from src.services.contact_service import contact_service
 from src.services.messaging_service import messaging_service
+from src.services.message_store import get_message_store
+from src.services.message_sync_service import get_message_sync_service
+from src.services.registry import services
+from src.utils.boot_trace import boot_tracer
 from src.widgets.shell import NavigationItem, ResponsiveShell
 
 class PlaceholderScreen(Screen):
@@ -29,77 +33,85 @@ class PlaceholderScreen(Screen):
 
 class MainApp(App):
     def build(self):
+        self._message_sync = None
+        with boot_tracer.span('build'):
+            return self._build_shell()
+
+    def _build_shell(self):
         self.shell = ResponsiveShell()
         
-        # Screens
-        dashboard = StatusDashboard()
-        contacts_screen = ContactsScreen()
-        
-        # Traffic Dashboard Screen
-        traffic_dashboard = TrafficDashboard()
-        
-        max_ai_panel = MaximumAIControlPanel()
-        
-        # Obfuscation Settings & Monitoring Screen
-        obfuscation_settings = ObfuscationSettingsScreen()
-        
-        # Messaging Screen
-        messaging = MessagingScreen()
-
-        # Settings Screen
-        settings_screen = SettingsScreen()
-
-        # Add Navigation Items
+        # Screens are built on first navigation; only the dashboard is
+        # needed for the first frame. Contacts and messages are the likely
+        # next stops, so the shell builds them in idle time.
         self.shell.add_nav_item(NavigationItem(
             name='dashboard',
             text='Dashboard',
-            screen=dashboard,
+            factory=StatusDashboard,
         ))
 
         self.shell.add_nav_item(NavigationItem(
             name='contacts',
             text='Contacts',
-            screen=contacts_screen,
+            factory=ContactsScreen,
+            prewarm=True,
         ))
 
         self.shell.add_nav_item(NavigationItem(
             name='maximum_ai',
             text='Maximum AI',
-            screen=max_ai_panel,
+            factory=MaximumAIControlPanel,
         ))
 
         self.shell.add_nav_item(NavigationItem(
-            name='traffic', 
-            text='Traffic', 
-            screen=traffic_dashboard
+            name='traffic',
+            text='Traffic',
+            factory=TrafficDashboard,
         ))
-        
+
         self.shell.add_nav_item(NavigationItem(
             name='obfuscation',
             text='Obfuscation',
-            screen=obfuscation_settings
+            factory=ObfuscationSettingsScreen,
         ))
-        
+
         self.shell.add_nav_item(NavigationItem(
             name='messages',
             text='Messages',
-            screen=messaging
+            factory=MessagingScreen,
+            prewarm=True,
         ))
-        
+
         self.shell.add_nav_item(NavigationItem(
             name='settings',
             text='Settings',
-            screen=settings_screen,
+            factory=SettingsScreen,
         ))
-        
+
         return self.shell
 
     def on_start(self):
-        tor_manager.start_service()
-        maximum_ai_manager.start_service()
-        smart_agent.activate()
-        obfuscation_monitor_service.start_service()
-        messaging_service.start_service()
+        boot_tracer.mark('on_start')
+        # Services start once the first frame has been drawn (the first tick
+        # runs before the first draw); whatever is still unconstructed is
+        # then built one service per frame.
+        Clock.schedule_once(lambda dt: Clock.schedule_once(self._start_services, 0), 0)
+
+    def _start_services(self, dt):
+        boot_tracer.mark('first_frame')
+        with boot_tracer.span('start_services'):
+            tor_manager.start_service()
+            maximum_ai_manager.start_service()
+            smart_agent.activate()
+            obfuscation_monitor_service.start_service()
+            with boot_tracer.span('open_message_store'):
+                store = get_message_store()
+                self._message_sync = get_message_sync_service(store)
+                messaging_service.attach_store(store, self._message_sync)
+            messaging_service.start_service()
+        boot_tracer.mark('services_started')
+        if boot_tracer.exit_after_boot:
+            self.stop()
+            return
 
         if not app_state_store.is_onboarding_complete():
             def _open_onboarding(dt):
@@ -108,12 +120,23 @@ class MainApp(App):
 
             Clock.schedule_once(_open_onboarding, 0)
 
+        services.warm_up()
+
     def on_stop(self):
-        tor_manager.stop_service()
-        maximum_ai_manager.stop_service()
-        smart_agent.deactivate()
-        obfuscation_monitor_service.stop_service()
-        messaging_service.stop_service()
+        services.cancel_warm_up()
+        # Stopping must not construct a service that never started.
+        for name, stop in (
+            ('tor_manager', 'stop_service'),
+            ('maximum_ai_manager', 'stop_service'),
+            ('smart_agent', 'deactivate'),
+            ('obfuscation_monitor_service', 'stop_service'),
+            ('messaging_service', 'stop_service'),
+        ):
+            if services.is_constructed(name):
+                getattr(services.get(name), stop)()
+        if self._message_sync is not None:
+            self._message_sync.stop()
+            get_message_store().close()
 
 if __name__ == '__main__':
     MainApp().run()
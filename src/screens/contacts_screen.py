@@ -7,7 +7,6 @@ from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
 from kivy.uix.screenmanager import Screen
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.tabbedpanel import TabbedPanel, TabbedPanelItem
 from kivy.uix.popup import Popup
 from kivy.uix.image import Image
@@ -99,10 +98,8 @@ class ContactsScreen(Screen):
         root.add_widget(self.tabs)
 
         # Contact list
-        self.scroll = ScrollView(do_scroll_x=False)
         self.contact_list = ContactList(on_select=self._on_contact_selected)
-        self.scroll.add_widget(self.contact_list)
-        root.add_widget(self.scroll)
+        root.add_widget(self.contact_list)
 
         self.add_widget(root)
 
@@ -115,10 +112,17 @@ class ContactsScreen(Screen):
         event_bus.bind(on_contact_blocked=self._on_contact_blocked)
         event_bus.bind(on_contact_muted=self._on_contact_muted)
         event_bus.bind(on_contact_presence_updated=self._on_presence_updated)
+        event_bus.bind(on_contact_archived=self._on_contact_archived)
+        event_bus.bind(on_contact_request_created=self._on_contact_request)
+        event_bus.bind(on_contact_request_accepted=self._on_contact_request)
+        event_bus.bind(on_contact_request_declined=self._on_contact_request)
 
         Window.bind(size=lambda *_: self._update_cols())
         self._update_cols()
 
+        # Bulk changes (a backup restore) reload the view at most once a frame.
+        self._trigger_reload = Clock.create_trigger(lambda dt: self._load_contacts_for_current_view())
+
         Clock.schedule_once(lambda dt: self._refresh_contacts(), 0)
 
     def _update_cols(self):
@@ -133,21 +137,32 @@ class ContactsScreen(Screen):
         self._search_query = query
         self._load_contacts_for_current_view()
 
-    def _load_contacts_for_current_view(self):
+    def _view_sort(self):
+        return 'recent' if self.current_tab == 'recent' else 'alphabetical'
+
+    def _in_view(self, contact_id: str, contact: dict) -> bool:
+        """Whether a contact belongs in the current tab and search."""
         if self.current_tab == 'all':
-            if self._search_query:
-                contacts = contact_service.search_contacts(self._search_query)
-            else:
-                contacts = contact_service.get_sorted_contacts('alphabetical')
-        elif self.current_tab == 'favorites':
-            contacts = contact_service.get_favorites()
-            if self._search_query:
-                contacts = {cid: c for cid, c in contacts.items() if self._search_query.lower() in c.get('name', '').lower()}
+            if contact_service.is_archived(contact_id):
+                return False
+            return not self._search_query or contact_service.matches_query(contact, self._search_query)
+        if self.current_tab == 'favorites':
+            in_tab = contact_service.is_favorite(contact_id)
         elif self.current_tab == 'recent':
-            contacts = contact_service.get_sorted_contacts('recent')
-            if self._search_query:
-                contacts = {cid: c for cid, c in contacts.items() if self._search_query.lower() in c.get('name', '').lower()}
+            in_tab = not contact_service.is_archived(contact_id)
+        elif self.current_tab == 'blocked':
+            in_tab = contact_service.is_blocked(contact_id)
         elif self.current_tab == 'pending':
+            return any(
+                req.get('from_id') == contact_id
+                for req in contact_service.get_pending_requests().values()
+            )
+        else:
+            return False
+        return in_tab and (not self._search_query or self._search_query.lower() in contact.get('name', '').lower())
+
+    def _load_contacts_for_current_view(self):
+        if self.current_tab == 'pending':
             contacts = {}
             pending = contact_service.get_pending_requests()
             for req_id, req in pending.items():
@@ -156,14 +171,21 @@ class ContactsScreen(Screen):
                     contact = contact_service.get_contact(from_id)
                     if contact:
                         contacts[from_id] = contact
-        elif self.current_tab == 'blocked':
-            contacts = contact_service.get_blocked_contacts()
-            if self._search_query:
-                contacts = {cid: c for cid, c in contacts.items() if self._search_query.lower() in c.get('name', '').lower()}
         else:
-            contacts = {}
+            contacts = {
+                cid: c for cid, c in contact_service.get_all_contacts().items()
+                if self._in_view(cid, c)
+            }
 
-        self.contact_list.set_contacts(contacts)
+        self.contact_list.set_contacts(contacts, sort_by=self._view_sort())
+
+    def _apply_contact(self, contact_id: str):
+        """Move, add or drop the one row a contact change affects."""
+        contact = contact_service.get_contact(contact_id)
+        if contact is not None and self._in_view(contact_id, contact):
+            self.contact_list.upsert(contact_id, contact)
+        else:
+            self.contact_list.remove_contact(contact_id)
 
     def _set_view(self, tab_name, group=None):
         self.current_tab = tab_name
@@ -177,8 +199,7 @@ class ContactsScreen(Screen):
 
     @mainthread
     def _on_contact_added(self, instance, contact_id, contact):
-        if self.current_tab in ['all', 'alphabetical']:
-            self.contact_list.add_contact(contact_id, contact)
+        self._apply_contact(contact_id)
 
     @mainthread
     def _on_contact_deleted(self, instance, contact_id):
@@ -186,29 +207,38 @@ class ContactsScreen(Screen):
 
     @mainthread
     def _on_contact_updated(self, instance, contact_id, contact):
-        self.contact_list.update_contact(contact_id, contact)
+        self._apply_contact(contact_id)
 
     @mainthread
     def _on_contacts_updated(self, instance):
-        self._load_contacts_for_current_view()
+        # Rows that didn't change keep their data, so this is a cheap diff.
+        self._trigger_reload()
+
+    @mainthread
+    def _on_contact_request(self, instance, request_id):
+        # Requests only change which contacts the pending tab lists.
+        if self.current_tab == 'pending':
+            self._trigger_reload()
 
     @mainthread
     def _on_contact_favorited(self, instance, contact_id, is_favorite):
-        self._load_contacts_for_current_view()
+        self._apply_contact(contact_id)
 
     @mainthread
     def _on_contact_blocked(self, instance, contact_id, is_blocked):
-        self._load_contacts_for_current_view()
+        self._apply_contact(contact_id)
 
     @mainthread
     def _on_contact_muted(self, instance, contact_id, is_muted):
-        self._load_contacts_for_current_view()
+        self._apply_contact(contact_id)
+
+    @mainthread
+    def _on_contact_archived(self, instance, contact_id, is_archived):
+        self._apply_contact(contact_id)
 
     @mainthread
     def _on_presence_updated(self, instance, contact_id, status):
-        contact = contact_service.get_contact(contact_id)
-        if contact:
-            self.contact_list.update_contact(contact_id, contact)
+        self._apply_contact(contact_id)
 
     def _show_add_contact_menu(self):
         content = BoxLayout(orientation='vertical', padding=dp(16), spacing=dp(12))
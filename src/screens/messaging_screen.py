@@ -9,19 +9,20 @@ from kivy.uix.screenmanager import Screen
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.popup import Popup
 
+from src.services.history_pager import HistoryPager
 from src.services.messaging_service import messaging_service
+from src.services.typing_state_manager import typing_state_manager
 from src.theming.theme_manager import theme_manager
 from src.utils.event_bus import event_bus
 from src.widgets.chat_components import (
-    ChatBubble,
     TypingIndicator,
     PinnedMessageBanner,
     MessageActionMenu,
     MessageComposer,
     MessageSearchBar,
     ConversationListItem,
-    format_timestamp,
 )
+from src.widgets.message_feed import MessageFeed
 
 
 class MessagingScreen(Screen):
@@ -36,6 +37,13 @@ class MessagingScreen(Screen):
         self.search_active = False
         self.search_results = []
         self.current_search_index = 0
+        self._synced_dropped = 0
+        
+        # History is paged in as the feed scrolls; at most max_pages stay loaded
+        self.page_size = 50
+        self.max_pages = 4
+        self._pager = None
+        self._paging = set()
         
         # Main container
         self.root = BoxLayout(orientation='vertical')
@@ -53,6 +61,7 @@ class MessagingScreen(Screen):
             on_send=self._on_send_message,
             on_attach=self._on_attach,
             on_disappearing=self._on_disappearing_toggle,
+            on_typing=self._on_composer_typing,
         )
         self.root.add_widget(self.composer)
         
@@ -63,12 +72,15 @@ class MessagingScreen(Screen):
         self.current_layout = None
         self._update_layout()
         
-        # Event bus bindings
-        event_bus.bind(on_message_received=self._on_message_received)
-        event_bus.bind(on_typing_indicator=self._on_typing_indicator)
-        event_bus.bind(on_message_reacted=self._on_message_reacted)
-        event_bus.bind(on_message_pinned=self._on_message_pinned)
-        event_bus.bind(on_read_receipt=self._on_read_receipt)
+        # Event bus subscriptions follow the open conversation
+        self._conversation_handlers = {
+            'on_message_received': self._on_message_received,
+            'on_typing_indicator': self._on_typing_indicator,
+            'on_message_reacted': self._on_message_reacted,
+            'on_message_pinned': self._on_message_pinned,
+            'on_read_receipt': self._on_read_receipt,
+            'on_message_deleted': self._on_message_deleted,
+        }
         
         # Bootstrap
         Clock.schedule_once(lambda dt: self._bootstrap(), 0)
@@ -155,51 +167,74 @@ class MessagingScreen(Screen):
     
     def _create_message_feed(self):
         """Create the right-side message feed."""
-        container = BoxLayout(orientation='vertical')
+        container = self.feed_container = BoxLayout(orientation='vertical')
         
         # Pinned message banner (if applicable)
         self.pinned_banner = None
         
-        # Message scroll area
-        scroll = ScrollView(do_scroll_x=False)
-        self.message_list = GridLayout(cols=1, spacing=dp(8), padding=dp(12), size_hint_y=None)
-        self.message_list.bind(minimum_height=self.message_list.setter('height'))
-        
-        # Add messages
-        messages = messaging_service.get_conversation_messages(self.current_conversation_id)
-        for msg in messages:
-            bubble = self._create_chat_bubble(msg)
-            self.message_list.add_widget(bubble)
-        
-        # Check for pinned message and add banner
-        if messages:
-            for msg in messages:
-                if msg.get('is_pinned'):
-                    self.pinned_banner = PinnedMessageBanner(
-                        message_text=msg['text'],
-                        on_close=self._close_pinned_banner,
-                    )
-                    container.add_widget(self.pinned_banner)
-                    break
-        
-        scroll.add_widget(self.message_list)
-        container.add_widget(scroll)
+        # Virtualized message list; rows are recycled as they scroll
+        self.message_feed = MessageFeed(
+            action_handler=self._on_message_action,
+            edge_handler=self._on_feed_edge,
+            max_rows=self.page_size * self.max_pages,
+        )
+        if self._pager is not None:
+            self._pager.close()
+        self._pager = None
+        if self.current_conversation_id:
+            self._pager = HistoryPager(self.current_conversation_id, page_size=self.page_size)
+        self._reset_feed()
+        
+        container.add_widget(self.message_feed)
+        self._update_pinned_banner()
+        
+        # Typing indicators sit under the feed rather than inside it
+        self.typing_area = BoxLayout(orientation='vertical', size_hint_y=None, height=0)
+        self.typing_area.bind(minimum_height=self.typing_area.setter('height'))
+        container.add_widget(self.typing_area)
         
         return container
     
-    def _create_chat_bubble(self, msg_dict):
-        """Create a chat bubble widget from message data."""
-        return ChatBubble(
-            text=msg_dict['text'],
-            is_outgoing=msg_dict['is_outgoing'],
-            timestamp=format_timestamp(msg_dict['timestamp']),
-            delivery_state=msg_dict.get('delivery_state', 'sent'),
-            reactions=msg_dict.get('reactions', []),
-            is_pinned=msg_dict.get('is_pinned', False),
-            attachments=msg_dict.get('attachments', []),
-            on_menu=lambda action, bubble, mid=msg_dict['id']: self._on_message_action(action, mid),
-            size_hint_y=None,
-        )
+    def _reset_feed(self):
+        """Show the newest page (or the search hits) and prefetch the page before it."""
+        feed = self.message_feed
+        self._paging.clear()
+        self._synced_dropped = event_bus.threadsafe_dropped
+        if self.search_results:
+            hits = [messaging_service.get_message(self.current_conversation_id, r['message_id'])
+                    for r in self.search_results]
+            feed.sync(sorted((m for m in hits if m is not None), key=lambda m: (m['timestamp'], m['id'])))
+            feed.has_older = feed.has_newer = False
+            return
+        page = self._pager.latest() if self._pager is not None else []
+        feed.sync(page)
+        feed.has_older = self._pager is not None and self._pager.has_more(page)
+        feed.has_newer = False
+        if feed.has_older:
+            self._pager.prefetch('older', page[0]['id'])
+    
+    def _on_feed_edge(self, direction):
+        """Page in history when the viewport nears a loaded edge of the feed."""
+        if self._pager is None or self.search_results or direction in self._paging:
+            return
+        feed = self.message_feed
+        cursor = feed.first_id() if direction == 'older' else feed.last_id()
+        if cursor is None:
+            return
+        self._paging.add(direction)
+        pager = self._pager
+        pager.request(direction, cursor, lambda page: self._on_page(pager, direction, page))
+    
+    def _on_page(self, pager, direction, page):
+        if pager is not self._pager:
+            return
+        self._paging.discard(direction)
+        if page is None:
+            return
+        if direction == 'older':
+            self.message_feed.prepend(page, has_more=pager.has_more(page))
+        else:
+            self.message_feed.append_page(page, has_more=pager.has_more(page))
     
     def _update_layout(self):
         """Update layout based on window size (responsive)."""
@@ -230,6 +265,9 @@ class MessagingScreen(Screen):
     
     def _load_conversation(self, conversation_id):
         """Load a conversation and update the view."""
+        if self.current_conversation_id and self.current_conversation_id != conversation_id:
+            typing_state_manager.note_local_typing(self.current_conversation_id, False)
+        self._subscribe_conversation(conversation_id)
         self.current_conversation_id = conversation_id
         
         # Update header title
@@ -241,17 +279,37 @@ class MessagingScreen(Screen):
                 break
         
         messaging_service.set_typing_indicator(conversation_id, False)
+        latest = messaging_service.get_conversation_messages(conversation_id, limit=1)
+        if latest:
+            messaging_service.mark_read_up_to(conversation_id, latest[-1]['id'])
         
-        # Refresh layout
+        # Rebuild the layout for the new conversation
+        self.current_layout = None
         self._update_layout()
     
+    def _subscribe_conversation(self, conversation_id):
+        """Move the keyed event subscriptions to ``conversation_id``."""
+        previous = self.current_conversation_id
+        if previous == conversation_id:
+            return
+        for event_type, handler in self._conversation_handlers.items():
+            if previous is not None:
+                event_bus.unsubscribe(event_type, handler, key=previous)
+            event_bus.subscribe(event_type, handler, key=conversation_id)
+    
     def _on_send_message(self, text):
         """Handle message send."""
         if not text.strip() or not self.current_conversation_id:
             return
         
+        typing_state_manager.note_local_typing(self.current_conversation_id, False)
         messaging_service.send_message(self.current_conversation_id, text)
-        self._refresh_message_feed()
+
+    def _on_composer_typing(self, is_typing):
+        """Forward composer activity to the throttled typing pipeline."""
+        if not self.current_conversation_id:
+            return
+        typing_state_manager.note_local_typing(self.current_conversation_id, is_typing)
     
     def _on_attach(self):
         """Handle attach button click."""
@@ -288,7 +346,6 @@ class MessagingScreen(Screen):
             return
         
         messaging_service.pin_message(self.current_conversation_id, message_id)
-        self._refresh_message_feed()
     
     def _open_reaction_picker(self, message_id):
         """Open a popup to pick reaction emoji."""
@@ -320,7 +377,6 @@ class MessagingScreen(Screen):
             return
         
         messaging_service.add_reaction(self.current_conversation_id, message_id, emoji)
-        self._refresh_message_feed()
     
     def _forward_message(self, message_id):
         """Forward a message to another conversation."""
@@ -353,8 +409,11 @@ class MessagingScreen(Screen):
         popup.open()
     
     def _delete_message(self, message_id):
-        """Delete a message (stub)."""
-        pass
+        """Delete a message."""
+        if not self.current_conversation_id:
+            return
+        
+        messaging_service.delete_message(self.current_conversation_id, message_id)
     
     def _toggle_search(self):
         """Toggle search bar visibility."""
@@ -370,6 +429,7 @@ class MessagingScreen(Screen):
         else:
             if hasattr(self, 'search_bar'):
                 self.root.remove_widget(self.search_bar)
+            self.search_results = []
             self._refresh_message_feed()
     
     def _on_search(self, query):
@@ -395,79 +455,122 @@ class MessagingScreen(Screen):
         
         self._refresh_message_feed()
     
-    def _close_pinned_banner(self):
+    def _update_pinned_banner(self):
+        """Show the banner for the feed's pinned message, if it has one."""
+        pinned = next((row for row in self.message_feed.data if row['is_pinned']), None)
+        if self.pinned_banner is not None:
+            if pinned is not None and self.pinned_banner.message_id == pinned['message_id']:
+                return
+            self._close_pinned_banner()
+        if pinned is None:
+            return
+        self.pinned_banner = PinnedMessageBanner(
+            message_text=pinned['text'],
+            on_close=self._close_pinned_banner,
+        )
+        self.pinned_banner.message_id = pinned['message_id']
+        self.feed_container.add_widget(self.pinned_banner, index=len(self.feed_container.children))
+    
+    def _close_pinned_banner(self, *args):
         """Close the pinned message banner."""
         if self.pinned_banner and self.pinned_banner.parent:
             self.pinned_banner.parent.remove_widget(self.pinned_banner)
-            self.pinned_banner = None
+        self.pinned_banner = None
     
     def _refresh_message_feed(self):
-        """Refresh the message feed with current data."""
-        if self.current_layout == 'mobile':
-            # Refresh only if currently showing messages
-            if self.current_conversation_id:
-                self._update_layout()
-        else:
-            # Update message feed in desktop layout
-            if hasattr(self, 'message_list'):
-                self.message_list.clear_widgets()
-                messages = messaging_service.get_conversation_messages(self.current_conversation_id)
-                
-                for msg in messages:
-                    # Check if this message matches search
-                    if self.search_results:
-                        if msg['id'] not in [r['message_id'] for r in self.search_results]:
-                            continue
-                    
-                    bubble = self._create_chat_bubble(msg)
-                    self.message_list.add_widget(bubble)
+        """Bring the message feed in line with the current data."""
+        if not self.current_conversation_id:
+            return
+        if getattr(self, 'message_feed', None) is not None:
+            self._reset_feed()
+            self._update_pinned_banner()
+    
+    def _live_feed(self, conversation_id):
+        """The feed, if an event about ``conversation_id`` should be applied to it.
+        
+        Handlers run a frame after dispatch, so the open conversation may
+        have changed in between. Events carry the affected message, so the
+        feed is patched by id; only when the bus has dropped queued
+        cross-thread events since the last sync (a gap in what the feed has
+        seen) is the conversation refetched instead.
+        """
+        feed = getattr(self, 'message_feed', None)
+        if feed is None or conversation_id != self.current_conversation_id:
+            return None
+        if event_bus.threadsafe_dropped != self._synced_dropped:
+            self._refresh_message_feed()
+            return None
+        return feed
     
     @mainthread
     def _on_message_received(self, instance, message):
-        """Handle incoming message event."""
-        if message.get('conversation_id') != self.current_conversation_id:
+        """Insert or update the message's row."""
+        conversation_id = message.get('conversation_id')
+        if conversation_id == self.current_conversation_id and not message.get('is_outgoing'):
+            # Messages arriving in the open conversation are read as they land.
+            messaging_service.mark_read_up_to(conversation_id, message['id'])
+        feed = self._live_feed(conversation_id)
+        if feed is None:
             return
-        
-        self._refresh_message_feed()
+        if self.search_results and message['id'] not in feed:
+            return
+        feed.upsert(message)
+        if message.get('is_pinned') or (self.pinned_banner is not None and self.pinned_banner.message_id == message['id']):
+            self._update_pinned_banner()
     
     @mainthread
     def _on_typing_indicator(self, instance, data):
         """Handle typing indicator event."""
-        if data.get('conversation_id') != self.current_conversation_id:
+        typing_area = getattr(self, 'typing_area', None)
+        if typing_area is None or data.get('conversation_id') != self.current_conversation_id:
             return
-        
+        typing_area.clear_widgets()
         if data.get('typing'):
-            # Add typing indicator to message list
-            if hasattr(self, 'message_list'):
-                indicator = TypingIndicator(username=data.get('username', 'Someone'))
-                self.message_list.add_widget(indicator)
-        else:
-            # Remove typing indicator
-            if hasattr(self, 'message_list'):
-                for widget in list(self.message_list.children):
-                    if isinstance(widget, TypingIndicator):
-                        self.message_list.remove_widget(widget)
+            typing_area.add_widget(TypingIndicator(username=data.get('username', 'Someone')))
     
     @mainthread
     def _on_message_reacted(self, instance, data):
-        """Handle message reaction event."""
-        if data.get('conversation_id') != self.current_conversation_id:
+        """Refresh the reacted message's row from the service."""
+        feed = self._live_feed(data.get('conversation_id'))
+        if feed is None or data['message_id'] not in feed:
             return
-        
-        self._refresh_message_feed()
+        # The payload only names the emoji; counts come from the message.
+        message = messaging_service.get_message(data['conversation_id'], data['message_id'])
+        if message is not None:
+            feed.upsert(message)
     
     @mainthread
     def _on_message_pinned(self, instance, data):
-        """Handle message pinned event."""
-        if data.get('conversation_id') != self.current_conversation_id:
+        """Move the pin flag between rows and update the banner."""
+        feed = self._live_feed(data.get('conversation_id'))
+        if feed is None:
             return
-        
-        self._update_layout()
+        if data.get('pinned'):
+            # Pinning replaces the previously pinned message.
+            for row in [r for r in feed.data if r['is_pinned'] and r['message_id'] != data['message_id']]:
+                feed.patch(row['message_id'], is_pinned=False)
+        feed.patch(data['message_id'], is_pinned=bool(data.get('pinned')))
+        self._update_pinned_banner()
     
     @mainthread
     def _on_read_receipt(self, instance, data):
-        """Handle read receipt event."""
-        self._refresh_message_feed()
+        """Update the delivery state of the receipted message."""
+        feed = self._live_feed(data.get('conversation_id'))
+        if feed is None:
+            return
+        feed.patch(data['message_id'], delivery_state=data.get('state', 'read'))
+    
+    @mainthread
+    def _on_message_deleted(self, instance, conversation_id, message_id):
+        """Drop the deleted message's row."""
+        feed = self._live_feed(conversation_id)
+        if feed is None:
+            return
+        feed.remove(message_id)
+        if self._pager is not None:
+            self._pager.invalidate()
+        if self.pinned_banner is not None and self.pinned_banner.message_id == message_id:
+            self._update_pinned_banner()
     
     def _on_info(self):
         """Handle info button click."""
@@ -6,9 +6,10 @@ import time
 from dataclasses import dataclass
 from typing import Any, Dict, Optional, Tuple
 
-from kivy.app import App
+from src.utils.runtime import user_data_dir
 
 from src.utils.event_bus import event_bus
+from src.services.registry import services
 
 try:
     from cryptography.hazmat.primitives.ciphers.aead import AESGCM
@@ -71,11 +72,7 @@ class AppStateStore:
         if self._base_dir:
             base_dir = self._base_dir
         else:
-            app = App.get_running_app()
-            if app is not None and getattr(app, 'user_data_dir', None):
-                base_dir = app.user_data_dir
-            else:
-                base_dir = os.path.join(os.path.expanduser('~'), '.tor_dashboard')
+            base_dir = user_data_dir('.tor_dashboard')
 
         os.makedirs(base_dir, exist_ok=True)
         return base_dir
@@ -329,4 +326,4 @@ class AppStateStore:
         return hashlib.sha256(public_key_bytes).hexdigest()
 
 
-app_state_store = AppStateStore()
+app_state_store = services.register('app_state_store', AppStateStore)
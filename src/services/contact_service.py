@@ -1,15 +1,36 @@
 import os
 import json
+import threading
 import qrcode
 from io import BytesIO
 from datetime import datetime
-from kivy.storage.jsonstore import JsonStore
-from kivy.app import App
+from src.utils.runtime import JsonStore, Logger, user_data_dir
 from cryptography.fernet import Fernet
 from src.utils.event_bus import event_bus
+from src.services.registry import services
+
+
+_FLAG_SETS = ('favorites', 'muted', 'blocked', 'archived')
 
 
 class ContactService:
+    """Contacts, requests and their flags, persisted encrypted.
+
+    State is stored as a snapshot (``contacts.enc``, one Fernet token of
+    the whole state) plus a journal (``contacts.journal``) with one
+    separately encrypted record per mutation, so a change writes one
+    record instead of the whole state. Loading replays the journal over
+    the snapshot. Once ``compact_after`` records have accumulated, a
+    background thread folds them into a new snapshot. Records hold
+    absolute values, so replaying one that the snapshot already contains
+    is harmless.
+
+    Each mutation announces itself with its own per-contact event;
+    ``contacts_updated`` is only emitted when the whole state is replaced.
+    """
+
+    compact_after = 200
+
     def __init__(self):
         self._store_path = self._get_store_path()
         self._encryption_key = self._get_or_create_key()
@@ -23,18 +44,21 @@ class ContactService:
         self._blocked = set()
         self._archived = set()
         self._backup_metadata = {}
+        self._lock = threading.RLock()
+        self._journal_records = 0
+        self._compacting = False
+        # Bumped by every full snapshot; a compaction that started before
+        # one is stale and must not replace it.
+        self._generation = 0
         self._load_contacts()
 
     def _get_store_path(self):
-        app = App.get_running_app()
-        if app is not None and getattr(app, 'user_data_dir', None):
-            base_dir = app.user_data_dir
-        else:
-            base_dir = os.path.join(os.path.expanduser('~'), '.contact_manager')
-
-        os.makedirs(base_dir, exist_ok=True)
+        base_dir = user_data_dir('.contact_manager')
         return os.path.join(base_dir, 'contacts.enc')
 
+    def _get_journal_path(self):
+        return os.path.splitext(self._store_path)[0] + '.journal'
+
     def _get_key_path(self):
         return os.path.join(os.path.dirname(self._store_path), 'contacts.key')
 
@@ -67,20 +91,24 @@ class ContactService:
                 with open(self._store_path, 'r') as f:
                     encrypted_str = f.read()
                     data = self._decrypt_data(encrypted_str)
-                    self._contacts = data.get('contacts', {})
-                    self._pending_requests = data.get('pending_requests', {})
-                    self._fingerprints = data.get('fingerprints', {})
-                    self._favorites = set(data.get('favorites', []))
-                    self._groups = data.get('groups', {})
-                    self._muted = set(data.get('muted', []))
-                    self._blocked = set(data.get('blocked', []))
-                    self._archived = set(data.get('archived', []))
-                    self._backup_metadata = data.get('backup_metadata', {})
+                    self._set_state(data)
             except Exception:
                 pass
-
-    def _save_contacts(self):
-        data = {
+        self._replay_journal()
+
+    def _set_state(self, data: dict):
+        self._contacts = data.get('contacts', {})
+        self._pending_requests = data.get('pending_requests', {})
+        self._fingerprints = data.get('fingerprints', {})
+        self._favorites = set(data.get('favorites', []))
+        self._groups = data.get('groups', {})
+        self._muted = set(data.get('muted', []))
+        self._blocked = set(data.get('blocked', []))
+        self._archived = set(data.get('archived', []))
+        self._backup_metadata = data.get('backup_metadata', {})
+
+    def _state(self) -> dict:
+        return {
             'contacts': self._contacts,
             'pending_requests': self._pending_requests,
             'fingerprints': self._fingerprints,
@@ -91,10 +119,150 @@ class ContactService:
             'archived': list(self._archived),
             'backup_metadata': self._backup_metadata,
         }
-        encrypted_str = self._encrypt_data(data)
-        with open(self._store_path, 'w') as f:
+
+    def _save_contacts(self):
+        """Write the whole state as a new snapshot and start an empty journal."""
+        with self._lock:
+            encrypted_str = self._encrypt_data(self._state())
+            self._write_snapshot(encrypted_str)
+            self._truncate_journal(None)
+            self._generation += 1
+
+    def _write_snapshot(self, encrypted_str: str):
+        tmp_path = self._store_path + '.tmp'
+        with open(tmp_path, 'w') as f:
             f.write(encrypted_str)
-        event_bus.emit_contacts_updated()
+        os.replace(tmp_path, self._store_path)
+
+    # Journal -----------------------------------------------------------
+
+    def _record(self, *records: dict):
+        """Append mutation records to the journal; callers emit their own event."""
+        lines = b''.join(self._cipher.encrypt(json.dumps(r).encode()) + b'\n' for r in records)
+        with self._lock:
+            with open(self._get_journal_path(), 'ab') as f:
+                f.write(lines)
+            self._journal_records += len(records)
+        if self._journal_records >= self.compact_after:
+            self.compact()
+
+    def _record_contact(self, contact_id: str):
+        self._record({'op': 'contact', 'id': contact_id, 'value': self._contacts[contact_id]})
+
+    def _record_flag(self, flag_set: str, contact_id: str, on: bool):
+        self._record({'op': 'flag', 'set': flag_set, 'id': contact_id, 'on': on})
+
+    def _replay_journal(self):
+        path = self._get_journal_path()
+        self._journal_records = 0
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        start = valid_end = 0
+        for line in data.split(b'\n'):
+            end = start + len(line)
+            if line:
+                try:
+                    record = json.loads(self._cipher.decrypt(line).decode())
+                except Exception:
+                    Logger.warning('ContactService: skipping unreadable journal record')
+                else:
+                    self._apply(record)
+                    self._journal_records += 1
+                    valid_end = end
+            start = end + 1
+        if data[valid_end:] != (b'\n' if valid_end else b''):
+            # A write cut short by a crash leaves a partial last record; cut
+            # it off so the next append starts on a line of its own.
+            with open(path, 'r+b') as f:
+                f.truncate(valid_end)
+                if valid_end:
+                    f.seek(valid_end)
+                    f.write(b'\n')
+        if self._journal_records >= self.compact_after:
+            self.compact()
+
+    def _apply(self, record: dict):
+        op = record.get('op')
+        contact_id = record.get('id')
+        if op == 'contact':
+            self._contacts[contact_id] = record['value']
+        elif op == 'delete':
+            self._contacts.pop(contact_id, None)
+            for flag_set in _FLAG_SETS:
+                getattr(self, '_' + flag_set).discard(contact_id)
+            self._fingerprints.pop(contact_id, None)
+            self._pending_requests.pop(contact_id, None)
+        elif op == 'flag' and record.get('set') in _FLAG_SETS:
+            members = getattr(self, '_' + record['set'])
+            if record['on']:
+                members.add(contact_id)
+            else:
+                members.discard(contact_id)
+        elif op == 'group' and (record['members'] or record['name'] in self._groups):
+            self._groups[record['name']] = record['members']
+        elif op == 'fingerprint':
+            self._fingerprints[contact_id] = record['value']
+        elif op == 'request':
+            self._pending_requests[contact_id] = record['value']
+
+    def compact(self, wait: bool = False):
+        """Fold the journal into a new snapshot on a background thread.
+
+        The state is serialized here, under the lock, so the snapshot is
+        consistent; encryption and the file writes happen on the thread.
+        Records appended meanwhile stay in the journal. If a full snapshot
+        is written before the thread finishes, its result is discarded.
+        """
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+            payload = json.dumps(self._state())
+            journal_path = self._get_journal_path()
+            offset = os.path.getsize(journal_path) if os.path.exists(journal_path) else 0
+            store_path = self._store_path
+            generation = self._generation
+        worker = threading.Thread(
+            target=self._compact,
+            args=(payload, store_path, offset, generation),
+            name='contacts-compact',
+            daemon=True,
+        )
+        worker.start()
+        if wait:
+            worker.join()
+
+    def _compact(self, payload: str, store_path: str, offset: int, generation: int):
+        try:
+            tmp_path = store_path + '.compact'
+            with open(tmp_path, 'w') as f:
+                f.write(self._cipher.encrypt(payload.encode()).decode())
+            with self._lock:
+                if store_path != self._store_path or generation != self._generation:
+                    os.remove(tmp_path)
+                    return
+                os.replace(tmp_path, store_path)
+                self._truncate_journal(offset)
+        except Exception as exc:
+            Logger.warning(f'ContactService: journal compaction failed: {exc}')
+        finally:
+            self._compacting = False
+
+    def _truncate_journal(self, offset: int | None):
+        """Drop the first ``offset`` bytes of the journal, or all of it for ``None``."""
+        path = self._get_journal_path()
+        tail = b''
+        if offset is not None and os.path.exists(path):
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                tail = f.read()
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(tail)
+        os.replace(tmp_path, path)
+        self._journal_records = tail.count(b'\n')
 
     def add_contact(self, contact_id: str, name: str, onion_address: str, **kwargs):
         """Add a new contact or update existing."""
@@ -112,7 +280,7 @@ class ContactService:
             'custom_fields': kwargs.get('custom_fields', {}),
         }
         self._contacts[contact_id] = contact
-        self._save_contacts()
+        self._record_contact(contact_id)
         event_bus.emit_contact_added(contact_id, contact)
         return contact
 
@@ -126,18 +294,23 @@ class ContactService:
 
     def search_contacts(self, query: str):
         """Search contacts by name, nickname, or onion address."""
-        query = query.lower()
         results = {}
         for contact_id, contact in self._contacts.items():
             if contact_id in self._archived:
                 continue
-            name = contact.get('name', '').lower()
-            nickname = contact.get('nickname', '').lower()
-            onion = contact.get('onion_address', '').lower()
-            if query in name or query in nickname or query in onion:
+            if self.matches_query(contact, query):
                 results[contact_id] = contact
         return results
 
+    @staticmethod
+    def matches_query(contact: dict, query: str) -> bool:
+        """Whether a search query matches a contact's name, nickname or onion address."""
+        query = query.lower()
+        name = contact.get('name', '').lower()
+        nickname = contact.get('nickname', '').lower()
+        onion = contact.get('onion_address', '').lower()
+        return query in name or query in nickname or query in onion
+
     def delete_contact(self, contact_id: str):
         """Delete a contact."""
         if contact_id in self._contacts:
@@ -150,7 +323,7 @@ class ContactService:
                 del self._fingerprints[contact_id]
             if contact_id in self._pending_requests:
                 del self._pending_requests[contact_id]
-            self._save_contacts()
+            self._record({'op': 'delete', 'id': contact_id})
             event_bus.emit_contact_deleted(contact_id)
             return True
         return False
@@ -160,7 +333,7 @@ class ContactService:
         if contact_id not in self._contacts:
             return None
         self._contacts[contact_id].update(kwargs)
-        self._save_contacts()
+        self._record_contact(contact_id)
         event_bus.emit_contact_updated(contact_id, self._contacts[contact_id])
         return self._contacts[contact_id]
 
@@ -172,7 +345,7 @@ class ContactService:
         """Add contact to favorites."""
         if contact_id in self._contacts:
             self._favorites.add(contact_id)
-            self._save_contacts()
+            self._record_flag('favorites', contact_id, True)
             event_bus.emit_contact_favorited(contact_id, True)
             return True
         return False
@@ -181,7 +354,7 @@ class ContactService:
         """Remove contact from favorites."""
         if contact_id in self._contacts:
             self._favorites.discard(contact_id)
-            self._save_contacts()
+            self._record_flag('favorites', contact_id, False)
             event_bus.emit_contact_favorited(contact_id, False)
             return True
         return False
@@ -198,7 +371,7 @@ class ContactService:
         """Block a contact."""
         if contact_id in self._contacts:
             self._blocked.add(contact_id)
-            self._save_contacts()
+            self._record_flag('blocked', contact_id, True)
             event_bus.emit_contact_blocked(contact_id, True)
             return True
         return False
@@ -207,7 +380,7 @@ class ContactService:
         """Unblock a contact."""
         if contact_id in self._contacts:
             self._blocked.discard(contact_id)
-            self._save_contacts()
+            self._record_flag('blocked', contact_id, False)
             event_bus.emit_contact_blocked(contact_id, False)
             return True
         return False
@@ -224,7 +397,7 @@ class ContactService:
         """Mute a contact."""
         if contact_id in self._contacts:
             self._muted.add(contact_id)
-            self._save_contacts()
+            self._record_flag('muted', contact_id, True)
             event_bus.emit_contact_muted(contact_id, True)
             return True
         return False
@@ -233,7 +406,7 @@ class ContactService:
         """Unmute a contact."""
         if contact_id in self._contacts:
             self._muted.discard(contact_id)
-            self._save_contacts()
+            self._record_flag('muted', contact_id, False)
             event_bus.emit_contact_muted(contact_id, False)
             return True
         return False
@@ -246,7 +419,7 @@ class ContactService:
         """Archive a contact."""
         if contact_id in self._contacts:
             self._archived.add(contact_id)
-            self._save_contacts()
+            self._record_flag('archived', contact_id, True)
             event_bus.emit_contact_archived(contact_id, True)
             return True
         return False
@@ -255,7 +428,7 @@ class ContactService:
         """Unarchive a contact."""
         if contact_id in self._contacts:
             self._archived.discard(contact_id)
-            self._save_contacts()
+            self._record_flag('archived', contact_id, False)
             event_bus.emit_contact_archived(contact_id, False)
             return True
         return False
@@ -273,7 +446,11 @@ class ContactService:
         if contact_id not in self._groups[group_name]:
             self._groups[group_name].append(contact_id)
             self._contacts[contact_id].setdefault('groups', []).append(group_name)
-        self._save_contacts()
+        self._record(
+            {'op': 'group', 'name': group_name, 'members': self._groups.get(group_name, [])},
+            {'op': 'contact', 'id': contact_id, 'value': self._contacts[contact_id]},
+        )
+        event_bus.emit_contact_updated(contact_id, self._contacts[contact_id])
         return True
 
     def remove_from_group(self, contact_id: str, group_name: str):
@@ -284,7 +461,11 @@ class ContactService:
             self._groups[group_name] = [c for c in self._groups[group_name] if c != contact_id]
         if group_name in self._contacts[contact_id].get('groups', []):
             self._contacts[contact_id]['groups'].remove(group_name)
-        self._save_contacts()
+        self._record(
+            {'op': 'group', 'name': group_name, 'members': self._groups.get(group_name, [])},
+            {'op': 'contact', 'id': contact_id, 'value': self._contacts[contact_id]},
+        )
+        event_bus.emit_contact_updated(contact_id, self._contacts[contact_id])
         return True
 
     def get_group_contacts(self, group_name: str):
@@ -306,7 +487,10 @@ class ContactService:
             'verified_at': datetime.now().isoformat() if verified else None,
         }
         self._contacts[contact_id]['verified'] = verified
-        self._save_contacts()
+        self._record(
+            {'op': 'fingerprint', 'id': contact_id, 'value': self._fingerprints[contact_id]},
+            {'op': 'contact', 'id': contact_id, 'value': self._contacts[contact_id]},
+        )
         event_bus.emit_contact_verified(contact_id, verified)
         return True
 
@@ -325,7 +509,7 @@ class ContactService:
             'created_at': datetime.now().isoformat(),
             'status': 'pending',
         }
-        self._save_contacts()
+        self._record({'op': 'request', 'id': request_id, 'value': self._pending_requests[request_id]})
         event_bus.emit_contact_request_created(request_id)
         return request_id
 
@@ -336,7 +520,7 @@ class ContactService:
         request = self._pending_requests[request_id]
         request['status'] = 'accepted'
         request['accepted_at'] = datetime.now().isoformat()
-        self._save_contacts()
+        self._record({'op': 'request', 'id': request_id, 'value': request})
         event_bus.emit_contact_request_accepted(request_id)
         return True
 
@@ -347,7 +531,7 @@ class ContactService:
         request = self._pending_requests[request_id]
         request['status'] = 'declined'
         request['declined_at'] = datetime.now().isoformat()
-        self._save_contacts()
+        self._record({'op': 'request', 'id': request_id, 'value': request})
         event_bus.emit_contact_request_declined(request_id)
         return True
 
@@ -401,19 +585,10 @@ class ContactService:
 
     def export_backup(self) -> str:
         """Export encrypted backup."""
-        data = {
-            'contacts': self._contacts,
-            'pending_requests': self._pending_requests,
-            'fingerprints': self._fingerprints,
-            'favorites': list(self._favorites),
-            'groups': self._groups,
-            'muted': list(self._muted),
-            'blocked': list(self._blocked),
-            'archived': list(self._archived),
-            'backup_metadata': {
-                'exported_at': datetime.now().isoformat(),
-                'version': '1.0',
-            },
+        data = self._state()
+        data['backup_metadata'] = {
+            'exported_at': datetime.now().isoformat(),
+            'version': '1.0',
         }
         return self._encrypt_data(data)
 
@@ -421,16 +596,11 @@ class ContactService:
         """Import encrypted backup."""
         try:
             data = self._decrypt_data(encrypted_backup)
-            self._contacts = data.get('contacts', {})
-            self._pending_requests = data.get('pending_requests', {})
-            self._fingerprints = data.get('fingerprints', {})
-            self._favorites = set(data.get('favorites', []))
-            self._groups = data.get('groups', {})
-            self._muted = set(data.get('muted', []))
-            self._blocked = set(data.get('blocked', []))
-            self._archived = set(data.get('archived', []))
-            self._backup_metadata = data.get('backup_metadata', {})
+            with self._lock:
+                self._set_state(data)
+            # A restore replaces everything: write it as a fresh snapshot.
             self._save_contacts()
+            event_bus.emit_contacts_updated()
             event_bus.emit_backup_imported()
             return True
         except Exception:
@@ -442,7 +612,8 @@ class ContactService:
             return False
         self._contacts[contact_id]['last_message_preview'] = preview
         self._contacts[contact_id]['last_message_time'] = timestamp or datetime.now().isoformat()
-        self._save_contacts()
+        self._record_contact(contact_id)
+        event_bus.emit_contact_updated(contact_id, self._contacts[contact_id])
         return True
 
     def set_presence_status(self, contact_id: str, status: str):
@@ -450,7 +621,7 @@ class ContactService:
         if contact_id not in self._contacts:
             return False
         self._contacts[contact_id]['presence_status'] = status
-        self._save_contacts()
+        self._record_contact(contact_id)
         event_bus.emit_contact_presence_updated(contact_id, status)
         return True
 
@@ -476,4 +647,4 @@ class ContactService:
         return contacts
 
 
-contact_service = ContactService()
+contact_service = services.register('contact_service', ContactService)
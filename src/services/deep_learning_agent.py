@@ -2,6 +2,8 @@ import random
 import time
 from typing import List, Optional
 
+from src.services.registry import services
+
 
 class DeepLearningAgent:
     PATTERN_TYPES = [
@@ -96,4 +98,4 @@ class DeepLearningAgent:
         return actions
 
 
-deep_learning_agent = DeepLearningAgent()
+deep_learning_agent = services.register('deep_learning_agent', DeepLearningAgent)
@@ -0,0 +1,119 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Literal
+
+from src.utils.runtime import Clock, Logger
+
+from src.services.messaging_service import messaging_service
+
+
+Direction = Literal['older', 'newer']
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _shared_executor() -> ThreadPoolExecutor:
+    # One worker is enough: pages are small and reads share one connection.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='history-pager')
+        return _executor
+
+
+class HistoryPager:
+    """Cursor-based history pages for one conversation.
+
+    Pages are read on a worker thread and handed to callbacks on the main
+    thread through the Clock. By default only the MessageStore query from
+    ``messaging_service.page_reader`` runs on the worker, and the page is
+    built with ``build_page`` on delivery; a custom ``fetch(conversation_id,
+    before=..., after=..., limit=...)`` runs on the worker as a whole.
+    Each delivered page starts a background fetch of the page beyond it, so
+    by the time the feed reaches that edge the rows are usually in memory.
+    At most one prefetched page is kept per direction.
+    """
+
+    def __init__(
+        self,
+        conversation_id: str,
+        *,
+        page_size: int = 50,
+        fetch: Callable[..., list[dict[str, Any]]] | None = None,
+        executor: ThreadPoolExecutor | None = None,
+    ):
+        self.conversation_id = conversation_id
+        self.page_size = int(page_size)
+        self._fetch = fetch
+        self._executor = executor
+        self._prefetched: dict[str, tuple[str, Future]] = {}
+        self._closed = False
+
+    def latest(self) -> list[dict[str, Any]]:
+        """The newest page, read synchronously for the first paint."""
+        return self._fetcher()(self.conversation_id, limit=self.page_size)
+
+    def _fetcher(self) -> Callable[..., list[dict[str, Any]]]:
+        return self._fetch or messaging_service.fetch_page
+
+    def has_more(self, page: list[dict[str, Any]] | None) -> bool:
+        return page is not None and len(page) >= self.page_size
+
+    def _submit(self, direction: Direction, cursor_id: str) -> Future:
+        executor = self._executor or _shared_executor()
+        kwargs = {'before': cursor_id} if direction == 'older' else {'after': cursor_id}
+        if self._fetch is not None:
+            return executor.submit(self._fetch, self.conversation_id, limit=self.page_size, **kwargs)
+        return executor.submit(messaging_service.page_reader(self.conversation_id, limit=self.page_size, **kwargs))
+
+    def prefetch(self, direction: Direction, cursor_id: str):
+        """Start reading the page beyond ``cursor_id`` unless it's already on its way."""
+        if self._closed or cursor_id is None:
+            return
+        current = self._prefetched.get(direction)
+        if current is not None and current[0] == cursor_id:
+            return
+        self._prefetched[direction] = (cursor_id, self._submit(direction, cursor_id))
+
+    def request(self, direction: Direction, cursor_id: str, callback: Callable[[list[dict[str, Any]] | None], Any]):
+        """Deliver the page beyond ``cursor_id`` to ``callback`` on the main thread.
+
+        The callback gets ``None`` if the read failed.
+        """
+        if self._closed:
+            return
+        current = self._prefetched.pop(direction, None)
+        if current is not None and current[0] == cursor_id:
+            future = current[1]
+        else:
+            future = self._submit(direction, cursor_id)
+        # Runs on the worker thread, or right here if the page is ready.
+        future.add_done_callback(
+            lambda f: Clock.schedule_once(lambda dt: self._deliver(direction, f, callback), 0)
+        )
+
+    def _deliver(self, direction: Direction, future: Future, callback):
+        if self._closed:
+            return
+        try:
+            page = future.result()
+            if self._fetch is None:
+                page = messaging_service.build_page(self.conversation_id, page)
+        except Exception as exc:
+            Logger.warning(f'HistoryPager: {direction} page of {self.conversation_id} failed: {exc}')
+            callback(None)
+            return
+        if self.has_more(page):
+            self.prefetch(direction, page[0]['id'] if direction == 'older' else page[-1]['id'])
+        callback(page)
+
+    def invalidate(self):
+        """Forget prefetched pages, e.g. after a message in them was deleted."""
+        for _, future in self._prefetched.values():
+            future.cancel()
+        self._prefetched.clear()
+
+    def close(self):
+        self._closed = True
+        self.invalidate()
@@ -0,0 +1,270 @@
+import random
+import statistics
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Literal
+
+from src.utils.runtime import Clock
+
+
+RateKind = Literal['steady', 'bursty', 'poisson']
+
+_WORDS = (
+    'hey', 'meeting', 'tor', 'circuit', 'relay', 'ok', 'sounds', 'good', 'see', 'you',
+    'tomorrow', 'coffee', 'lunch', 'project', 'update', 'ship', 'it', 'thanks', 'lol',
+    'what', 'time', 'is', 'the', 'build', 'green', 'again', 'bridge', 'onion', 'key',
+)
+
+
+@dataclass
+class LoadProfile:
+    """Shape of the synthetic traffic.
+
+    ``rate`` is the long-run average in messages per second for every kind.
+    ``bursty`` delivers it as ``burst_size`` back-to-back messages at a fixed
+    period; ``poisson`` uses exponential inter-arrival gaps. Conversations are
+    picked with Zipf weights (``conversation_skew`` 0 means uniform) and
+    bodies are sized from a clipped normal distribution in characters.
+    """
+
+    kind: RateKind = 'steady'
+    rate: float = 100.0
+    duration: float = 10.0
+    burst_size: int = 50
+    conversations: int = 5
+    conversation_skew: float = 1.0
+    size_mean: float = 80.0
+    size_stddev: float = 40.0
+    size_max: int = 4000
+    seed: int | None = None
+
+
+def arrival_gaps(profile: LoadProfile, rng: random.Random) -> Iterator[float]:
+    """Yield the delay before each successive message."""
+    rate = max(float(profile.rate), 1e-6)
+    if profile.kind == 'steady':
+        while True:
+            yield 1.0 / rate
+    elif profile.kind == 'poisson':
+        while True:
+            yield rng.expovariate(rate)
+    elif profile.kind == 'bursty':
+        burst = max(1, int(profile.burst_size))
+        period = burst / rate
+        while True:
+            yield period
+            for _ in range(burst - 1):
+                yield 0.0
+    else:
+        raise ValueError(f'Unknown rate profile {profile.kind!r}')
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def _summarize(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    return {
+        'count': len(values),
+        'mean': statistics.fmean(values),
+        'p50': _percentile(values, 50),
+        'p95': _percentile(values, 95),
+        'p99': _percentile(values, 99),
+        'max': max(values),
+    }
+
+
+def messaging_service_target(service) -> Callable[[str, str, str], Any]:
+    """Inject through MessagingService.receive_message (UI-facing path).
+
+    Messages for conversations the service doesn't know are rejected and
+    show up as errors in the report.
+    """
+
+    def _inject(conversation_id: str, message_id: str, body: str):
+        return service.receive_message(conversation_id, body, message_id=message_id, sender_id='loadgen')
+
+    return _inject
+
+
+def sync_service_target(sync_service) -> Callable[[str, str, str], Any]:
+    """Inject through MessageSyncService.apply_incoming_packet (storage path)."""
+
+    def _inject(conversation_id: str, message_id: str, body: str):
+        stored = sync_service.apply_incoming_packet(
+            {
+                'message_id': message_id,
+                'conversation_id': conversation_id,
+                'sender_id': 'loadgen',
+                'body': body,
+                'created_at': time.time(),
+            }
+        )
+        return stored is not None
+
+    return _inject
+
+
+class LoadGenerator:
+    """Replays a LoadProfile against an ingestion target.
+
+    ``target(conversation_id, message_id, body)`` is called for every
+    synthetic message; its wall time is recorded as ingestion latency. A
+    target that raises or returns ``False`` counts as an error. When driven
+    by the Kivy Clock (``start``), the frame deltas seen while the run is
+    active are recorded as well, so UI impact shows up as frame-time
+    percentiles and a count of frames over ``frame_budget``.
+    """
+
+    def __init__(
+        self,
+        profile: LoadProfile,
+        target: Callable[[str, str, str], Any],
+        *,
+        conversation_ids: list[str] | None = None,
+        frame_budget: float = 1.0 / 60.0,
+        on_complete: Callable[[dict[str, Any]], Any] | None = None,
+    ):
+        self.profile = profile
+        self._target = target
+        self._rng = random.Random(profile.seed)
+        self._frame_budget = float(frame_budget)
+        self._on_complete = on_complete
+
+        count = max(1, int(profile.conversations))
+        self._conversation_ids = list(conversation_ids or [f'load_{i}' for i in range(count)])[:count]
+        weights = [1.0 / ((i + 1) ** max(0.0, profile.conversation_skew)) for i in range(len(self._conversation_ids))]
+        self._cum_weights = []
+        total = 0.0
+        for w in weights:
+            total += w
+            self._cum_weights.append(total)
+
+        self._event = None
+        self._reset()
+
+    def _reset(self):
+        self._gaps = arrival_gaps(self.profile, self._rng)
+        self._latencies: list[float] = []
+        self._frame_times: list[float] = []
+        self._sizes: list[int] = []
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+        self._next_due = 0.0
+        self._errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._event is not None
+
+    def _pick_conversation(self) -> str:
+        return self._rng.choices(self._conversation_ids, cum_weights=self._cum_weights)[0]
+
+    def _make_body(self) -> str:
+        p = self.profile
+        size = int(round(self._rng.gauss(p.size_mean, p.size_stddev)))
+        size = max(1, min(int(p.size_max), size))
+        words = []
+        length = -1
+        while length < size:
+            word = self._rng.choice(_WORDS)
+            words.append(word)
+            length += len(word) + 1
+        return ' '.join(words)[:size]
+
+    def _inject_one(self):
+        conversation_id = self._pick_conversation()
+        body = self._make_body()
+        t0 = time.perf_counter()
+        try:
+            accepted = self._target(conversation_id, f'load_{uuid.uuid4().hex}', body)
+        except Exception:
+            accepted = False
+        if accepted is False:
+            self._errors += 1
+        self._latencies.append(time.perf_counter() - t0)
+        self._sizes.append(len(body))
+
+    def _inject_due(self, now: float) -> int:
+        injected = 0
+        elapsed = now - self._started_at
+        while self._next_due <= elapsed and self._next_due <= self.profile.duration:
+            self._inject_one()
+            injected += 1
+            self._next_due += next(self._gaps)
+        return injected
+
+    def _done(self, now: float) -> bool:
+        return now - self._started_at >= self.profile.duration
+
+    # Clock-driven mode: messages are injected from the frame callback, so the
+    # UI pays for ingestion exactly as it would for real traffic.
+
+    def start(self):
+        if self._event is not None:
+            return
+        self._reset()
+        self._started_at = time.perf_counter()
+        self._next_due = next(self._gaps) if self.profile.kind == 'poisson' else 0.0
+        self._event = Clock.schedule_interval(self._on_frame, 0)
+
+    def stop(self) -> dict[str, Any]:
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        if self._finished_at is None and self._started_at is not None:
+            self._finished_at = time.perf_counter()
+        return self.report()
+
+    def _on_frame(self, dt):
+        self._frame_times.append(float(dt))
+        now = time.perf_counter()
+        self._inject_due(now)
+        if self._done(now):
+            report = self.stop()
+            if self._on_complete is not None:
+                self._on_complete(report)
+            return False
+        return True
+
+    # Headless mode for benchmarks: no window or ticking Clock required.
+
+    def run_blocking(self) -> dict[str, Any]:
+        self._reset()
+        self._started_at = time.perf_counter()
+        self._next_due = next(self._gaps) if self.profile.kind == 'poisson' else 0.0
+        while True:
+            now = time.perf_counter()
+            self._inject_due(now)
+            if self._done(now):
+                break
+            wait = self._started_at + self._next_due - time.perf_counter()
+            if wait > 0:
+                time.sleep(min(wait, 0.05))
+        self._finished_at = time.perf_counter()
+        return self.report()
+
+    def report(self) -> dict[str, Any]:
+        started = self._started_at
+        finished = self._finished_at if self._finished_at is not None else time.perf_counter()
+        elapsed = (finished - started) if started is not None else 0.0
+        sent = len(self._latencies)
+        return {
+            'profile': self.profile.kind,
+            'target_rate': self.profile.rate,
+            'sent': sent,
+            'errors': self._errors,
+            'elapsed': elapsed,
+            'achieved_rate': sent / elapsed if elapsed > 0 else 0.0,
+            'latency': _summarize(self._latencies),
+            'frame_time': _summarize(self._frame_times),
+            'slow_frames': sum(1 for t in self._frame_times if t > self._frame_budget),
+            'message_size': _summarize([float(s) for s in self._sizes]),
+        }
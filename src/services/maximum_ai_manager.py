@@ -3,11 +3,12 @@ from __future__ import annotations
 import time
 from typing import Any, Dict, List, Optional
 
-from kivy.clock import Clock
+from src.utils.runtime import Clock
 
 from src.services.deep_learning_agent import deep_learning_agent
 from src.utils.event_bus import event_bus
 from src.utils.text_sanitizer import sanitize_action_text
+from src.services.registry import services
 
 
 class MaximumAIManager:
@@ -199,4 +200,4 @@ class MaximumAIManager:
             self._emit_state()
 
 
-maximum_ai_manager = MaximumAIManager()
+maximum_ai_manager = services.register('maximum_ai_manager', MaximumAIManager, depends=('deep_learning_agent',))
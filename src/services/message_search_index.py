@@ -0,0 +1,164 @@
+import math
+import re
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.utils.runtime import escape_markup
+
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text: str) -> list[tuple[str, int, int]]:
+    """Split text into (lowercased token, start, end) triples."""
+    return [(m.group(0).lower(), m.start(), m.end()) for m in _TOKEN_RE.finditer(text or '')]
+
+
+def highlight(text: str, spans: list[tuple[int, int]], *, open_tag: str = '[b]', close_tag: str = '[/b]') -> str:
+    """Wrap the given character spans of ``text`` in Kivy markup tags."""
+    out = []
+    pos = 0
+    for start, end in _merge_spans(spans):
+        out.append(escape_markup(text[pos:start]))
+        out.append(open_tag + escape_markup(text[start:end]) + close_tag)
+        pos = end
+    out.append(escape_markup(text[pos:]))
+    return ''.join(out)
+
+
+def _merge_spans(spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+@dataclass
+class _Doc:
+    conversation_id: str
+    text: str
+    timestamp: float
+    tokens: set = field(default_factory=set)
+
+
+class MessageSearchIndex:
+    """Incrementally maintained inverted index over message text.
+
+    Every query term matches indexed tokens it is a prefix of; a message
+    must match all terms. Results are ranked by a tf-idf style score
+    (exact token hits weigh more than prefix hits), newest first on ties,
+    and carry highlight spans taken from the token offsets.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, dict[str, list[tuple[int, int]]]] = {}
+        self._vocab: list[str] = []
+        self._docs: dict[str, _Doc] = {}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, message_id):
+        return message_id in self._docs
+
+    def add(self, message_id: str, conversation_id: str, text: str, timestamp: float = 0.0):
+        doc = self._docs.get(message_id)
+        if doc is not None:
+            if doc.text == text and doc.conversation_id == conversation_id:
+                doc.timestamp = float(timestamp)
+                return
+            self.remove(message_id)
+
+        doc = _Doc(conversation_id, text or '', float(timestamp))
+        for token, start, end in tokenize(doc.text):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocab, token)
+            postings.setdefault(message_id, []).append((start, end))
+            doc.tokens.add(token)
+        self._docs[message_id] = doc
+
+    def remove(self, message_id: str):
+        doc = self._docs.pop(message_id, None)
+        if doc is None:
+            return
+        for token in doc.tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(message_id, None)
+            if not postings:
+                del self._postings[token]
+                i = bisect_left(self._vocab, token)
+                if i < len(self._vocab) and self._vocab[i] == token:
+                    del self._vocab[i]
+
+    def clear(self):
+        self._postings.clear()
+        self._vocab.clear()
+        self._docs.clear()
+
+    def _expand(self, term: str) -> list[str]:
+        i = bisect_left(self._vocab, term)
+        out = []
+        while i < len(self._vocab) and self._vocab[i].startswith(term):
+            out.append(self._vocab[i])
+            i += 1
+        return out
+
+    def search(
+        self,
+        query: str,
+        *,
+        conversation_id: str | None = None,
+        limit: int = 50,
+    ) -> list[dict[str, Any]]:
+        terms = [t for t, _, _ in tokenize(query)]
+        if not terms or not self._docs:
+            return []
+
+        n_docs = len(self._docs)
+        scores: dict[str, float] | None = None
+        spans: dict[str, list[tuple[int, int]]] = {}
+
+        for term in terms:
+            term_scores: dict[str, float] = {}
+            for token in self._expand(term):
+                postings = self._postings[token]
+                idf = math.log(1.0 + n_docs / len(postings))
+                weight = 1.0 if token == term else 0.5 * len(term) / len(token)
+                for mid, offsets in postings.items():
+                    if conversation_id is not None and self._docs[mid].conversation_id != conversation_id:
+                        continue
+                    term_scores[mid] = term_scores.get(mid, 0.0) + weight * idf * len(offsets)
+                    # Highlight only the matched prefix of each token.
+                    spans.setdefault(mid, []).extend((s, min(e, s + len(term))) for s, e in offsets)
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {mid: sc + term_scores[mid] for mid, sc in scores.items() if mid in term_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], -self._docs[kv[0]].timestamp, kv[0]))
+        out = []
+        for mid, score in ranked[: int(limit)]:
+            doc = self._docs[mid]
+            doc_spans = _merge_spans(spans.get(mid, []))
+            out.append(
+                {
+                    'message_id': mid,
+                    'conversation_id': doc.conversation_id,
+                    'text': doc.text,
+                    'score': score,
+                    'spans': doc_spans,
+                    'highlighted': highlight(doc.text, doc_spans),
+                }
+            )
+        return out
@@ -1,11 +1,11 @@
 import base64
 import os
+import threading
 import time
 from dataclasses import dataclass
 from typing import Any, Iterable, Literal
 
-from kivy.app import App
-from kivy.clock import Clock
+from src.utils.runtime import Clock, user_data_dir
 
 from src.utils.event_bus import event_bus
 
@@ -33,9 +33,10 @@ except Exception:  # pragma: no cover
 
 
 MessageStatus = Literal['queued', 'sent', 'delivered', 'read', 'failed']
+SendJournalEvent = Literal['handoff', 'ack', 'failed', 'requeued']
 
 
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 4
 KEY_CHECK_PLAINTEXT = b'message_store_key_check_v1'
 
 
@@ -59,6 +60,8 @@ class MessageStore:
         self._key = key
         self._db_path = db_path or self._default_db_path()
         self._con = None
+        # History pages are read from a worker thread (see HistoryPager).
+        self._lock = threading.RLock()
         self._clock_cleanup_event = None
         self._expiration_events: dict[str, Any] = {}
 
@@ -87,12 +90,7 @@ class MessageStore:
             self._con = None
 
     def _default_db_path(self):
-        app = App.get_running_app()
-        if app is not None and getattr(app, 'user_data_dir', None):
-            base_dir = app.user_data_dir
-        else:
-            base_dir = os.path.join(os.path.expanduser('~'), '.tor_dashboard')
-        os.makedirs(base_dir, exist_ok=True)
+        base_dir = user_data_dir('.tor_dashboard')
         return os.path.join(base_dir, 'messages.db')
 
     def _open(self):
@@ -137,6 +135,7 @@ class MessageStore:
         current_version = int(self._con.execute('PRAGMA user_version').fetchone()[0])
         if current_version == 0:
             self._create_schema_v1()
+            self._migrate(1)
             self._con.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
             self._con.commit()
         elif current_version < SCHEMA_VERSION:
@@ -306,7 +305,79 @@ class MessageStore:
     def _migrate(self, from_version: int):
         if from_version >= SCHEMA_VERSION:
             return
-        raise RuntimeError(f'Unsupported schema version {from_version}')
+        if from_version < 1:
+            raise RuntimeError(f'Unsupported schema version {from_version}')
+        if from_version < 2:
+            self._create_schema_v2()
+        if from_version < 3:
+            self._create_schema_v3()
+        if from_version < 4:
+            self._create_schema_v4()
+
+    def _create_schema_v2(self):
+        assert self._con is not None
+
+        # sync_log assigns every stored message a local, never-reused sequence
+        # number. Peers remember the highest sequence they have applied from us
+        # (and we from them) in sync_cursors, so a reconnect only exchanges the
+        # range after that high-water mark.
+        self._con.executescript(
+            '''
+            CREATE TABLE IF NOT EXISTS sync_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                conversation_id TEXT NOT NULL,
+                message_id TEXT NOT NULL UNIQUE,
+                FOREIGN KEY(message_id) REFERENCES messages(id) ON DELETE CASCADE
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_sync_log_conversation_seq
+                ON sync_log(conversation_id, seq);
+
+            CREATE TABLE IF NOT EXISTS sync_cursors (
+                conversation_id TEXT NOT NULL,
+                peer_id TEXT NOT NULL,
+                remote_seq INTEGER NOT NULL DEFAULT 0,
+                acked_seq INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY(conversation_id, peer_id)
+            );
+
+            INSERT OR IGNORE INTO sync_log (conversation_id, message_id)
+                SELECT conversation_id, id FROM messages ORDER BY created_at ASC, id ASC;
+            '''
+        )
+
+    def _create_schema_v3(self):
+        assert self._con is not None
+
+        # send_journal records every transport handoff and its outcome. The
+        # latest entry per message tells startup recovery exactly which sends
+        # were in flight when the process died.
+        self._con.executescript(
+            '''
+            CREATE TABLE IF NOT EXISTS send_journal (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                message_id TEXT NOT NULL,
+                event TEXT NOT NULL,
+                at REAL NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_send_journal_message
+                ON send_journal(message_id, id);
+            '''
+        )
+
+    def _create_schema_v4(self):
+        assert self._con is not None
+
+        # The read marker is the (created_at, id) of the newest message the
+        # user has read; every incoming message after it is unread.
+        self._con.executescript(
+            '''
+            ALTER TABLE conversations ADD COLUMN read_up_to_at REAL;
+            ALTER TABLE conversations ADD COLUMN read_up_to_id TEXT;
+            '''
+        )
 
     def _schedule_cleanup_loop(self):
         if self._clock_cleanup_event is not None:
@@ -356,14 +427,16 @@ class MessageStore:
 
     def _execute(self, sql: str, params: tuple[Any, ...] = ()):
         assert self._con is not None
-        cur = self._con.execute(sql, params)
-        self._con.commit()
+        with self._lock:
+            cur = self._con.execute(sql, params)
+            self._con.commit()
         return cur
 
     def _query(self, sql: str, params: tuple[Any, ...] = ()) -> list[Any]:
         assert self._con is not None
-        cur = self._con.execute(sql, params)
-        return cur.fetchall()
+        with self._lock:
+            cur = self._con.execute(sql, params)
+            return cur.fetchall()
 
     def upsert_conversation(
         self,
@@ -443,7 +516,9 @@ class MessageStore:
         rows = self._query('SELECT * FROM conversations WHERE id = ?', (conversation_id,))
         if not rows:
             return None
-        row = rows[0]
+        return self._row_to_conversation(rows[0])
+
+    def _row_to_conversation(self, row) -> dict[str, Any]:
         title = self._decrypt_text(row['title'], row['title_enc'])
         return {
             'id': str(row['id']),
@@ -454,8 +529,16 @@ class MessageStore:
             'created_at': row['created_at'],
             'updated_at': row['updated_at'],
             'last_message_at': row['last_message_at'],
+            'read_up_to_at': row['read_up_to_at'],
+            'read_up_to_id': row['read_up_to_id'],
         }
 
+    def list_conversations(self) -> list[dict[str, Any]]:
+        rows = self._query(
+            'SELECT * FROM conversations ORDER BY COALESCE(last_message_at, created_at) DESC, id ASC'
+        )
+        return [self._row_to_conversation(row) for row in rows]
+
     def set_conversation_archived(self, conversation_id: str, archived: bool):
         return self.upsert_conversation(conversation_id, archived=bool(archived))
 
@@ -465,6 +548,82 @@ class MessageStore:
     def set_conversation_disappearing_timeout(self, conversation_id: str, timeout_seconds: int | None):
         return self.upsert_conversation(conversation_id, disappearing_timeout=timeout_seconds)
 
+    def set_read_marker(self, conversation_id: str, created_at: float, message_id: str) -> bool:
+        """Move the conversation's read marker forward; it never moves back.
+
+        Returns True when the marker advanced.
+        """
+        created_at = float(created_at)
+        cur = self._execute(
+            '''
+            UPDATE conversations
+               SET read_up_to_at = ?, read_up_to_id = ?
+             WHERE id = ?
+               AND (read_up_to_at IS NULL
+                    OR read_up_to_at < ?
+                    OR (read_up_to_at = ? AND read_up_to_id < ?))
+            ''',
+            (created_at, message_id, conversation_id, created_at, created_at, message_id),
+        )
+        return cur.rowcount > 0
+
+    def list_unread(self, conversation_id: str) -> list[dict[str, Any]]:
+        """``id`` and ``created_at`` of incoming messages past the read marker, oldest first."""
+        rows = self._query(
+            '''
+            SELECT m.id, m.created_at FROM messages m
+              JOIN conversations c ON c.id = m.conversation_id
+             WHERE m.conversation_id = ? AND m.is_outgoing = 0
+               AND (c.read_up_to_at IS NULL
+                    OR m.created_at > c.read_up_to_at
+                    OR (m.created_at = c.read_up_to_at AND m.id > c.read_up_to_id))
+             ORDER BY m.created_at ASC, m.id ASC
+            ''',
+            (conversation_id,),
+        )
+        return [{'id': str(row['id']), 'created_at': float(row['created_at'])} for row in rows]
+
+    def list_conversation_heads(self) -> list[dict[str, Any]]:
+        """``list_conversations`` plus each conversation's newest message and unread messages.
+
+        Every conversation dict gains ``latest`` (a message dict, or None)
+        and ``unread`` (as returned by ``list_unread``). The number of queries
+        doesn't grow with the number of conversations.
+        """
+        conversations = self.list_conversations()
+        latest_rows = self._query(
+            '''
+            SELECT * FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY conversation_id ORDER BY created_at DESC, id DESC
+                ) AS recency
+                  FROM messages
+            )
+             WHERE recency = 1
+            '''
+        )
+        latest = {msg['conversation_id']: msg for msg in self._rows_to_messages(latest_rows)}
+        unread_rows = self._query(
+            '''
+            SELECT m.conversation_id, m.id, m.created_at FROM messages m
+              JOIN conversations c ON c.id = m.conversation_id
+             WHERE m.is_outgoing = 0
+               AND (c.read_up_to_at IS NULL
+                    OR m.created_at > c.read_up_to_at
+                    OR (m.created_at = c.read_up_to_at AND m.id > c.read_up_to_id))
+             ORDER BY m.created_at ASC, m.id ASC
+            '''
+        )
+        unread: dict[str, list[dict[str, Any]]] = {}
+        for row in unread_rows:
+            unread.setdefault(str(row['conversation_id']), []).append(
+                {'id': str(row['id']), 'created_at': float(row['created_at'])}
+            )
+        for conversation in conversations:
+            conversation['latest'] = latest.get(conversation['id'])
+            conversation['unread'] = unread.get(conversation['id'], [])
+        return conversations
+
     def upsert_message(
         self,
         conversation_id: str,
@@ -538,6 +697,11 @@ class MessageStore:
             ),
         )
 
+        self._execute(
+            'INSERT OR IGNORE INTO sync_log (conversation_id, message_id) VALUES (?, ?)',
+            (conversation_id, message_id),
+        )
+
         if expires_at is not None:
             self._schedule_expiration(message_id, expires_at)
 
@@ -619,6 +783,9 @@ class MessageStore:
             )
             rows = list(reversed(rows))
 
+        return self._rows_to_messages(rows)
+
+    def _rows_to_messages(self, rows: list[Any]) -> list[dict[str, Any]]:
         ids = [str(r['id']) for r in rows]
         reactions_by = self._get_reactions_by_message(ids)
         attachments_by = self._get_attachments_by_message(ids)
@@ -912,25 +1079,51 @@ class MessageStore:
         results = results[::-1]
         return results[offset : offset + limit]
 
-    def get_outgoing_queue(self, *, limit: int = 50) -> list[dict[str, Any]]:
+    def get_outgoing_queue(
+        self,
+        *,
+        limit: int = 50,
+        per_conversation_limit: int | None = None,
+    ) -> list[dict[str, Any]]:
         now = time.time()
-        rows = self._query(
-            '''
-            SELECT * FROM messages
-             WHERE is_outgoing = 1
-               AND status IN ('queued', 'failed')
-               AND (next_retry_at IS NULL OR next_retry_at <= ?)
-             ORDER BY created_at ASC, id ASC
-             LIMIT ?
-            ''',
-            (now, int(limit)),
-        )
-        out: list[dict[str, Any]] = []
-        for r in rows:
-            msg = self.get_message(str(r['id']))
-            if msg is not None:
-                out.append(msg)
-        return out
+        if per_conversation_limit is None:
+            rows = self._query(
+                '''
+                SELECT * FROM messages
+                 WHERE is_outgoing = 1
+                   AND status IN ('queued', 'failed')
+                   AND (next_retry_at IS NULL OR next_retry_at <= ?)
+                 ORDER BY created_at ASC, id ASC
+                 LIMIT ?
+                ''',
+                (now, int(limit)),
+            )
+        else:
+            # Take the head of every conversation's queue so one long backlog
+            # can't crowd the others out of the batch. A conversation's queue
+            # stops at its first message still backing off, so later messages
+            # never overtake a retry.
+            rows = self._query(
+                '''
+                SELECT * FROM (
+                    SELECT *,
+                           ROW_NUMBER() OVER queue AS queue_pos,
+                           SUM(CASE WHEN next_retry_at > ? THEN 1 ELSE 0 END) OVER queue AS blocked
+                      FROM messages
+                     WHERE is_outgoing = 1
+                       AND status IN ('queued', 'failed')
+                    WINDOW queue AS (
+                        PARTITION BY conversation_id ORDER BY created_at ASC, id ASC
+                        ROWS UNBOUNDED PRECEDING
+                    )
+                )
+                 WHERE queue_pos <= ? AND blocked = 0
+                 ORDER BY created_at ASC, id ASC
+                 LIMIT ?
+                ''',
+                (now, int(per_conversation_limit), int(limit)),
+            )
+        return self._rows_to_messages(rows)
 
     def mark_retry(self, message_id: str, *, delay_seconds: float, retry_count: int | None = None):
         next_retry = time.time() + float(delay_seconds)
@@ -945,12 +1138,167 @@ class MessageStore:
                 ('failed', int(retry_count), next_retry, message_id),
             )
 
+    def fetch_changes_since(
+        self,
+        conversation_id: str,
+        since_seq: int = 0,
+        *,
+        limit: int = 100,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Return messages logged after ``since_seq`` and the last sequence scanned.
+
+        Each message dict carries its local ``seq``. The returned high-water
+        mark is ``since_seq`` when there is nothing newer.
+        """
+        rows = self._query(
+            '''
+            SELECT m.*, s.seq AS seq FROM sync_log s
+              JOIN messages m ON m.id = s.message_id
+             WHERE s.conversation_id = ? AND s.seq > ?
+             ORDER BY s.seq ASC
+             LIMIT ?
+            ''',
+            (conversation_id, int(since_seq), int(limit)),
+        )
+        out = self._rows_to_messages(rows)
+        for msg, row in zip(out, rows):
+            msg['seq'] = int(row['seq'])
+        high_water = int(rows[-1]['seq']) if rows else int(since_seq)
+        return out, high_water
+
+    def get_sync_cursor(self, conversation_id: str, peer_id: str) -> dict[str, Any]:
+        rows = self._query(
+            'SELECT * FROM sync_cursors WHERE conversation_id = ? AND peer_id = ?',
+            (conversation_id, peer_id),
+        )
+        if not rows:
+            return {
+                'conversation_id': conversation_id,
+                'peer_id': peer_id,
+                'remote_seq': 0,
+                'acked_seq': 0,
+                'updated_at': None,
+            }
+        row = rows[0]
+        return {
+            'conversation_id': str(row['conversation_id']),
+            'peer_id': str(row['peer_id']),
+            'remote_seq': int(row['remote_seq']),
+            'acked_seq': int(row['acked_seq']),
+            'updated_at': row['updated_at'],
+        }
+
+    def advance_sync_cursor(
+        self,
+        conversation_id: str,
+        peer_id: str,
+        *,
+        remote_seq: int | None = None,
+        acked_seq: int | None = None,
+    ) -> dict[str, Any]:
+        """Move the (conversation, peer) cursor forward; it never moves back.
+
+        ``remote_seq`` is the peer's sequence we have applied up to and
+        ``acked_seq`` is our own sequence the peer has confirmed.
+        """
+        self._execute(
+            '''
+            INSERT INTO sync_cursors (conversation_id, peer_id, remote_seq, acked_seq, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(conversation_id, peer_id) DO UPDATE SET
+                remote_seq = MAX(sync_cursors.remote_seq, excluded.remote_seq),
+                acked_seq = MAX(sync_cursors.acked_seq, excluded.acked_seq),
+                updated_at = excluded.updated_at
+            ''',
+            (
+                conversation_id,
+                peer_id,
+                int(remote_seq or 0),
+                int(acked_seq or 0),
+                time.time(),
+            ),
+        )
+        return self.get_sync_cursor(conversation_id, peer_id)
+
+    def append_send_journal(self, message_id: str, event: SendJournalEvent):
+        self._execute(
+            'INSERT INTO send_journal (message_id, event, at) VALUES (?, ?, ?)',
+            (message_id, event, time.time()),
+        )
+
+    def finish_send(self, message_id: str, ok: bool) -> bool:
+        """Journal a transport outcome and, on success, mark the message delivered.
+
+        Both writes share one transaction, so a crash can't leave an acked
+        message stuck at ``sent``. Returns True if the status changed.
+        """
+        assert self._con is not None
+        with self._lock:
+            self._con.execute(
+                'INSERT INTO send_journal (message_id, event, at) VALUES (?, ?, ?)',
+                (message_id, 'ack' if ok else 'failed', time.time()),
+            )
+            delivered = 0
+            if ok:
+                cur = self._con.execute(
+                    "UPDATE messages SET status = 'delivered' WHERE id = ? AND status = 'sent'",
+                    (message_id,),
+                )
+                delivered = cur.rowcount or 0
+            self._con.commit()
+        if delivered:
+            msg = self.get_message(message_id)
+            if msg is not None:
+                event_bus.emit_receipt_update(msg['conversation_id'], message_id, 'delivered')
+                event_bus.emit_message_batch(msg['conversation_id'], [msg])
+        return bool(delivered)
+
+    def get_unacked_sends(self) -> list[str]:
+        """Message ids whose latest journal entry is a handoff, oldest first."""
+        rows = self._query(
+            '''
+            SELECT message_id FROM send_journal
+             WHERE id IN (SELECT MAX(id) FROM send_journal GROUP BY message_id)
+               AND event = 'handoff'
+             ORDER BY id ASC
+            ''',
+        )
+        return [str(r['message_id']) for r in rows]
+
+    def compact_send_journal(self) -> int:
+        """Drop the history of every send that has reached a final outcome."""
+        cur = self._execute(
+            '''
+            DELETE FROM send_journal
+             WHERE message_id NOT IN (
+                SELECT message_id FROM send_journal
+                 WHERE id IN (SELECT MAX(id) FROM send_journal GROUP BY message_id)
+                   AND event = 'handoff'
+             )
+            ''',
+        )
+        return int(cur.rowcount or 0)
+
 
 message_store: MessageStore | None = None
 
 
-def get_message_store(key: str) -> MessageStore:
+def _get_or_create_key(key_path: str) -> str:
+    if os.path.exists(key_path):
+        with open(key_path, encoding='utf-8') as f:
+            return f.read().strip()
+    key = base64.urlsafe_b64encode(os.urandom(32)).decode('ascii')
+    fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(key)
+    return key
+
+
+def get_message_store(key: str | None = None) -> MessageStore:
+    """The app-wide store; without ``key`` it uses the device key kept beside the database."""
     global message_store
     if message_store is None:
+        if key is None:
+            key = _get_or_create_key(os.path.join(user_data_dir('.tor_dashboard'), 'messages.key'))
         message_store = MessageStore(key=key)
     return message_store
@@ -1,36 +1,94 @@
 import time
-from typing import Any
+from typing import Any, Callable
 
-from kivy.clock import Clock
+from src.utils.runtime import Clock
 
 from src.services.message_store import MessageStatus, MessageStore
+from src.services.send_scheduler import SendScheduler
+from src.services.typing_state_manager import TypingStateManager, typing_state_manager
 from src.utils.event_bus import event_bus
 
 
+# transport(msg, done) delivers a message to its peer and calls done(ok).
+Transport = Callable[[dict[str, Any], Callable[[bool], None]], None]
+# typing_transport(conversation_id, is_typing) tells the peer we are typing.
+TypingTransport = Callable[[str, bool], Any]
+
+
 class MessageSyncService:
-    def __init__(self, store: MessageStore):
+    def __init__(
+        self,
+        store: MessageStore,
+        *,
+        transport: Transport | None = None,
+        typing_transport: TypingTransport | None = None,
+        typing_manager: TypingStateManager | None = None,
+        max_in_flight: int = 8,
+        window: int = 1,
+    ):
         self._store = store
         self._tick_event = None
         self._online = False
         self._sending = False
+        self._transport = transport or self._loopback_transport
+        self._typing_transport = typing_transport or self._loopback_typing_transport
+        self._typing = typing_manager if typing_manager is not None else typing_state_manager
+
+        self._scheduler = SendScheduler(
+            self._dispatch,
+            max_in_flight=max_in_flight,
+            window=window,
+            on_failed=self._on_send_failed,
+        )
+        self._scheduler.pause()
 
         event_bus.bind(on_tor_state_update=self._on_tor_state_update)
+        event_bus.bind(on_message_deleted=self._on_message_deleted)
 
     def start(self):
         if self._tick_event is not None:
             return
         self._tick_event = Clock.schedule_interval(lambda dt: self._tick(), 1.0)
+        # Throttled composer typing signals go out through this service.
+        self._typing.set_signal_sender(self.send_typing_signal)
 
     def stop(self):
         if self._tick_event is None:
             return
         self._tick_event.cancel()
         self._tick_event = None
+        self._typing.set_signal_sender(None)
 
     def set_online(self, online: bool):
         self._online = bool(online)
         if self._online:
+            self._scheduler.resume()
             self.flush_outgoing_queue()
+        else:
+            self._scheduler.pause()
+
+    def recover_in_flight(self) -> int:
+        """Requeue sends that were handed to the transport but never acked.
+
+        Reads only the send journal, not the message table, and compacts the
+        journal afterwards.
+        """
+        recovered = 0
+        for mid in self._store.get_unacked_sends():
+            msg = self._store.get_message(mid)
+            self._store.append_send_journal(mid, 'requeued')
+            if msg is None or msg['status'] != 'sent':
+                continue
+            self._store.update_message_status(mid, 'queued')
+            msg['status'] = 'queued'
+            self._scheduler.enqueue(msg)
+            recovered += 1
+
+        self._store.compact_send_journal()
+        return recovered
+
+    def get_queue_stats(self) -> dict[str, dict[str, Any]]:
+        return self._scheduler.stats()
 
     def queue_outgoing_message(
         self,
@@ -86,8 +144,80 @@ class MessageSyncService:
         )
         return msg
 
+    # Delta sync
+    #
+    # Each store numbers its messages with a local sequence (see
+    # MessageStore.fetch_changes_since). A requester sends the highest peer
+    # sequence it has applied; the responder replies with the range after it.
+    # The request itself acknowledges everything up to ``since``.
+
+    def build_sync_request(self, conversation_id: str, peer_id: str, *, limit: int = 100) -> dict[str, Any]:
+        cursor = self._store.get_sync_cursor(conversation_id, peer_id)
+        return {
+            'type': 'sync_request',
+            'conversation_id': conversation_id,
+            'since': cursor['remote_seq'],
+            'limit': int(limit),
+        }
+
+    def handle_sync_request(self, peer_id: str, request: dict[str, Any]) -> dict[str, Any]:
+        conversation_id = str(request.get('conversation_id') or '')
+        since = int(request.get('since') or 0)
+        limit = max(1, min(int(request.get('limit') or 100), 500))
+
+        self._store.advance_sync_cursor(conversation_id, peer_id, acked_seq=since)
+
+        messages, high_water = self._store.fetch_changes_since(conversation_id, since, limit=limit)
+        packets = [self._to_packet(m) for m in messages if m.get('sender_id') != peer_id]
+        return {
+            'type': 'sync_response',
+            'conversation_id': conversation_id,
+            'since': since,
+            'high_water': high_water,
+            'has_more': len(messages) >= limit,
+            'messages': packets,
+        }
+
+    def apply_sync_response(self, peer_id: str, response: dict[str, Any]) -> int:
+        conversation_id = str(response.get('conversation_id') or '')
+        if not conversation_id:
+            return 0
+
+        applied = 0
+        for packet in response.get('messages') or []:
+            if self._store.get_message(str(packet.get('message_id') or '')) is None:
+                if self.apply_incoming_packet(packet) is not None:
+                    applied += 1
+
+        self._store.advance_sync_cursor(
+            conversation_id,
+            peer_id,
+            remote_seq=int(response.get('high_water') or 0),
+        )
+        return applied
+
+    def _to_packet(self, msg: dict[str, Any]) -> dict[str, Any]:
+        return {
+            'message_id': msg['id'],
+            'conversation_id': msg['conversation_id'],
+            'sender_id': msg.get('sender_id'),
+            'body': msg.get('body'),
+            'created_at': msg.get('created_at'),
+            'ttl_seconds': msg.get('ttl_seconds'),
+            'message_type': msg.get('message_type') or 'text',
+        }
+
     def set_typing_state(self, conversation_id: str, peer_id: str, is_typing: bool):
-        event_bus.emit_typing_state(conversation_id, peer_id, bool(is_typing))
+        # Remote typing states are de-duplicated and expire on their own.
+        self._typing.apply_remote_typing(conversation_id, peer_id, bool(is_typing))
+
+    def notify_local_typing(self, conversation_id: str, is_typing: bool):
+        self._typing.note_local_typing(conversation_id, bool(is_typing))
+
+    def send_typing_signal(self, conversation_id: str, is_typing: bool):
+        # Typing state is ephemeral: there is nothing to resend once we're back online.
+        if self._online:
+            self._typing_transport(conversation_id, bool(is_typing))
 
     def _on_tor_state_update(self, instance, state: dict[str, Any]):
         cs = state.get('connection_state')
@@ -103,25 +233,42 @@ class MessageSyncService:
             return
         self._sending = True
         try:
-            for msg in self._store.get_outgoing_queue(limit=100):
-                self._attempt_send(msg)
+            for msg in self._store.get_outgoing_queue(limit=100, per_conversation_limit=10):
+                self._scheduler.enqueue(msg)
+            self._scheduler.pump()
         finally:
             self._sending = False
 
-    def _attempt_send(self, msg: dict[str, Any]):
-        # In the current codebase we don't have a network transport, so we
-        # model a successful send once Tor is connected.
+    def _dispatch(self, msg: dict[str, Any], done: Callable[[bool], None]):
         mid = msg['id']
+        if self._store.get_message(mid) is None:
+            done(True)
+            return
+
+        # Journal first: if we die after this line the send is resumed on
+        # the next start (receivers drop duplicates by message id).
+        self._store.append_send_journal(mid, 'handoff')
         self._store.update_message_status(mid, 'sent')
 
-        def _confirm(dt):
-            current = self._store.get_message(mid)
-            if current is None:
-                return
-            if current['status'] == 'sent':
-                self._store.update_message_status(mid, 'delivered')
+        def _on_transport_done(ok: bool):
+            self._store.finish_send(mid, ok)
+            done(ok)
+
+        self._transport(msg, _on_transport_done)
+
+    def _on_send_failed(self, msg: dict[str, Any], delay: float, attempts: int):
+        self._store.mark_retry(msg['id'], delay_seconds=delay, retry_count=attempts)
+
+    def _on_message_deleted(self, instance, conversation_id, message_id):
+        self._scheduler.discard(message_id)
+
+    def _loopback_transport(self, msg: dict[str, Any], done: Callable[[bool], None]):
+        # In the current codebase we don't have a network transport, so we
+        # model a successful send once Tor is connected.
+        Clock.schedule_once(lambda dt: done(True), 0)
 
-        Clock.schedule_once(_confirm, 0)
+    def _loopback_typing_transport(self, conversation_id: str, is_typing: bool):
+        pass
 
 
 message_sync_service: MessageSyncService | None = None
@@ -131,5 +278,6 @@ def get_message_sync_service(store: MessageStore) -> MessageSyncService:
     global message_sync_service
     if message_sync_service is None:
         message_sync_service = MessageSyncService(store)
+        message_sync_service.recover_in_flight()
         message_sync_service.start()
     return message_sync_service
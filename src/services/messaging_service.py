@@ -1,6 +1,18 @@
+import itertools
+import random
+import uuid
+from bisect import bisect_right
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from kivy.clock import Clock
+from src.utils.runtime import Clock
+from src.services.message_search_index import MessageSearchIndex
 from src.utils.event_bus import event_bus
+from src.services.registry import services
+
+
+# Conversation summaries are stamped from one monotonic counter, so a single
+# integer works as a "changed since" token across every conversation.
+_summary_versions = itertools.count(1)
 
 
 class Message:
@@ -16,79 +28,351 @@ class Message:
         self.reactions = reactions or []
         self.is_pinned = is_pinned
         self.attachments = attachments or []
+        self.conversation_id = None
+        self.created_at = None
+        self._dict_cache = None
+    
+    @classmethod
+    def from_store(cls, record):
+        """Build a Message from a MessageStore record."""
+        counts = OrderedDict()
+        for reaction in record.get('reactions') or []:
+            counts[reaction['emoji']] = counts.get(reaction['emoji'], 0) + 1
+        msg = cls(
+            record['id'],
+            record.get('body') or '',
+            is_outgoing=bool(record.get('is_outgoing')),
+            timestamp=datetime.fromtimestamp(float(record['created_at'])),
+            delivery_state=record.get('status') or 'sent',
+            reactions=[{'emoji': e, 'count': c} for e, c in counts.items()],
+            is_pinned=bool(record.get('is_pinned')),
+            attachments=list(record.get('attachments') or []),
+        )
+        msg.conversation_id = record.get('conversation_id')
+        msg.created_at = float(record['created_at'])
+        return msg
+    
+    @property
+    def sort_key(self):
+        return (self.timestamp, self.id)
+    
+    def invalidate(self):
+        """Drop the cached dict after a mutation."""
+        self._dict_cache = None
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'text': self.text,
-            'is_outgoing': self.is_outgoing,
-            'timestamp': self.timestamp,
-            'delivery_state': self.delivery_state,
-            'reactions': self.reactions,
-            'is_pinned': self.is_pinned,
-            'attachments': self.attachments,
-        }
+        # Cached until the next mutation; callers must treat it as read-only.
+        if self._dict_cache is None:
+            self._dict_cache = {
+                'id': self.id,
+                'conversation_id': self.conversation_id,
+                'text': self.text,
+                'is_outgoing': self.is_outgoing,
+                'timestamp': self.timestamp,
+                'delivery_state': self.delivery_state,
+                'reactions': self.reactions,
+                'is_pinned': self.is_pinned,
+                'attachments': self.attachments,
+            }
+        return self._dict_cache
 
 
 class Conversation:
-    """Represents a conversation thread."""
+    """Represents a conversation thread.
+    
+    Messages are kept in arrival order with an id index, so lookups and
+    mutations by id are O(1) and windows (last N, before/after an id) are
+    list slices. Unread state is a read marker plus the ids of incoming
+    messages past it, so counts stay exact without rescanning history.
+    """
     
-    def __init__(self, conversation_id, name, last_message='', unread_count=0):
+    def __init__(self, conversation_id, name, last_message=''):
         self.id = conversation_id
-        self.name = name
-        self.last_message = last_message
-        self.unread_count = unread_count
-        self.messages = []
+        self._name = name
+        self._last_message = last_message
+        self._unread = {}
+        self.read_up_to_key = None
+        self.version = next(_summary_versions)
+        self._summary = None
+        self._messages = []
+        self._by_id = {}
+        self._positions = {}
+        self._pinned_id = None
         self.typing_indicator_user = None
         self.read_receipts = {}
+        self.last_message_key = None
+        # Store-backed conversations hold only a window of their history.
+        self.loaded = False
+        self.has_older = False
     
-    def add_message(self, message):
-        self.messages.append(message)
+    @property
+    def messages(self):
+        return self._messages
+    
+    @property
+    def name(self):
+        return self._name
+    
+    @name.setter
+    def name(self, value):
+        if value != self._name:
+            self._name = value
+            self.touch()
+    
+    @property
+    def last_message(self):
+        return self._last_message
+    
+    @last_message.setter
+    def last_message(self, value):
+        if value != self._last_message:
+            self._last_message = value
+            self.touch()
+    
+    @property
+    def unread_count(self):
+        return len(self._unread)
+    
+    def touch(self):
+        """Stamp a new summary version after a summary field changed."""
+        self.version = next(_summary_versions)
+        self._summary = None
+    
+    def summary(self):
+        # Cached until the next touch(); callers must treat it as read-only.
+        if self._summary is None:
+            self._summary = {
+                'id': self.id,
+                'name': self._name,
+                'last_message': self._last_message,
+                'unread_count': len(self._unread),
+                'version': self.version,
+            }
+        return self._summary
+    
+    def is_unread(self, message):
+        if message.is_outgoing:
+            return False
+        return self.read_up_to_key is None or message.sort_key > self.read_up_to_key
+    
+    def note_unread(self, message):
+        """Count an incoming message past the read marker; idempotent per id."""
+        if message.id not in self._unread and self.is_unread(message):
+            self._unread[message.id] = message.sort_key
+            self.touch()
+    
+    def forget_unread(self, message_id):
+        if self._unread.pop(message_id, None) is not None:
+            self.touch()
+    
+    def mark_read_up_to(self, sort_key):
+        """Advance the read marker; returns how many messages became read."""
+        if self.read_up_to_key is not None and sort_key <= self.read_up_to_key:
+            return 0
+        self.read_up_to_key = sort_key
+        read = [mid for mid, key in self._unread.items() if key <= sort_key]
+        for mid in read:
+            del self._unread[mid]
+        if read:
+            self.touch()
+        return len(read)
+    
+    def restore_read_state(self, read_up_to_key, unread):
+        """Seed the read marker and the ``(id, sort_key)`` pairs of unread messages."""
+        self.read_up_to_key = read_up_to_key
+        self._unread = dict(unread)
+        self.touch()
+    
+    def add_message(self, message, count_unread=True):
+        """Append a message; returns False when its id is already present.
+        
+        ``count_unread=False`` skips unread accounting.
+        """
+        if message.id in self._by_id:
+            return False
+        message.conversation_id = self.id
+        self._positions[message.id] = len(self._messages)
+        self._messages.append(message)
+        self._by_id[message.id] = message
+        if message.is_pinned:
+            self._set_pinned(message.id)
         self.last_message = message.text[:50]
+        self.last_message_key = message.sort_key
+        if count_unread:
+            self.note_unread(message)
+        return True
+    
+    def upsert_message(self, message):
+        """Insert in timestamp order or replace an existing message.
+        
+        Returns True when the message was newly inserted.
+        """
+        message.conversation_id = self.id
+        existing = self._by_id.get(message.id)
+        if existing is not None:
+            pos = self._positions[message.id]
+            self._messages[pos] = message
+            self._by_id[message.id] = message
+            if message.is_pinned:
+                self._set_pinned(message.id)
+            elif self._pinned_id == message.id:
+                self._pinned_id = None
+            if pos == len(self._messages) - 1:
+                self.last_message = message.text[:50]
+                self.last_message_key = message.sort_key
+            return False
+        
+        if not self._messages or message.sort_key >= self._messages[-1].sort_key:
+            self.add_message(message)
+            return True
+        
+        pos = bisect_right(self._messages, message.sort_key, key=lambda m: m.sort_key)
+        self._messages.insert(pos, message)
+        self._by_id[message.id] = message
+        self._reindex(pos)
+        if message.is_pinned:
+            self._set_pinned(message.id)
+        self.note_unread(message)
+        return True
+    
+    def prepend_messages(self, messages):
+        """Add an older page (in chronological order) ahead of the window."""
+        fresh = [m for m in messages if m.id not in self._by_id]
+        for m in fresh:
+            m.conversation_id = self.id
+            self._by_id[m.id] = m
+            if m.is_pinned and self._pinned_id is None:
+                self._pinned_id = m.id
+        self._messages[:0] = fresh
+        self._reindex(0)
+        return len(fresh)
+    
+    def trim(self, max_messages):
+        """Drop the oldest messages beyond ``max_messages``."""
+        excess = len(self._messages) - int(max_messages)
+        if excess <= 0:
+            return 0
+        for m in self._messages[:excess]:
+            self._by_id.pop(m.id, None)
+            self._positions.pop(m.id, None)
+            if self._pinned_id == m.id:
+                self._pinned_id = None
+        del self._messages[:excess]
+        self._reindex(0)
+        self.has_older = True
+        return excess
+    
+    def clear_window(self):
+        self._messages = []
+        self._by_id = {}
+        self._positions = {}
+        self._pinned_id = None
+        self.loaded = False
+        self.has_older = False
+    
+    def _reindex(self, start):
+        for i in range(start, len(self._messages)):
+            self._positions[self._messages[i].id] = i
+    
+    def remove_message(self, message_id):
+        self.forget_unread(message_id)
+        msg = self._by_id.pop(message_id, None)
+        if msg is None:
+            return None
+        pos = self._positions.pop(message_id)
+        del self._messages[pos]
+        self._reindex(pos)
+        if self._pinned_id == message_id:
+            self._pinned_id = None
+        if self._messages:
+            self.last_message = self._messages[-1].text[:50]
+            self.last_message_key = self._messages[-1].sort_key
+        else:
+            self.last_message = ''
+            self.last_message_key = None
+        return msg
+    
+    def get_message(self, message_id):
+        return self._by_id.get(message_id)
+    
+    def get_window(self, limit=None, before=None, after=None):
+        """Return messages in order, optionally limited to a window.
+        
+        ``before``/``after`` are message ids used as exclusive cursors;
+        ``limit`` keeps the messages nearest the cursor (or the newest).
+        """
+        start, stop = 0, len(self._messages)
+        if before is not None:
+            stop = self._positions.get(before, stop)
+        if after is not None:
+            pos = self._positions.get(after)
+            start = pos + 1 if pos is not None else stop
+        if limit is not None:
+            if after is not None:
+                stop = min(stop, start + int(limit))
+            else:
+                start = max(start, stop - int(limit))
+        return self._messages[start:stop]
     
     def get_pinned_message(self):
-        for msg in self.messages:
-            if msg.is_pinned:
-                return msg
-        return None
+        if self._pinned_id is None:
+            return None
+        return self._by_id.get(self._pinned_id)
+    
+    def _set_pinned(self, message_id):
+        previous = self.get_pinned_message()
+        if previous is not None and previous.id != message_id:
+            previous.is_pinned = False
+            previous.invalidate()
+        self._pinned_id = message_id
     
     def pin_message(self, message_id):
-        for msg in self.messages:
-            if msg.id == message_id:
-                msg.is_pinned = True
-                return True
-        return False
+        msg = self._by_id.get(message_id)
+        if msg is None:
+            return False
+        self._set_pinned(message_id)
+        msg.is_pinned = True
+        msg.invalidate()
+        return True
     
     def unpin_message(self, message_id):
-        for msg in self.messages:
-            if msg.id == message_id:
-                msg.is_pinned = False
-                return True
-        return False
+        msg = self._by_id.get(message_id)
+        if msg is None:
+            return False
+        msg.is_pinned = False
+        msg.invalidate()
+        if self._pinned_id == message_id:
+            self._pinned_id = None
+        return True
     
     def add_reaction(self, message_id, emoji, user_id='me'):
-        for msg in self.messages:
-            if msg.id == message_id:
-                for reaction in msg.reactions:
-                    if reaction['emoji'] == emoji:
-                        reaction['count'] = reaction.get('count', 1) + 1
-                        return True
-                msg.reactions.append({'emoji': emoji, 'count': 1})
+        msg = self._by_id.get(message_id)
+        if msg is None:
+            return False
+        msg.invalidate()
+        for reaction in msg.reactions:
+            if reaction['emoji'] == emoji:
+                reaction['count'] = reaction.get('count', 1) + 1
                 return True
-        return False
+        msg.reactions.append({'emoji': emoji, 'count': 1})
+        return True
     
     def to_dict(self):
         return {
             'id': self.id,
-            'name': self.name,
-            'last_message': self.last_message,
-            'unread_count': self.unread_count,
-            'messages': [m.to_dict() for m in self.messages],
+            'name': self._name,
+            'last_message': self._last_message,
+            'unread_count': len(self._unread),
+            'messages': [m.to_dict() for m in self._messages],
         }
 
 
 class MessagingService:
-    """Mock messaging service with event emission."""
+    """Messaging facade with event emission.
+    
+    Serves built-in mock conversations until a MessageStore is attached,
+    then acts as a write-through cache over it.
+    """
     
     _instance = None
     
@@ -108,6 +392,19 @@ class MessagingService:
         self._current_conversation_id = None
         self._typing_simulation_event = None
         self._search_results = []
+        # Mock-mode message ids; never reused, even after a delete.
+        self._mock_ids = itertools.count(1)
+        
+        # Set by attach_store(); None means the built-in mock data is served.
+        self._store = None
+        self._sync = None
+        self._hot = OrderedDict()
+        self._backfill = []
+        self._backfill_event = None
+        self._search_index = MessageSearchIndex()
+        self.page_size = 50
+        self.hot_window = 200
+        self.max_hot_conversations = 8
         
         # Register event types for messaging
         event_bus.register_event_type('on_message_received')
@@ -125,9 +422,9 @@ class MessagingService:
     def _init_mock_data(self):
         """Initialize mock conversation data."""
         # Create sample conversations
-        conv1 = Conversation('conv_1', 'Alice Johnson', 'That sounds great!', 2)
-        conv2 = Conversation('conv_2', 'Bob Smith', 'See you soon!', 0)
-        conv3 = Conversation('conv_3', 'Team Chat', 'Meeting at 3 PM', 5)
+        conv1 = Conversation('conv_1', 'Alice Johnson', 'That sounds great!')
+        conv2 = Conversation('conv_2', 'Bob Smith', 'See you soon!')
+        conv3 = Conversation('conv_3', 'Team Chat', 'Meeting at 3 PM')
         
         # Add messages to conv1
         now = datetime.now()
@@ -142,6 +439,7 @@ class MessagingService:
         
         # Add reactions to last message in conv1
         conv1.messages[-1].reactions = [{'emoji': '👍', 'count': 2}, {'emoji': '❤️', 'count': 1}]
+        conv1.messages[-1].invalidate()
         
         # Add messages to conv2
         messages_2 = [
@@ -165,11 +463,224 @@ class MessagingService:
         # Pin a message in conv1
         conv1.pin_message('msg_1_3')
         
+        # Alice and Bob are caught up; the team chat has news.
+        conv1.mark_read_up_to(conv1.messages[-1].sort_key)
+        conv2.mark_read_up_to(conv2.messages[-1].sort_key)
+        conv3.mark_read_up_to(conv3.get_message('msg_3_2').sort_key)
+        
         self._conversations = {
             'conv_1': conv1,
             'conv_2': conv2,
             'conv_3': conv3,
         }
+        
+        self._search_index.clear()
+        for conv in self._conversations.values():
+            for msg in conv.messages:
+                self._index_message(msg)
+    
+    def _index_message(self, msg):
+        self._search_index.add(msg.id, msg.conversation_id, msg.text, msg.timestamp.timestamp())
+    
+    def attach_store(self, store, sync_service=None):
+        """Serve conversations from a MessageStore instead of mock data.
+        
+        Open conversations keep a bounded window of recent messages that is
+        filled from ``fetch_history`` on first use and then kept fresh from
+        the store's ``on_message_batch``/``on_message_deleted`` events.
+        Sends are written through ``MessageSyncService``.
+        """
+        from src.services.message_sync_service import get_message_sync_service
+        
+        if self._store is not None:
+            self.detach_store()
+        
+        self._store = store
+        self._sync = sync_service or get_message_sync_service(store)
+        self._conversations = {}
+        self._hot.clear()
+        self._search_index.clear()
+        
+        for record in store.list_conversation_heads():
+            conv = Conversation(record['id'], record['title'] or record['id'])
+            latest = record['latest']
+            if latest is not None:
+                conv.last_message = (latest['body'] or '')[:50]
+                conv.last_message_key = Message.from_store(latest).sort_key
+            read_up_to_key = None
+            if record.get('read_up_to_at') is not None:
+                read_up_to_key = (datetime.fromtimestamp(record['read_up_to_at']), record['read_up_to_id'])
+            conv.restore_read_state(read_up_to_key, [
+                (unread['id'], (datetime.fromtimestamp(unread['created_at']), unread['id']))
+                for unread in record['unread']
+            ])
+            self._conversations[conv.id] = conv
+        
+        # Index existing history a page per frame so search covers every
+        # conversation without blocking the attach.
+        self._backfill = [[cid, None] for cid in self._conversations]
+        if self._backfill_event is None:
+            self._backfill_event = Clock.schedule_interval(self._backfill_search_index, 0)
+        
+        event_bus.bind(
+            on_message_batch=self._on_store_message_batch,
+            on_message_deleted=self._on_store_message_deleted,
+            on_conversation_updated=self._on_store_conversation_updated,
+        )
+    
+    def detach_store(self):
+        """Stop following the attached store and fall back to mock data."""
+        if self._store is None:
+            return
+        event_bus.unbind(
+            on_message_batch=self._on_store_message_batch,
+            on_message_deleted=self._on_store_message_deleted,
+            on_conversation_updated=self._on_store_conversation_updated,
+        )
+        if self._backfill_event is not None:
+            self._backfill_event.cancel()
+            self._backfill_event = None
+        self._backfill = []
+        self._store = None
+        self._sync = None
+        self._hot.clear()
+        self._init_mock_data()
+    
+    def _backfill_search_index(self, dt, page_size=200):
+        if self._store is None or not self._backfill:
+            self._backfill_event = None
+            return False
+        
+        entry = self._backfill[0]
+        conversation_id, cursor = entry
+        records = self._store.fetch_history(conversation_id, limit=page_size, before=cursor)
+        for record in records:
+            if record['id'] not in self._search_index:
+                self._index_message(Message.from_store(record))
+        
+        if len(records) < page_size:
+            self._backfill.pop(0)
+        else:
+            entry[1] = records[0]
+        
+        if not self._backfill:
+            self._backfill_event = None
+            return False
+        return True
+    
+    def _ensure_window(self, conv):
+        """Load the newest page of a store-backed conversation on first use."""
+        if self._store is None:
+            return
+        if not conv.loaded:
+            records = self._store.fetch_history(conv.id, limit=self.page_size)
+            conv.clear_window()
+            for record in records:
+                msg = Message.from_store(record)
+                # Unread state comes from the store's read marker, not the window.
+                conv.add_message(msg, count_unread=False)
+                self._index_message(msg)
+            conv.loaded = True
+            conv.has_older = len(records) >= self.page_size
+        
+        self._hot[conv.id] = True
+        self._hot.move_to_end(conv.id)
+        while len(self._hot) > self.max_hot_conversations:
+            cold_id, _ = self._hot.popitem(last=False)
+            cold = self._conversations.get(cold_id)
+            if cold is not None:
+                cold.clear_window()
+    
+    def load_older_messages(self, conversation_id, limit=None):
+        """Extend a store-backed window with the page before its oldest message."""
+        conv = self._conversations.get(conversation_id)
+        if not conv or self._store is None:
+            return []
+        self._ensure_window(conv)
+        if not conv.has_older or not conv.messages:
+            return []
+        
+        oldest = conv.messages[0]
+        limit = int(limit or self.page_size)
+        records = self._store.fetch_history(
+            conversation_id,
+            limit=limit,
+            before={'created_at': oldest.created_at, 'id': oldest.id},
+        )
+        page = [Message.from_store(r) for r in records]
+        conv.prepend_messages(page)
+        for msg in page:
+            self._index_message(msg)
+        conv.has_older = len(records) >= limit
+        return [m.to_dict() for m in page]
+    
+    def _on_store_conversation_updated(self, instance, conversation_id, conversation):
+        conv = self._conversations.get(conversation_id)
+        title = conversation.get('title') or conversation_id
+        if conv is None:
+            self._conversations[conversation_id] = Conversation(conversation_id, title)
+        else:
+            conv.name = title
+    
+    def _on_store_message_batch(self, instance, conversation_id, messages):
+        conv = self._conversations.get(conversation_id)
+        if conv is None:
+            conv = self._conversations[conversation_id] = Conversation(conversation_id, conversation_id)
+        
+        for record in messages:
+            msg = Message.from_store(record)
+            self._index_message(msg)
+            conv.note_unread(msg)
+            
+            if not conv.loaded:
+                # Cold conversation: only the summary is cached.
+                if conv.last_message_key is None or msg.sort_key >= conv.last_message_key:
+                    conv.last_message = msg.text[:50]
+                    conv.last_message_key = msg.sort_key
+                continue
+            
+            if conv.has_older and conv.messages and msg.sort_key < conv.messages[0].sort_key:
+                continue
+            
+            previous = conv.get_message(msg.id)
+            if conv.upsert_message(msg):
+                conv.trim(self.hot_window)
+                event_bus.dispatch('on_message_received', msg.to_dict())
+            elif previous is not None and previous.delivery_state != msg.delivery_state:
+                event_bus.dispatch('on_read_receipt', {
+                    'conversation_id': conversation_id,
+                    'message_id': msg.id,
+                    'state': msg.delivery_state,
+                })
+    
+    def _on_store_message_deleted(self, instance, conversation_id, message_id):
+        self._search_index.remove(message_id)
+        conv = self._conversations.get(conversation_id)
+        if conv is None:
+            return
+        conv.remove_message(message_id)
+        if not conv.loaded and conv.last_message_key is not None and conv.last_message_key[1] == message_id:
+            # Cold conversation lost its newest message: re-read the preview.
+            latest = self._store.fetch_history(conversation_id, limit=1) if self._store is not None else []
+            if latest:
+                conv.last_message = (latest[0]['body'] or '')[:50]
+                conv.last_message_key = Message.from_store(latest[0]).sort_key
+            else:
+                conv.last_message = ''
+                conv.last_message_key = None
+    
+    def _find_message(self, conversation_id, message_id):
+        """Look a message up in the cache, falling back to the store."""
+        conv = self._conversations.get(conversation_id)
+        if conv is not None:
+            msg = conv.get_message(message_id)
+            if msg is not None:
+                return msg
+        if self._store is not None:
+            record = self._store.get_message(message_id)
+            if record is not None and record['conversation_id'] == conversation_id:
+                return Message.from_store(record)
+        return None
     
     def start_service(self):
         """Start the messaging service."""
@@ -190,32 +701,139 @@ class MessagingService:
     
     def get_conversations(self):
         """Get list of conversations."""
-        return [
-            {
-                'id': conv.id,
-                'name': conv.name,
-                'last_message': conv.last_message,
-                'unread_count': conv.unread_count,
-            }
-            for conv in self._conversations.values()
-        ]
+        return [conv.summary() for conv in self._conversations.values()]
+    
+    def get_conversation_summaries(self, since=None):
+        """Return summaries changed after the ``since`` version token.
+        
+        The result carries a new ``version`` token to pass back next time;
+        ``since=None`` returns every conversation.
+        """
+        since = int(since or 0)
+        version = since
+        changed = []
+        for conv in self._conversations.values():
+            if conv.version > since:
+                changed.append(conv.summary())
+            version = max(version, conv.version)
+        return {'version': version, 'conversations': changed}
+    
+    def mark_read_up_to(self, conversation_id, message_id):
+        """Mark every message up to and including ``message_id`` as read.
+        
+        Returns the number of messages that became read.
+        """
+        conv = self._conversations.get(conversation_id)
+        if not conv:
+            return 0
+        msg = self._find_message(conversation_id, message_id)
+        if msg is None:
+            return 0
+        if self._store is not None and msg.created_at is not None:
+            self._store.set_read_marker(conversation_id, msg.created_at, msg.id)
+        return conv.mark_read_up_to(msg.sort_key)
     
-    def get_conversation_messages(self, conversation_id):
-        """Get messages for a conversation."""
+    def get_conversation_messages(self, conversation_id, limit=None, before=None, after=None):
+        """Get messages for a conversation, optionally as a window."""
         conv = self._conversations.get(conversation_id)
         if not conv:
             return []
         self._current_conversation_id = conversation_id
-        return [msg.to_dict() for msg in conv.messages]
+        self._ensure_window(conv)
+        return [msg.to_dict() for msg in conv.get_window(limit=limit, before=before, after=after)]
+    
+    def get_message(self, conversation_id, message_id):
+        """A single message as a dict, or None if it isn't in the conversation."""
+        msg = self._find_message(conversation_id, message_id)
+        return msg.to_dict() if msg is not None else None
+    
+    def fetch_page(self, conversation_id, before=None, after=None, limit=None):
+        """One page of messages next to a message id, oldest first.
+        
+        Unlike ``load_older_messages`` the page is not added to the cached
+        window, so scrolling far back doesn't grow it; messages the window
+        does hold are returned as their cached dicts. Store-backed services
+        read the page with a ``fetch_history`` cursor. To read the page off
+        the main thread, use ``page_reader`` and ``build_page`` instead.
+        """
+        read = self.page_reader(conversation_id, before=before, after=after, limit=limit)
+        return self.build_page(conversation_id, read())
+    
+    def page_reader(self, conversation_id, before=None, after=None, limit=None):
+        """The read half of ``fetch_page``, for running on a worker thread.
+        
+        Cached state is looked up here, on the main thread. The returned
+        zero-argument function only queries the MessageStore, so it is safe
+        to call from a worker; hand its result to ``build_page`` back on the
+        main thread.
+        """
+        conv = self._conversations.get(conversation_id)
+        if not conv:
+            return list
+        limit = int(limit or self.page_size)
+        cursor_id = before if before is not None else after
+        
+        if self._store is None:
+            if cursor_id is not None and conv.get_message(cursor_id) is None:
+                return list
+            window = conv.get_window(limit=limit, before=before, after=after)
+            return lambda: window
+        
+        store = self._store
+        anchor = conv.get_message(cursor_id) if cursor_id is not None else None
+        cursor = None
+        if anchor is not None and anchor.created_at is not None:
+            cursor = {'created_at': anchor.created_at, 'id': anchor.id}
+        
+        def read():
+            page_cursor = cursor
+            if cursor_id is not None and page_cursor is None:
+                record = store.get_message(cursor_id)
+                if record is None or record['conversation_id'] != conversation_id:
+                    return []
+                page_cursor = {'created_at': record['created_at'], 'id': record['id']}
+            return store.fetch_history(
+                conversation_id,
+                limit=limit,
+                before=page_cursor if before is not None else None,
+                after=page_cursor if after is not None else None,
+            )
+        
+        return read
+    
+    def build_page(self, conversation_id, records):
+        """Message dicts for what a ``page_reader`` returned; main thread only."""
+        conv = self._conversations.get(conversation_id)
+        page = []
+        for record in records:
+            if isinstance(record, Message):
+                page.append(record.to_dict())
+                continue
+            cached = conv.get_message(record['id']) if conv is not None else None
+            page.append((cached or Message.from_store(record)).to_dict())
+        return page
     
     def send_message(self, conversation_id, text):
-        """Send a message (mock)."""
+        """Send a message."""
         if conversation_id not in self._conversations:
             return False
         
+        if self._store is not None:
+            # The cache and on_message_received follow from the store event.
+            self._ensure_window(self._conversations[conversation_id])
+            self._sync.queue_outgoing_message(
+                conversation_id,
+                uuid.uuid4().hex,
+                sender_id='me',
+                body=text,
+            )
+            return True
+        
         conv = self._conversations[conversation_id]
-        msg = Message(f'msg_{conversation_id}_{len(conv.messages)}', text, is_outgoing=True)
-        conv.add_message(msg)
+        msg = Message(f'msg_{conversation_id}_{next(self._mock_ids)}', text, is_outgoing=True)
+        if not conv.add_message(msg):
+            return False
+        self._index_message(msg)
         
         # Emit event
         event_bus.dispatch('on_message_received', msg.to_dict())
@@ -234,49 +852,70 @@ class MessagingService:
         if not conv:
             return
         
-        for msg in conv.messages:
-            if msg.id == message_id and msg.is_outgoing:
-                msg.delivery_state = 'read'
-                event_bus.dispatch('on_read_receipt', {
-                    'message_id': message_id,
-                    'state': 'read',
-                })
-                break
+        if self._store is not None:
+            self._store.update_message_status(message_id, 'read')
+            return
+        
+        msg = conv.get_message(message_id)
+        if msg is not None and msg.is_outgoing:
+            msg.delivery_state = 'read'
+            msg.invalidate()
+            event_bus.dispatch('on_read_receipt', {
+                'conversation_id': conversation_id,
+                'message_id': message_id,
+                'state': 'read',
+            })
     
-    def search_messages(self, conversation_id, query):
-        """Search messages in a conversation."""
-        conv = self._conversations.get(conversation_id)
-        if not conv:
+    def search_messages(self, conversation_id, query, limit=50):
+        """Search messages in one conversation, or all when ``conversation_id`` is None.
+        
+        Query terms match word prefixes; results are ranked and carry
+        ``highlighted`` markup built from the matched token offsets.
+        """
+        if conversation_id is not None and conversation_id not in self._conversations:
             return []
         
-        results = []
-        for msg in conv.messages:
-            if query.lower() in msg.text.lower():
-                results.append({
-                    'message_id': msg.id,
-                    'text': msg.text,
-                    'highlighted': msg.text.replace(
-                        query, f'[b]{query}[/b]'
-                    ),
-                })
+        results = self._search_index.search(query, conversation_id=conversation_id, limit=limit)
         
         self._search_results = results
         event_bus.dispatch('on_search_results', results)
         return results
     
+    def delete_message(self, conversation_id, message_id):
+        """Delete a message."""
+        conv = self._conversations.get(conversation_id)
+        if not conv:
+            return False
+        
+        if self._store is not None:
+            # Cache and index follow from the store's on_message_deleted.
+            if self._find_message(conversation_id, message_id) is None:
+                return False
+            self._store.delete_message(message_id)
+            return True
+        
+        if conv.remove_message(message_id) is None:
+            return False
+        self._search_index.remove(message_id)
+        event_bus.emit_message_deleted(conversation_id, message_id)
+        return True
+    
     def pin_message(self, conversation_id, message_id):
         """Pin a message."""
         conv = self._conversations.get(conversation_id)
         if not conv:
             return False
         
-        # Unpin any currently pinned message
-        for msg in conv.messages:
-            if msg.is_pinned:
-                msg.is_pinned = False
-        
-        # Pin the new message
-        success = conv.pin_message(message_id)
+        # Pinning replaces any currently pinned message
+        if self._store is not None:
+            success = self._find_message(conversation_id, message_id) is not None
+            if success:
+                previous = conv.get_pinned_message()
+                if previous is not None and previous.id != message_id:
+                    self._store.set_message_pinned(previous.id, False)
+                self._store.set_message_pinned(message_id, True)
+        else:
+            success = conv.pin_message(message_id)
         if success:
             event_bus.dispatch('on_message_pinned', {
                 'conversation_id': conversation_id,
@@ -292,7 +931,12 @@ class MessagingService:
         if not conv:
             return False
         
-        success = conv.unpin_message(message_id)
+        if self._store is not None:
+            success = self._find_message(conversation_id, message_id) is not None
+            if success:
+                self._store.set_message_pinned(message_id, False)
+        else:
+            success = conv.unpin_message(message_id)
         if success:
             event_bus.dispatch('on_message_pinned', {
                 'conversation_id': conversation_id,
@@ -308,7 +952,12 @@ class MessagingService:
         if not conv:
             return False
         
-        success = conv.add_reaction(message_id, emoji)
+        if self._store is not None:
+            success = self._find_message(conversation_id, message_id) is not None
+            if success:
+                self._store.add_reaction(message_id, actor_id='me', emoji=emoji)
+        else:
+            success = conv.add_reaction(message_id, emoji)
         if success:
             event_bus.dispatch('on_message_reacted', {
                 'conversation_id': conversation_id,
@@ -326,23 +975,30 @@ class MessagingService:
         if not source_conv or not target_conv:
             return False
         
-        # Find the message
-        source_msg = None
-        for msg in source_conv.messages:
-            if msg.id == message_id:
-                source_msg = msg
-                break
-        
+        source_msg = self._find_message(conversation_id, message_id)
         if not source_msg:
             return False
         
+        if self._store is not None:
+            forwarded_id = uuid.uuid4().hex
+            self._sync.queue_outgoing_message(
+                target_conversation_id,
+                forwarded_id,
+                sender_id='me',
+                body=f'[Forwarded] {source_msg.text}',
+            )
+            self._store.set_message_forwarded(forwarded_id, True)
+            return True
+        
         # Create a forwarded copy
         forwarded = Message(
-            f'fwd_{message_id}',
+            f'fwd_{message_id}_{next(self._mock_ids)}',
             f'[Forwarded] {source_msg.text}',
             is_outgoing=True,
         )
-        target_conv.add_message(forwarded)
+        if not target_conv.add_message(forwarded):
+            return False
+        self._index_message(forwarded)
         event_bus.dispatch('on_message_received', forwarded.to_dict())
         
         return True
@@ -362,26 +1018,48 @@ class MessagingService:
         
         return True
     
+    def receive_message(self, conversation_id, text, message_id=None, sender_id=None, created_at=None):
+        """Ingest an incoming message from a peer.
+        
+        Store-backed services apply it through MessageSyncService; mock mode
+        adds it to the in-memory conversation directly.
+        """
+        conv = self._conversations.get(conversation_id)
+        if self._store is not None:
+            self._sync.apply_incoming_packet({
+                'message_id': message_id or uuid.uuid4().hex,
+                'conversation_id': conversation_id,
+                'sender_id': sender_id,
+                'body': text,
+                'created_at': created_at,
+            })
+            return True
+        
+        if not conv:
+            return False
+        
+        incoming_msg = Message(
+            message_id or f'msg_{conversation_id}_{next(self._mock_ids)}',
+            text,
+            is_outgoing=False,
+            timestamp=datetime.fromtimestamp(created_at) if created_at else None,
+        )
+        if not conv.add_message(incoming_msg):
+            return False
+        self._index_message(incoming_msg)
+        event_bus.dispatch('on_message_received', incoming_msg.to_dict())
+        return True
+    
     def _tick(self, dt):
         """Periodic service tick for mock events."""
         if not self._service_running or not self._current_conversation_id:
             return
+        if self._store is not None:
+            return
         
-        # Randomly simulate incoming messages or typing indicators
-        import random
-        
+        # Randomly simulate incoming messages
         if random.random() > 0.85:
-            # Simulate incoming message
-            conv_id = self._current_conversation_id
-            conv = self._conversations.get(conv_id)
-            if conv:
-                incoming_msg = Message(
-                    f'msg_{conv_id}_{len(conv.messages)}',
-                    'This is a mock incoming message!',
-                    is_outgoing=False,
-                )
-                conv.add_message(incoming_msg)
-                event_bus.dispatch('on_message_received', incoming_msg.to_dict())
+            self.receive_message(self._current_conversation_id, 'This is a mock incoming message!')
 
 
-messaging_service = MessagingService()
+messaging_service = services.register('messaging_service', MessagingService)
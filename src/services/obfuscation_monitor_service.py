@@ -1,9 +1,10 @@
 import random
-from kivy.clock import Clock, mainthread
+from src.utils.runtime import Clock
 from src.utils.event_bus import event_bus
 from src.services.tor_manager import tor_manager
 from src.services.smart_agent import smart_agent
 from src.services.obfuscation_config_service import obfuscation_config_service
+from src.services.registry import services
 
 
 class ObfuscationMonitorService:
@@ -155,7 +156,6 @@ class ObfuscationMonitorService:
                 event_bus.emit_obfuscation_warning('data_cap', 
                     f"Data usage at {usage_percent:.1f}% of cap ({data_used:.1f}/{data_cap} MB)")
 
-    @mainthread
     def _emit_state(self):
         state = {
             'packets_per_sec_history': self._packets_per_sec_history[-30:],
@@ -169,7 +169,7 @@ class ObfuscationMonitorService:
             'active_circuits': self._active_circuits,
             'error_log': self._error_log[:10],
         }
-        event_bus.emit_obfuscation_monitor(state)
+        event_bus.emit_threadsafe('on_obfuscation_monitor_update', state)
 
     def get_state(self):
         return {
@@ -186,4 +186,4 @@ class ObfuscationMonitorService:
         }
 
 
-obfuscation_monitor_service = ObfuscationMonitorService()
+obfuscation_monitor_service = services.register('obfuscation_monitor_service', ObfuscationMonitorService, depends=('tor_manager', 'smart_agent', 'obfuscation_config_service'))
@@ -2,13 +2,20 @@ import os
 import json
 import base64
 from typing import Any, Dict, Optional
-from kivy.storage.jsonstore import JsonStore
-from kivy.app import App
-from kivy.properties import BooleanProperty, NumericProperty, StringProperty, ObjectProperty
-from kivy.event import EventDispatcher
+from src.utils.runtime import (
+    BooleanProperty,
+    EventDispatcher,
+    JsonStore,
+    NumericProperty,
+    ObjectProperty,
+    StringProperty,
+    running_app,
+    user_data_dir,
+)
 
 from src.utils.event_bus import event_bus
 from src.theming.theme_manager import theme_manager
+from src.services.registry import services
 
 # Optional cryptography import - fall back to unencrypted storage if not available
 try:
@@ -99,13 +106,7 @@ class PreferencesStore(EventDispatcher):
 
     def _get_store_path(self) -> str:
         """Get the path to the preferences store file."""
-        app = App.get_running_app()
-        if app is not None and getattr(app, 'user_data_dir', None):
-            base_dir = app.user_data_dir
-        else:
-            base_dir = os.path.join(os.path.expanduser('~'), '.tor_dashboard')
-
-        os.makedirs(base_dir, exist_ok=True)
+        base_dir = user_data_dir('.tor_dashboard')
         return os.path.join(base_dir, 'preferences.enc')
 
     def _setup_encryption(self):
@@ -116,7 +117,7 @@ class PreferencesStore(EventDispatcher):
             
         # In a real app, you'd derive this from a user passphrase
         # For now, we'll use a deterministic key based on the app directory
-        app = App.get_running_app()
+        app = running_app()
         if app is not None:
             base_dir = os.path.dirname(self._get_store_path())
             password = base_dir.encode()
@@ -386,4 +387,4 @@ class PreferencesStore(EventDispatcher):
 
 
 # Global instance
-preferences_store = PreferencesStore()
\ No newline at end of file
+preferences_store = services.register('preferences_store', PreferencesStore)
\ No newline at end of file
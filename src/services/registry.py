@@ -0,0 +1,199 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from src.utils.boot_trace import boot_tracer
+from src.utils.runtime import Clock, Logger
+
+
+@dataclass
+class _ServiceSpec:
+    name: str
+    factory: Callable[[], Any]
+    depends: tuple[str, ...]
+    instance: Any = None
+    constructed: bool = False
+    trigger: str = ''
+    started_at: float = 0.0
+    self_seconds: float = 0.0
+    total_seconds: float = 0.0
+    children_seconds: float = field(default=0.0, repr=False)
+
+
+class ServiceProxy:
+    """Stand-in for a registered service that builds it on first use.
+
+    Attribute reads, writes and deletes are forwarded to the real instance,
+    so modules keep importing ``contact_service`` and friends as before.
+    ``isinstance``, truth tests, ``len``/``in``/iteration, equality and
+    hashing answer for the real instance too; only ``repr`` and
+    ``type()`` show the proxy.
+    """
+
+    __slots__ = ('_registry', '_name', '_target')
+
+    def __init__(self, registry: 'ServiceRegistry', name: str):
+        object.__setattr__(self, '_registry', registry)
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_target', None)
+
+    def _resolve(self):
+        target = object.__getattribute__(self, '_target')
+        if target is None:
+            target = self._registry.get(self._name)
+            object.__setattr__(self, '_target', target)
+        return target
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._resolve(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._resolve(), attr)
+
+    @property
+    def __class__(self):
+        return type(self._resolve())
+
+    def __bool__(self):
+        return bool(self._resolve())
+
+    def __len__(self):
+        return len(self._resolve())
+
+    def __iter__(self):
+        return iter(self._resolve())
+
+    def __contains__(self, item):
+        return item in self._resolve()
+
+    def __eq__(self, other):
+        if type(other) is ServiceProxy:
+            other = other._resolve()
+        return self._resolve() == other
+
+    def __hash__(self):
+        return hash(self._resolve())
+
+    def __repr__(self):
+        state = 'ready' if self._registry.is_constructed(self._name) else 'pending'
+        return f'<ServiceProxy {self._name} ({state})>'
+
+
+class ServiceRegistry:
+    """Constructs application services on first access.
+
+    Services register a zero-argument factory plus the names of the
+    services it needs; dependencies are built first. ``warm_up`` builds
+    whatever is still pending one service per frame, so the remaining cost
+    lands after the first paint instead of before it. Each construction is
+    timed (``self`` excludes dependencies built meanwhile) for
+    ``startup_report``.
+    """
+
+    def __init__(self):
+        self._specs: dict[str, _ServiceSpec] = {}
+        self._order: list[str] = []
+        self._building: list[_ServiceSpec] = []
+        self._warm_event = None
+        self._warm_queue: list[str] = []
+        self._boot_started = time.perf_counter()
+
+    def register(self, name: str, factory: Callable[[], Any], *, depends: Iterable[str] = ()) -> ServiceProxy:
+        if name in self._specs:
+            raise ValueError(f'Service {name!r} is already registered')
+        self._specs[name] = _ServiceSpec(name, factory, tuple(depends))
+        return ServiceProxy(self, name)
+
+    def names(self) -> list[str]:
+        return list(self._specs)
+
+    def is_constructed(self, name: str) -> bool:
+        return self._specs[name].constructed
+
+    def get(self, name: str, *, trigger: str = 'access') -> Any:
+        spec = self._specs.get(name)
+        if spec is None:
+            raise KeyError(f'Unknown service {name!r}')
+        if spec.constructed:
+            return spec.instance
+        if spec in self._building:
+            cycle = ' -> '.join([s.name for s in self._building] + [name])
+            raise RuntimeError(f'Service dependency cycle: {cycle}')
+
+        self._building.append(spec)
+        spec.started_at = time.perf_counter()
+        spec.children_seconds = 0.0
+        try:
+            with boot_tracer.span(f'service {name}', 'service', trigger=trigger):
+                for dependency in spec.depends:
+                    self.get(dependency, trigger=f'dependency of {name}')
+                spec.instance = spec.factory()
+        finally:
+            self._building.pop()
+        spec.total_seconds = time.perf_counter() - spec.started_at
+        spec.self_seconds = spec.total_seconds - spec.children_seconds
+        if self._building:
+            self._building[-1].children_seconds += spec.total_seconds
+        spec.trigger = trigger
+        spec.constructed = True
+        self._order.append(name)
+        return spec.instance
+
+    def warm_up(self, names: Iterable[str] | None = None, *, per_frame: int = 1):
+        """Build pending services ``per_frame`` at a time on successive frames."""
+        pending = [n for n in (names if names is not None else self._specs) if not self._specs[n].constructed]
+        self._warm_queue.extend(n for n in pending if n not in self._warm_queue)
+        if self._warm_event is not None or not self._warm_queue:
+            return
+
+        def _step(dt):
+            for _ in range(max(1, int(per_frame))):
+                while self._warm_queue and self._specs[self._warm_queue[0]].constructed:
+                    self._warm_queue.pop(0)
+                if not self._warm_queue:
+                    break
+                self.get(self._warm_queue.pop(0), trigger='warm-up')
+            if self._warm_queue:
+                return True
+            self._warm_event = None
+            Logger.info('Services: warm-up finished\n' + self.format_startup_report())
+            return False
+
+        self._warm_event = Clock.schedule_interval(_step, 0)
+
+    def cancel_warm_up(self):
+        if self._warm_event is not None:
+            self._warm_event.cancel()
+            self._warm_event = None
+        self._warm_queue.clear()
+
+    def startup_report(self) -> list[dict[str, Any]]:
+        """Constructed services in build order, then the ones never needed."""
+        rows = []
+        for name in self._order + [n for n in self._specs if n not in self._order]:
+            spec = self._specs[name]
+            rows.append({
+                'name': name,
+                'constructed': spec.constructed,
+                'trigger': spec.trigger,
+                'depends': list(spec.depends),
+                'started_at': spec.started_at - self._boot_started if spec.constructed else None,
+                'self_ms': spec.self_seconds * 1000.0,
+                'total_ms': spec.total_seconds * 1000.0,
+            })
+        return rows
+
+    def format_startup_report(self) -> str:
+        lines = [f"{'service':<30} {'self ms':>9} {'total ms':>9}  trigger"]
+        for row in self.startup_report():
+            if not row['constructed']:
+                lines.append(f"{row['name']:<30} {'-':>9} {'-':>9}  not constructed")
+                continue
+            lines.append(f"{row['name']:<30} {row['self_ms']:>9.1f} {row['total_ms']:>9.1f}  {row['trigger']}")
+        return '\n'.join(lines)
+
+
+services = ServiceRegistry()
@@ -0,0 +1,191 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+# send(msg, done) hands a message to the transport; the transport calls
+# done(ok) once it knows the outcome, either synchronously or later.
+SendFn = Callable[[dict[str, Any], Callable[[bool], None]], None]
+
+
+@dataclass
+class _Partition:
+    pending: deque = field(default_factory=deque)
+    in_flight: set = field(default_factory=set)
+    blocked_until: float = 0.0
+
+
+class SendScheduler:
+    """Outbox scheduler that is concurrent across partitions and FIFO within one.
+
+    Messages are partitioned by conversation (or any ``partition_key``). At
+    most ``max_in_flight`` messages are with the transport overall and at most
+    ``window`` per partition, so a slow peer only holds its own slots. A
+    failed send is put back at the head of its partition, which is then held
+    for an exponential backoff so later messages cannot overtake it.
+    """
+
+    def __init__(
+        self,
+        send: SendFn,
+        *,
+        max_in_flight: int = 8,
+        window: int = 1,
+        partition_key: Callable[[dict[str, Any]], str] | None = None,
+        on_failed: Callable[[dict[str, Any], float, int], None] | None = None,
+        base_retry_delay: float = 2.0,
+        max_retry_delay: float = 300.0,
+    ):
+        self._send = send
+        self._max_in_flight = max(1, int(max_in_flight))
+        self._window = max(1, int(window))
+        self._partition_key = partition_key or (lambda msg: str(msg['conversation_id']))
+        self._on_failed = on_failed
+        self._base_retry_delay = float(base_retry_delay)
+        self._max_retry_delay = float(max_retry_delay)
+
+        self._partitions: dict[str, _Partition] = {}
+        self._messages: dict[str, dict[str, Any]] = {}
+        self._attempts: dict[str, int] = {}
+        self._in_flight_total = 0
+        self._paused = False
+        self._pumping = False
+        self._repump = False
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight_total
+
+    def pause(self):
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+
+    def is_known(self, message_id: str) -> bool:
+        return message_id in self._messages
+
+    def enqueue(self, msg: dict[str, Any]) -> bool:
+        mid = str(msg['id'])
+        if mid in self._messages:
+            return False
+        key = self._partition_key(msg)
+        part = self._partitions.get(key)
+        if part is None:
+            part = self._partitions[key] = _Partition()
+        part.pending.append(mid)
+        self._messages[mid] = msg
+        return True
+
+    def pump(self) -> int:
+        """Hand as many messages to the transport as the limits allow."""
+        if self._pumping:
+            self._repump = True
+            return 0
+
+        self._pumping = True
+        sent = 0
+        try:
+            while True:
+                self._repump = False
+                sent += self._pump_round_robin()
+                if not self._repump:
+                    break
+        finally:
+            self._pumping = False
+        return sent
+
+    def _pump_round_robin(self) -> int:
+        sent = 0
+        progressed = True
+        while progressed and not self._paused and self._in_flight_total < self._max_in_flight:
+            progressed = False
+            now = time.time()
+            for key, part in list(self._partitions.items()):
+                if self._in_flight_total >= self._max_in_flight or self._paused:
+                    break
+                if not part.pending or len(part.in_flight) >= self._window:
+                    continue
+                if part.blocked_until > now:
+                    continue
+
+                # Move the served partition to the back so the next free slot
+                # goes to whichever conversation has waited longest.
+                del self._partitions[key]
+                self._partitions[key] = part
+
+                mid = part.pending.popleft()
+                part.in_flight.add(mid)
+                self._in_flight_total += 1
+                self._attempts[mid] = self._attempts.get(mid, 0) + 1
+                sent += 1
+                progressed = True
+                self._send(self._messages[mid], self._make_done(key, mid))
+        return sent
+
+    def _make_done(self, key: str, mid: str) -> Callable[[bool], None]:
+        called = False
+
+        def _done(ok: bool):
+            nonlocal called
+            if called:
+                return
+            called = True
+            self._complete(key, mid, bool(ok))
+
+        return _done
+
+    def _complete(self, key: str, mid: str, ok: bool):
+        part = self._partitions.get(key)
+        if part is None or mid not in part.in_flight:
+            return
+        part.in_flight.discard(mid)
+        self._in_flight_total -= 1
+
+        if ok or mid not in self._messages:
+            self._messages.pop(mid, None)
+            self._attempts.pop(mid, None)
+            if not part.pending and not part.in_flight:
+                self._partitions.pop(key, None)
+        else:
+            attempts = self._attempts.get(mid, 1)
+            delay = min(self._max_retry_delay, self._base_retry_delay * (2 ** (attempts - 1)))
+            part.pending.appendleft(mid)
+            part.blocked_until = time.time() + delay
+            if self._on_failed is not None:
+                self._on_failed(self._messages[mid], delay, attempts)
+
+        self.pump()
+
+    def discard(self, message_id: str):
+        """Forget a message that is no longer sendable (e.g. deleted)."""
+        if self._messages.pop(message_id, None) is None:
+            return
+        self._attempts.pop(message_id, None)
+        for key, part in list(self._partitions.items()):
+            if message_id in part.pending:
+                part.pending.remove(message_id)
+                if not part.pending and not part.in_flight:
+                    self._partitions.pop(key, None)
+                break
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Per-partition queue depth, in-flight count and head-of-line age."""
+        now = time.time()
+        out: dict[str, dict[str, Any]] = {}
+        for key, part in self._partitions.items():
+            oldest = None
+            head = [part.pending[0]] if part.pending else []
+            for mid in list(part.in_flight) + head:
+                msg = self._messages.get(mid)
+                created = msg.get('created_at') if msg is not None else None
+                if created is not None and (oldest is None or created < oldest):
+                    oldest = float(created)
+            out[key] = {
+                'queued': len(part.pending),
+                'in_flight': len(part.in_flight),
+                'oldest_age': (now - oldest) if oldest is not None else 0.0,
+                'blocked_for': max(0.0, part.blocked_until - now),
+            }
+        return out
@@ -1,12 +1,11 @@
-from kivy.clock import Clock, mainthread
+from src.utils.runtime import Clock
 from src.utils.event_bus import event_bus
 import random
 from datetime import datetime, time
 import random
 
-from kivy.clock import Clock
-
 from src.utils.event_bus import event_bus
+from src.services.registry import services
 
 
 class SmartAIAgent:
@@ -53,6 +52,9 @@ class SmartAIAgent:
         
         # Traffic rate data for graph
         self.traffic_rate_history = []
+
+        self._sensitive_active = False
+        self._clear_sensitive_event = None
         
     def activate(self):
         self.active = True
@@ -136,7 +138,6 @@ class SmartAIAgent:
             
         self.battery_impact = int(min(100, base_impact))
         
-    @mainthread
     def _emit_state(self):
         """Emit current state to event bus"""
         state = {
@@ -158,7 +159,7 @@ class SmartAIAgent:
             'sample_sites': self.sample_sites,
             'traffic_rate_history': self.traffic_rate_history[-20:],  # Last 20 data points
         }
-        event_bus.emit_traffic_obfuscation_update(state)
+        event_bus.emit_threadsafe('on_traffic_obfuscation_update', state)
         
     def _update_metrics(self, dt):
         """Update metrics periodically (Clock-safe callback)"""
@@ -250,4 +251,4 @@ class SmartAIAgent:
         event_bus.emit_sensitive_comms(False, '')
 
 
-smart_agent = SmartAIAgent()
+smart_agent = services.register('smart_agent', SmartAIAgent)
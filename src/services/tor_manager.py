@@ -1,8 +1,9 @@
 import random
 import string
-from kivy.clock import Clock
+from src.utils.runtime import Clock
 from src.utils.event_bus import event_bus
 from src.services.tor_settings_store import tor_settings_store
+from src.services.registry import services
 
 
 class TorManager:
@@ -277,4 +278,4 @@ class TorManager:
         return ''.join(random.choice(string.ascii_lowercase + '234567') for _ in range(56)) + '.onion'
 
 
-tor_manager = TorManager()
+tor_manager = services.register('tor_manager', TorManager, depends=('tor_settings_store',))
@@ -1,7 +1,7 @@
 import os
-from kivy.storage.jsonstore import JsonStore
-from kivy.app import App
+from src.utils.runtime import JsonStore, user_data_dir
 from src.utils.event_bus import event_bus
+from src.services.registry import services
 
 
 class TorSettingsStore:
@@ -20,13 +20,7 @@ class TorSettingsStore:
             )
 
     def _get_store_path(self):
-        app = App.get_running_app()
-        if app is not None and getattr(app, 'user_data_dir', None):
-            base_dir = app.user_data_dir
-        else:
-            base_dir = os.path.join(os.path.expanduser('~'), '.tor_dashboard')
-
-        os.makedirs(base_dir, exist_ok=True)
+        base_dir = user_data_dir('.tor_dashboard')
         return os.path.join(base_dir, 'tor_settings.json')
 
     def get_settings(self):
@@ -40,4 +34,4 @@ class TorSettingsStore:
         return settings
 
 
-tor_settings_store = TorSettingsStore()
+tor_settings_store = services.register('tor_settings_store', TorSettingsStore)
@@ -0,0 +1,172 @@
+import time
+from typing import Any, Callable, Hashable
+
+from src.utils.runtime import Clock
+
+from src.utils.event_bus import event_bus
+from src.services.registry import services
+
+
+class TimerWheel:
+    """Hashed timing wheel: one periodic tick expires every armed key.
+
+    Re-arming a key only updates its deadline and drops it into a new slot;
+    stale slot entries are ignored when their slot comes round.
+    """
+
+    def __init__(self, on_expire: Callable[[Hashable], None], *, resolution: float = 0.5, slots: int = 64):
+        self._on_expire = on_expire
+        self._resolution = float(resolution)
+        self._slots: list[set] = [set() for _ in range(int(slots))]
+        self._deadlines: dict[Hashable, float] = {}
+        self._cursor_tick: int | None = None
+        self._event = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def arm(self, key: Hashable, delay: float, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        deadline = now + float(delay)
+        self._deadlines[key] = deadline
+        self._slots[self._tick_of(deadline) % len(self._slots)].add(key)
+        if self._cursor_tick is None:
+            self._cursor_tick = self._tick_of(now)
+        self._ensure_running()
+
+    def cancel(self, key: Hashable):
+        self._deadlines.pop(key, None)
+        if not self._deadlines:
+            self._stop()
+
+    def advance(self, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        if self._cursor_tick is None:
+            return
+
+        target = self._tick_of(now)
+        # Never walk more than one full revolution; every slot is visited.
+        start = max(self._cursor_tick, target - len(self._slots) + 1)
+        for tick in range(start, target + 1):
+            slot = self._slots[tick % len(self._slots)]
+            for key in list(slot):
+                deadline = self._deadlines.get(key)
+                if deadline is None:
+                    slot.discard(key)
+                elif deadline <= now:
+                    slot.discard(key)
+                    del self._deadlines[key]
+                    self._on_expire(key)
+                elif self._tick_of(deadline) % len(self._slots) != tick % len(self._slots):
+                    slot.discard(key)
+        # Stay on the current tick: keys armed later in this tick land here.
+        self._cursor_tick = target
+
+        if not self._deadlines:
+            self._stop()
+
+    def _tick_of(self, t: float) -> int:
+        return int(t // self._resolution)
+
+    def _ensure_running(self):
+        if self._event is None:
+            self._event = Clock.schedule_interval(lambda dt: self.advance(), self._resolution)
+
+    def _stop(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        self._cursor_tick = None
+        for slot in self._slots:
+            slot.clear()
+
+
+class TypingStateManager:
+    """Throttles outgoing typing signals and expires remote typing states.
+
+    Local keystrokes send at most one "typing" signal per ``send_interval``
+    per conversation, and a "stopped" signal once input goes idle. Remote
+    states expire after ``remote_ttl`` unless refreshed. ``on_typing_state``
+    is only emitted when a peer's state actually changes.
+    """
+
+    def __init__(
+        self,
+        *,
+        send_interval: float = 3.0,
+        local_idle_timeout: float = 5.0,
+        remote_ttl: float = 6.0,
+        resolution: float = 0.5,
+    ):
+        self._send_interval = float(send_interval)
+        self._local_idle_timeout = float(local_idle_timeout)
+        self._remote_ttl = float(remote_ttl)
+
+        self._signal_sender: Callable[[str, bool], Any] | None = None
+        self._last_sent: dict[str, float] = {}
+        self._remote: set[tuple[str, str]] = set()
+        self._wheel = TimerWheel(self._on_expire, resolution=resolution)
+
+    def set_signal_sender(self, sender: Callable[[str, bool], Any] | None):
+        self._signal_sender = sender
+
+    def note_local_typing(self, conversation_id: str, is_typing: bool, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        key = ('local', conversation_id)
+
+        if not is_typing:
+            self._wheel.cancel(key)
+            if self._last_sent.pop(conversation_id, None) is not None:
+                self._send(conversation_id, False)
+            return
+
+        self._wheel.arm(key, self._local_idle_timeout, now)
+        last = self._last_sent.get(conversation_id)
+        if last is None or now - last >= self._send_interval:
+            self._last_sent[conversation_id] = now
+            self._send(conversation_id, True)
+
+    def apply_remote_typing(self, conversation_id: str, peer_id: str, is_typing: bool, now: float | None = None):
+        pair = (conversation_id, peer_id)
+        key = ('remote', conversation_id, peer_id)
+
+        if is_typing:
+            self._wheel.arm(key, self._remote_ttl, now)
+            if pair not in self._remote:
+                self._remote.add(pair)
+                event_bus.emit_typing_state(conversation_id, peer_id, True)
+        else:
+            self._wheel.cancel(key)
+            if pair in self._remote:
+                self._remote.discard(pair)
+                event_bus.emit_typing_state(conversation_id, peer_id, False)
+
+    def is_peer_typing(self, conversation_id: str, peer_id: str) -> bool:
+        return (conversation_id, peer_id) in self._remote
+
+    def typing_peers(self, conversation_id: str) -> list[str]:
+        return sorted(peer for conv, peer in self._remote if conv == conversation_id)
+
+    def tick(self, now: float | None = None):
+        self._wheel.advance(now)
+
+    def _on_expire(self, key):
+        if key[0] == 'local':
+            conversation_id = key[1]
+            if self._last_sent.pop(conversation_id, None) is not None:
+                self._send(conversation_id, False)
+        else:
+            _, conversation_id, peer_id = key
+            if (conversation_id, peer_id) in self._remote:
+                self._remote.discard((conversation_id, peer_id))
+                event_bus.emit_typing_state(conversation_id, peer_id, False)
+
+    def _send(self, conversation_id: str, is_typing: bool):
+        if self._signal_sender is not None:
+            self._signal_sender(conversation_id, is_typing)
+
+
+typing_state_manager = services.register('typing_state_manager', TypingStateManager)
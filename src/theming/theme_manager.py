@@ -1,5 +1,4 @@
-from kivy.event import EventDispatcher
-from kivy.properties import ColorProperty, OptionProperty, ObjectProperty
+from src.utils.runtime import ColorProperty, EventDispatcher, ObjectProperty, OptionProperty
 from src.theming.tokens import ColorPalette, Typography, Spacing
 from src.utils.event_bus import event_bus
 
@@ -1,4 +1,4 @@
-from kivy.utils import get_color_from_hex
+from src.utils.runtime import get_color_from_hex
 
 class ColorPalette:
     # Common colors
@@ -0,0 +1,166 @@
+"""Opt-in startup tracer that writes Chrome trace JSON.
+
+Set ``TOR_DASHBOARD_BOOT_TRACE=<path>`` to record module imports, service
+construction, ``build()``, screen construction and service start-up; the
+file opens in chrome://tracing or Perfetto. With
+``TOR_DASHBOARD_BOOT_EXIT=1`` the app also stops right after boot, which
+is what ``benchmark_cold_start.py`` relies on.
+
+This module only uses the standard library so it can be installed before
+anything else is imported.
+"""
+import atexit
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, tracer: 'BootTracer', name: str, cat: str, args: dict[str, Any] | None):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.cat, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class BootTracer:
+    """Collects complete ("X") and instant ("i") events on the monotonic clock."""
+
+    def __init__(self):
+        self.enabled = False
+        self.exit_after_boot = False
+        self.path: str | None = None
+        self._origin = time.perf_counter()
+        self._events: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._original_import = None
+
+    def enable(self, path: str | None = None, *, trace_imports: bool = True):
+        self.enabled = True
+        self.path = path
+        self._origin = time.perf_counter()
+        if trace_imports:
+            self._install_import_hook()
+
+    def _ts(self, t: float) -> float:
+        return (t - self._origin) * 1e6
+
+    def span(self, name: str, cat: str = 'boot', **args):
+        """Context manager timing a block; a shared no-op when tracing is off."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args or None)
+
+    def complete(self, name: str, cat: str, start: float, end: float, args: dict[str, Any] | None = None):
+        event = {
+            'name': name,
+            'cat': cat,
+            'ph': 'X',
+            'ts': self._ts(start),
+            'dur': (end - start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+        if args:
+            event['args'] = args
+        with self._lock:
+            self._events.append(event)
+
+    def mark(self, name: str, cat: str = 'boot', **args):
+        if not self.enabled:
+            return
+        event = {
+            'name': name,
+            'cat': cat,
+            'ph': 'i',
+            's': 'p',
+            'ts': self._ts(time.perf_counter()),
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+        if args:
+            event['args'] = args
+        with self._lock:
+            self._events.append(event)
+
+    def events(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return list(self._events)
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        meta = {'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': 'tor_dashboard boot'}}
+        return {'traceEvents': [meta, *self.events()], 'displayTimeUnit': 'ms'}
+
+    def write(self, path: str | None = None):
+        path = path or self.path
+        if not path or not self.enabled:
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    # Imports are timed by wrapping __import__: only modules not yet in
+    # sys.modules are recorded, and only src.* or the first import into a
+    # new top-level package, so the trace shows kivy/cryptography/qrcode
+    # next to the app's modules without every submodule of theirs.
+
+    def _install_import_hook(self):
+        if self._original_import is not None:
+            return
+        original = self._original_import = builtins.__import__
+        tracer = self
+
+        def _traced_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules or not (
+                name.startswith('src.') or name.partition('.')[0] not in sys.modules
+            ):
+                return original(name, globals, locals, fromlist, level)
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                tracer.complete(f'import {name}', 'import', start, time.perf_counter())
+
+        builtins.__import__ = _traced_import
+
+    def uninstall_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+
+boot_tracer = BootTracer()
+
+
+def install_from_env():
+    """Enable the tracer when TOR_DASHBOARD_BOOT_TRACE names an output file."""
+    path = os.environ.get('TOR_DASHBOARD_BOOT_TRACE')
+    if not path or boot_tracer.enabled:
+        return
+    boot_tracer.enable(path)
+    boot_tracer.exit_after_boot = os.environ.get('TOR_DASHBOARD_BOOT_EXIT', '').lower() in ('1', 'true', 'yes')
+    atexit.register(boot_tracer.write)
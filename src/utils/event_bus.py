@@ -1,7 +1,82 @@
-from kivy.event import EventDispatcher
+import time
+import weakref
+from collections import OrderedDict, deque
+from typing import Any, Callable, Hashable, Literal
+
+from src.utils.runtime import Clock, EventDispatcher
+
+from src.utils.event_metrics import EventBusMetrics
+from src.utils.weak_binding import live_subscriber_counts
+
+
+CoalesceMode = Literal['latest', 'concat']
+
+
+def _first_arg(args):
+    return args[0]
+
+
+def _payload_conversation(args):
+    return args[0].get('conversation_id')
+
+
+def _callback_ref(callback):
+    # Bound methods are held weakly so a subscription never keeps a widget alive.
+    if hasattr(callback, '__self__') and hasattr(callback, '__func__'):
+        return weakref.WeakMethod(callback)
+    return lambda: callback
+
+
+# How to find the entity an event is about, for keyed subscriptions.
+_EVENT_KEYS: dict[str, Callable[[tuple], Hashable]] = {
+    'on_conversation_updated': _first_arg,
+    'on_message_batch': _first_arg,
+    'on_message_deleted': _first_arg,
+    'on_typing_state': _first_arg,
+    'on_receipt_update': _first_arg,
+    'on_message_received': _payload_conversation,
+    'on_typing_indicator': _payload_conversation,
+    'on_read_receipt': _payload_conversation,
+    'on_message_reacted': _payload_conversation,
+    'on_message_pinned': _payload_conversation,
+    'on_contact_added': _first_arg,
+    'on_contact_deleted': _first_arg,
+    'on_contact_updated': _first_arg,
+    'on_contact_favorited': _first_arg,
+    'on_contact_blocked': _first_arg,
+    'on_contact_muted': _first_arg,
+    'on_contact_archived': _first_arg,
+    'on_contact_verified': _first_arg,
+    'on_contact_presence_updated': _first_arg,
+    'on_contact_imported': _first_arg,
+}
 
 
 class EventBus(EventDispatcher):
+    """Application-wide event dispatcher.
+
+    Events dispatch synchronously unless their type is switched to a
+    coalescing mode with ``set_coalescing``. Coalesced emits are merged
+    and delivered once per frame: ``'latest'`` keeps only the newest
+    arguments (state snapshots), ``'concat'`` joins the list in the last
+    argument for emits whose leading arguments match (batches).
+
+    Worker threads use ``emit_threadsafe``, which only appends to a deque;
+    the same per-frame callback drains it on the main thread.
+
+    ``subscribe(event_type, callback, key=...)`` delivers only the events
+    about one conversation or contact, found with a dict lookup instead of
+    every handler filtering every event. Bound-method subscribers are held
+    weakly and dropped once their object is collected.
+
+    State topics are sticky: the bus keeps their last payload and replays
+    it to every new ``bind``/``fbind`` handler, and ``publish_state`` drops
+    emits that repeat it, so producers only need to emit on change.
+
+    ``enable_instrumentation`` records per-topic rates and payload sizes and
+    times each handler individually, logging the ones over budget.
+    """
+
     _instance = None
 
     def __new__(cls):
@@ -60,8 +135,247 @@ class EventBus(EventDispatcher):
         self.register_event_type('on_app_onboarding_complete')
         self.register_event_type('on_identity_ready')
 
+        self._coalesce: dict[str, CoalesceMode] = {}
+        self._pending: OrderedDict = OrderedDict()
+        self._flush_trigger = Clock.create_trigger(lambda dt: self.flush(), 0)
+
+        self._keyed: dict[str, dict[Hashable, list[Callable[[], Any]]]] = {}
+        self._metrics: EventBusMetrics | None = None
+        self._sticky: set[str] = set()
+        self._last_values: dict[str, tuple[tuple, dict]] = {}
+
+        # deque.append/popleft are atomic, so producers never take a lock.
+        self._threadsafe_queue: deque = deque()
+        self.threadsafe_limit = 4096
+        self.threadsafe_dropped = 0
+
+        # Periodic full-state snapshots: only the newest one matters.
+        for event_type in (
+            'on_tor_status_update',
+            'on_tor_state_update',
+            'on_traffic_status_update',
+            'on_traffic_obfuscation_update',
+            'on_max_ai_state_update',
+            'on_obfuscation_monitor_update',
+        ):
+            self.set_coalescing(event_type, 'latest')
+            self.set_sticky(event_type)
+
         self._initialized = True
 
+    def set_sticky(self, event_type: str, sticky: bool = True):
+        """Keep the last payload of ``event_type`` and replay it to new handlers."""
+        if sticky:
+            self._sticky.add(event_type)
+        else:
+            self._sticky.discard(event_type)
+            self._last_values.pop(event_type, None)
+
+    def last_value(self, event_type: str) -> tuple | None:
+        """Positional arguments of the last emit of a sticky topic, if any."""
+        last = self._last_values.get(event_type)
+        return last[0] if last is not None else None
+
+    def publish_state(self, event_type: str, *args, **kwargs) -> bool:
+        """Emit a sticky topic only if the payload differs from the last one."""
+        if self._last_values.get(event_type) == (args, kwargs):
+            return False
+        self.dispatch(event_type, *args, **kwargs)
+        return True
+
+    def _replay_value(self, event_type):
+        # A coalesced emit still waiting for the flush reaches the new
+        # handler then; replaying it now would deliver the payload twice.
+        if any(key[0] == event_type for key in self._pending):
+            return None
+        return self._last_values.get(event_type)
+
+    def bind(self, **kwargs):
+        super().bind(**kwargs)
+        for event_type, callback in kwargs.items():
+            last = self._replay_value(event_type)
+            if last is not None:
+                callback(self, *last[0], **last[1])
+
+    def fbind(self, name, func, *largs, **kwargs):
+        uid = super().fbind(name, func, *largs, **kwargs)
+        last = self._replay_value(name)
+        if last is not None:
+            func(*largs, self, *last[0], **{**kwargs, **last[1]})
+        return uid
+
+    def set_coalescing(self, event_type: str, mode: CoalesceMode | None):
+        """Switch an event type to per-frame coalescing, or back to sync with None."""
+        if mode is None:
+            self._coalesce.pop(event_type, None)
+            for key in [k for k in self._pending if k[0] == event_type]:
+                args, kwargs = self._pending.pop(key)
+                self._deliver(event_type, args, kwargs)
+            return
+        if mode not in ('latest', 'concat'):
+            raise ValueError(f'Unknown coalescing mode {mode!r}')
+        self._coalesce[event_type] = mode
+
+    def subscribe(self, event_type: str, callback: Callable[..., Any], *, key: Hashable):
+        """Call ``callback(bus, *args)`` only for ``event_type`` events about ``key``."""
+        if event_type not in _EVENT_KEYS:
+            raise ValueError(f'{event_type} does not support keyed subscriptions')
+        refs = self._keyed.setdefault(event_type, {}).setdefault(key, [])
+        if not any(ref() == callback for ref in refs):
+            refs.append(_callback_ref(callback))
+
+    def unsubscribe(self, event_type: str, callback: Callable[..., Any], *, key: Hashable):
+        self._prune_keyed(event_type, key, lambda cb: cb == callback)
+
+    def _prune_keyed(self, event_type, key, drop=lambda cb: False):
+        by_key = self._keyed.get(event_type)
+        if not by_key or key not in by_key:
+            return
+        refs = by_key[key]
+        refs[:] = [ref for ref in refs if ref() is not None and not drop(ref())]
+        if not refs:
+            del by_key[key]
+            if not by_key:
+                del self._keyed[event_type]
+
+    def _keyed_callbacks(self, event_type, args):
+        by_key = self._keyed.get(event_type)
+        if not by_key:
+            return ()
+        key = _EVENT_KEYS[event_type](args)
+        refs = by_key.get(key)
+        if not refs:
+            return ()
+        callbacks = [ref() for ref in refs]
+        if None in callbacks:
+            self._prune_keyed(event_type, key)
+            callbacks = [cb for cb in callbacks if cb is not None]
+        return callbacks
+
+    def subscriber_counts(self) -> dict[str, int]:
+        """Live bound handlers plus keyed subscribers, per event type."""
+        counts = live_subscriber_counts(self)
+        for event_type, by_key in self._keyed.items():
+            live = sum(1 for refs in by_key.values() for ref in refs if ref() is not None)
+            if live:
+                counts[event_type] = counts.get(event_type, 0) + live
+        return counts
+
+    def enable_instrumentation(
+        self,
+        *,
+        slow_handler_ms: float = 8.0,
+        dump_interval: float | None = None,
+        dump_path: str | None = None,
+    ) -> EventBusMetrics:
+        """Start recording metrics, optionally dumping them every ``dump_interval`` seconds."""
+        self.disable_instrumentation()
+        self._metrics = EventBusMetrics(slow_handler_ms=slow_handler_ms)
+        if dump_interval:
+            self._metrics.start_dump(dump_interval, dump_path)
+        return self._metrics
+
+    def disable_instrumentation(self):
+        if self._metrics is not None:
+            self._metrics.stop_dump()
+            self._metrics = None
+
+    def instrumentation_snapshot(self) -> dict[str, Any]:
+        return self._metrics.snapshot() if self._metrics is not None else {}
+
+    def _deliver_instrumented(self, event_type, args, kwargs):
+        # Mirrors EventDispatcher.dispatch (newest binding first, stop on a
+        # True return, then the default handler) so each handler is timed.
+        metrics = self._metrics
+        started = time.perf_counter()
+        result = None
+        for callback, largs, bound_kwargs, is_ref, _uid in reversed(
+            self.get_property_observers(event_type, args=True)
+        ):
+            func = callback() if is_ref else callback
+            if func is None:
+                continue
+            t0 = time.perf_counter()
+            if bound_kwargs or kwargs:
+                stopped = func(*largs, self, *args, **{**bound_kwargs, **kwargs})
+            else:
+                stopped = func(*largs, self, *args)
+            metrics.record_handler(event_type, func, (time.perf_counter() - t0) * 1000.0)
+            if stopped:
+                result = True
+                break
+        if result is None:
+            result = getattr(self, event_type)(*args, **kwargs)
+
+        for callback in self._keyed_callbacks(event_type, args):
+            t0 = time.perf_counter()
+            callback(self, *args, **kwargs)
+            metrics.record_handler(event_type, callback, (time.perf_counter() - t0) * 1000.0)
+
+        metrics.record_delivery(event_type, args, (time.perf_counter() - started) * 1000.0)
+        return result
+
+    def _deliver(self, event_type, args, kwargs):
+        if self._metrics is not None:
+            return self._deliver_instrumented(event_type, args, kwargs)
+        result = super().dispatch(event_type, *args, **kwargs)
+        for callback in self._keyed_callbacks(event_type, args):
+            callback(self, *args, **kwargs)
+        return result
+
+    def dispatch(self, event_type, *args, **kwargs):
+        if getattr(self, '_metrics', None) is not None:
+            self._metrics.record_emit(event_type)
+        if event_type in getattr(self, '_sticky', ()):
+            self._last_values[event_type] = (args, kwargs)
+        mode = self._coalesce.get(event_type) if hasattr(self, '_coalesce') else None
+        if mode is None:
+            return self._deliver(event_type, args, kwargs)
+
+        if mode == 'latest':
+            key = (event_type,)
+            self._pending.pop(key, None)
+            self._pending[key] = (args, kwargs)
+        else:
+            key = (event_type,) + tuple(args[:-1])
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = (args[:-1] + (list(args[-1]),), kwargs)
+            else:
+                pending[0][-1].extend(args[-1])
+        self._flush_trigger()
+
+    def emit_threadsafe(self, event_type, *args, **kwargs):
+        """Queue an emit from any thread; it is delivered on the next frame."""
+        self._threadsafe_queue.append((event_type, args, kwargs))
+        self._flush_trigger()
+
+    def _drain_threadsafe(self):
+        queue = self._threadsafe_queue
+        items = [queue.popleft() for _ in range(len(queue))]
+        if not items:
+            return
+
+        # Coalesced topics merge in dispatch(); past the bound, the oldest
+        # plain emits are dropped so a flooding producer cannot stall a frame.
+        plain = sum(1 for event_type, _, _ in items if event_type not in self._coalesce)
+        excess = plain - self.threadsafe_limit
+        for event_type, args, kwargs in items:
+            if excess > 0 and event_type not in self._coalesce:
+                excess -= 1
+                self.threadsafe_dropped += 1
+                continue
+            self.dispatch(event_type, *args, **kwargs)
+
+    def flush(self):
+        """Deliver queued and coalesced emits now; emits made by handlers wait for the next frame."""
+        self._drain_threadsafe()
+        pending, self._pending = self._pending, OrderedDict()
+        for (event_type, *_), (args, kwargs) in pending.items():
+            self._deliver(event_type, args, kwargs)
+        if self._pending:
+            self._flush_trigger()
+
     def on_tor_status_update(self, status):
         pass
 
@@ -187,25 +501,25 @@ class EventBus(EventDispatcher):
         pass
 
     def emit_tor_status(self, status):
-        self.dispatch('on_tor_status_update', status)
+        self.publish_state('on_tor_status_update', status)
 
     def emit_tor_state(self, state):
-        self.dispatch('on_tor_state_update', state)
+        self.publish_state('on_tor_state_update', state)
 
     def emit_tor_settings(self, settings):
         self.dispatch('on_tor_settings_update', settings)
 
     def emit_traffic_status(self, status):
-        self.dispatch('on_traffic_status_update', status)
+        self.publish_state('on_traffic_status_update', status)
 
     def emit_traffic_obfuscation_update(self, state):
-        self.dispatch('on_traffic_obfuscation_update', state)
+        self.publish_state('on_traffic_obfuscation_update', state)
 
     def emit_sensitive_comms(self, active: bool, reason: str = ''):
         self.dispatch('on_sensitive_comms_update', bool(active), reason)
 
     def emit_max_ai_state(self, state):
-        self.dispatch('on_max_ai_state_update', state)
+        self.publish_state('on_max_ai_state_update', state)
 
     def emit_theme_changed(self, theme_name):
         self.dispatch('on_theme_changed', theme_name)
@@ -214,7 +528,7 @@ class EventBus(EventDispatcher):
         self.dispatch('on_obfuscation_settings_update', settings)
 
     def emit_obfuscation_monitor(self, state):
-        self.dispatch('on_obfuscation_monitor_update', state)
+        self.publish_state('on_obfuscation_monitor_update', state)
 
     def emit_obfuscation_warning(self, warning_type, message):
         self.dispatch('on_obfuscation_warning', warning_type, message)
@@ -0,0 +1,171 @@
+import json
+import sys
+import time
+from typing import Any, Callable
+
+from src.utils.runtime import Clock, Logger
+
+
+# Bucket upper bounds in milliseconds; the last bucket is open ended.
+_BOUNDS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 33.0, 66.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket wall-time histogram, cheap enough to update per call."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        i = 0
+        while i < len(_BOUNDS_MS) and ms > _BOUNDS_MS[i]:
+            i += 1
+        self.buckets[i] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the given percentile."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return _BOUNDS_MS[i] if i < len(_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_ms,
+            'buckets': dict(zip([*(f'<={b}' for b in _BOUNDS_MS), f'>{_BOUNDS_MS[-1]}'], self.buckets)),
+        }
+
+
+def handler_name(callback: Callable[..., Any]) -> str:
+    func = getattr(callback, '__func__', callback)
+    module = getattr(func, '__module__', None) or '?'
+    qualname = getattr(func, '__qualname__', None) or repr(func)
+    return f'{module}.{qualname}'
+
+
+def payload_size(args: tuple) -> int:
+    """Shallow size in bytes of the dispatched arguments."""
+    return sum(sys.getsizeof(a) for a in args)
+
+
+class _TopicStats:
+    def __init__(self):
+        self.emitted = 0
+        self.delivered = 0
+        self.payload_total = 0
+        self.payload_max = 0
+        self.dispatch = LatencyHistogram()
+
+
+class _HandlerStats:
+    def __init__(self, event_type: str):
+        self.event_type = event_type
+        self.slow = 0
+        self.latency = LatencyHistogram()
+
+
+class EventBusMetrics:
+    """Per-topic counters and per-handler latency for an EventBus.
+
+    ``emitted`` counts calls to dispatch/emit; ``delivered`` counts actual
+    deliveries, so coalesced topics show how much was merged away. Handlers
+    slower than ``slow_handler_ms`` are logged with their qualified names.
+    """
+
+    def __init__(self, *, slow_handler_ms: float = 8.0):
+        self.slow_handler_ms = float(slow_handler_ms)
+        self.started_at = time.time()
+        self._topics: dict[str, _TopicStats] = {}
+        self._handlers: dict[str, _HandlerStats] = {}
+        self._dump_event = None
+
+    def _topic(self, event_type: str) -> _TopicStats:
+        stats = self._topics.get(event_type)
+        if stats is None:
+            stats = self._topics[event_type] = _TopicStats()
+        return stats
+
+    def record_emit(self, event_type: str):
+        self._topic(event_type).emitted += 1
+
+    def record_delivery(self, event_type: str, args: tuple, ms: float):
+        stats = self._topic(event_type)
+        size = payload_size(args)
+        stats.delivered += 1
+        stats.payload_total += size
+        if size > stats.payload_max:
+            stats.payload_max = size
+        stats.dispatch.add(ms)
+
+    def record_handler(self, event_type: str, callback: Callable[..., Any], ms: float):
+        name = handler_name(callback)
+        stats = self._handlers.get(name)
+        if stats is None:
+            stats = self._handlers[name] = _HandlerStats(event_type)
+        stats.latency.add(ms)
+        if ms > self.slow_handler_ms:
+            stats.slow += 1
+            Logger.warning(f'EventBus: slow handler {name} for {event_type} took {ms:.1f} ms')
+
+    def snapshot(self) -> dict[str, Any]:
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        return {
+            'elapsed': elapsed,
+            'slow_handler_ms': self.slow_handler_ms,
+            'events': {
+                event_type: {
+                    'emitted': s.emitted,
+                    'delivered': s.delivered,
+                    'rate_per_sec': s.emitted / elapsed,
+                    'payload_mean_bytes': s.payload_total / s.delivered if s.delivered else 0.0,
+                    'payload_max_bytes': s.payload_max,
+                    'dispatch': s.dispatch.to_dict(),
+                }
+                for event_type, s in self._topics.items()
+            },
+            'handlers': {
+                name: {'event': s.event_type, 'slow': s.slow, 'latency': s.latency.to_dict()}
+                for name, s in self._handlers.items()
+            },
+        }
+
+    def start_dump(self, interval: float, path: str | None = None):
+        """Periodically write the snapshot to ``path`` as JSON, or log the hottest topics."""
+        self.stop_dump()
+
+        def _dump(dt):
+            snap = self.snapshot()
+            if path:
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(snap, f, indent=2, sort_keys=True)
+                return
+            hot = sorted(snap['events'].items(), key=lambda kv: -kv[1]['dispatch']['count'] * kv[1]['dispatch']['mean_ms'])
+            for event_type, s in hot[:5]:
+                Logger.info(
+                    f"EventBus: {event_type} {s['rate_per_sec']:.1f}/s "
+                    f"p95 {s['dispatch']['p95_ms']} ms max {s['dispatch']['max_ms']:.1f} ms"
+                )
+
+        self._dump_event = Clock.schedule_interval(_dump, float(interval))
+
+    def stop_dump(self):
+        if self._dump_event is not None:
+            self._dump_event.cancel()
+            self._dump_event = None
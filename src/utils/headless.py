@@ -0,0 +1,420 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from functools import partial
+from typing import Any, Callable
+
+
+class ClockEvent:
+    """Handle returned by HeadlessClock, mirroring kivy's ClockEvent."""
+
+    def __init__(self, clock: 'HeadlessClock', callback: Callable[[float], Any], timeout: float, loop: bool):
+        self.clock = clock
+        self.callback = callback
+        self.timeout = float(timeout)
+        self.loop = loop
+        self._deadline: float | None = None
+        self._cancelled = False
+        self._last = time.perf_counter()
+
+    @property
+    def is_triggered(self) -> bool:
+        return self._deadline is not None
+
+    def __call__(self, *args):
+        # Calling a trigger schedules it unless it is already pending.
+        if self._deadline is None:
+            self.clock._schedule(self)
+
+    def cancel(self):
+        self.clock._cancel(self)
+
+
+class HeadlessClock:
+    """Kivy-compatible clock without a window.
+
+    Callbacks are kept in a deadline heap and run by ``tick()``; a timeout
+    of 0 means "next tick", as on the Kivy Clock. ``serve()`` drives the
+    ticks from an asyncio loop and sleeps until the next deadline, waking
+    early when another thread schedules something.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, ClockEvent]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._frames = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._wakeup: asyncio.Event | None = None
+        self.max_fps = 60.0
+
+    @property
+    def frames(self) -> int:
+        return self._frames
+
+    def create_trigger(self, callback: Callable[[float], Any], timeout: float = 0, interval: bool = False) -> ClockEvent:
+        return ClockEvent(self, callback, timeout, interval)
+
+    def schedule_once(self, callback: Callable[[float], Any], timeout: float = 0) -> ClockEvent:
+        event = ClockEvent(self, callback, max(0.0, float(timeout)), False)
+        self._schedule(event)
+        return event
+
+    def schedule_interval(self, callback: Callable[[float], Any], timeout: float) -> ClockEvent:
+        event = ClockEvent(self, callback, timeout, True)
+        self._schedule(event)
+        return event
+
+    def unschedule(self, callback):
+        if isinstance(callback, ClockEvent):
+            callback.cancel()
+            return
+        with self._lock:
+            events = [e for _, _, e in self._heap if e.callback == callback]
+        for event in events:
+            event.cancel()
+
+    def _schedule(self, event: ClockEvent):
+        with self._lock:
+            event._last = time.perf_counter()
+            event._deadline = event._last + event.timeout
+            event._cancelled = False
+            heapq.heappush(self._heap, (event._deadline, next(self._seq), event))
+        self._wake()
+
+    def _cancel(self, event: ClockEvent):
+        # Cancelled entries stay in the heap and are skipped when popped.
+        with self._lock:
+            event._deadline = None
+            event._cancelled = True
+
+    def _wake(self):
+        # Only other threads need to interrupt the sleep in serve().
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or threading.get_ident() == self._loop_thread:
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass
+
+    def next_deadline(self) -> float | None:
+        with self._lock:
+            while self._heap and self._heap[0][2]._deadline != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def tick(self):
+        """Run every callback that is due; callbacks scheduled meanwhile wait for the next tick."""
+        self._frames += 1
+        now = time.perf_counter()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, _, event = heapq.heappop(self._heap)
+                if event._deadline == deadline:
+                    event._deadline = None
+                    due.append(event)
+        for event in due:
+            dt = now - event._last
+            if event.callback(dt) is False or not event.loop:
+                continue
+            if event._deadline is None and not event._cancelled:
+                self._schedule(event)
+
+    async def serve(self, duration: float | None = None, until: Callable[[], bool] | None = None):
+        """Tick from the running asyncio loop until ``duration`` elapses or ``until()`` is true.
+
+        Like the Kivy Clock, ticks are capped at ``max_fps`` so 0-timeout
+        intervals run once per frame instead of spinning.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._wakeup = asyncio.Event()
+        stop_at = time.perf_counter() + duration if duration is not None else None
+        try:
+            while True:
+                frame_start = time.perf_counter()
+                self.tick()
+                now = time.perf_counter()
+                if (stop_at is not None and now >= stop_at) or (until is not None and until()):
+                    break
+                deadline = self.next_deadline()
+                if deadline is not None and self.max_fps:
+                    deadline = max(deadline, frame_start + 1.0 / self.max_fps)
+                if stop_at is not None:
+                    deadline = stop_at if deadline is None else min(deadline, stop_at)
+                timeout = None if deadline is None else max(0.0, deadline - now)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._loop = None
+            self._loop_thread = None
+            self._wakeup = None
+
+    def run(self, duration: float | None = None, until: Callable[[], bool] | None = None):
+        """Blocking wrapper around ``serve()`` for scripts and benchmarks."""
+        asyncio.run(self.serve(duration, until))
+
+
+class Property:
+    """Observable class attribute for HeadlessEventDispatcher subclasses."""
+
+    def __init__(self, defaultvalue=None, **kwargs):
+        self.defaultvalue = defaultvalue
+        self.name = ''
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def convert(self, value):
+        return value
+
+    def default(self):
+        return self.convert(self.defaultvalue)
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        values = obj.__dict__.setdefault('_property_values', {})
+        if self.name not in values:
+            values[self.name] = self.default()
+        return values[self.name]
+
+    def __set__(self, obj, value):
+        value = self.convert(value)
+        if self.__get__(obj) == value:
+            return
+        obj.__dict__['_property_values'][self.name] = value
+        obj._dispatch_property(self.name, value)
+
+
+class NumericProperty(Property):
+    def convert(self, value):
+        if not isinstance(value, (int, float)):
+            raise ValueError(f'{self.name} accepts only int/float, got {value!r}')
+        return value
+
+
+class BooleanProperty(Property):
+    def convert(self, value):
+        return bool(value)
+
+
+class StringProperty(Property):
+    def __init__(self, defaultvalue='', **kwargs):
+        super().__init__(defaultvalue, **kwargs)
+
+    def convert(self, value):
+        if not isinstance(value, str):
+            raise ValueError(f'{self.name} accepts only str, got {value!r}')
+        return value
+
+
+class ObjectProperty(Property):
+    pass
+
+
+class ListProperty(Property):
+    def __init__(self, defaultvalue=None, **kwargs):
+        super().__init__([] if defaultvalue is None else defaultvalue, **kwargs)
+
+    def convert(self, value):
+        return list(value)
+
+
+class OptionProperty(Property):
+    def __init__(self, defaultvalue=None, options=(), **kwargs):
+        super().__init__(defaultvalue, **kwargs)
+        self.options = list(options)
+
+    def convert(self, value):
+        if value not in self.options:
+            raise ValueError(f'{self.name} must be one of {self.options}, got {value!r}')
+        return value
+
+
+class ColorProperty(Property):
+    def convert(self, value):
+        if isinstance(value, str):
+            return get_color_from_hex(value)
+        color = [float(c) for c in value]
+        if len(color) == 3:
+            color.append(1.0)
+        return color
+
+
+class HeadlessEventDispatcher:
+    """Subset of kivy's EventDispatcher used by the services.
+
+    Event handlers run newest first and stop at the first one returning
+    True, then the ``on_<event>`` default runs; property observers run in
+    binding order. Bound methods are held weakly, as Kivy does.
+    """
+
+    def __init__(self, **kwargs):
+        self.__dict__.setdefault('_event_types', set())
+        self.__dict__.setdefault('_observers', {})
+        self.__dict__.setdefault('_uids', itertools.count(1))
+        for name, value in kwargs.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def _class_properties(cls) -> dict[str, Property]:
+        found = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, Property):
+                    found[name] = value
+        return found
+
+    def properties(self) -> dict[str, Property]:
+        return self._class_properties()
+
+    def property(self, name: str, quiet: bool = False):
+        prop = self._class_properties().get(name)
+        if prop is None and not quiet:
+            raise KeyError(name)
+        return prop
+
+    def register_event_type(self, event_type: str):
+        if not event_type.startswith('on_'):
+            raise Exception('A new event must start with "on_"')
+        if not hasattr(self, event_type):
+            raise Exception(f'Missing default handler {event_type!r} in {type(self).__name__}')
+        self._event_types.add(event_type)
+
+    def is_event_type(self, event_type: str) -> bool:
+        return event_type in self._event_types
+
+    def _check_name(self, name: str):
+        if not self.is_event_type(name) and name not in self._class_properties():
+            raise KeyError(name)
+
+    def _observer_list(self, name: str) -> list[tuple]:
+        return self._observers.setdefault(name, [])
+
+    def fbind(self, name, func, *largs, **kwargs):
+        self._check_name(name)
+        if hasattr(func, '__self__') and hasattr(func, '__func__'):
+            callback, is_ref = weakref.WeakMethod(func), True
+        else:
+            callback, is_ref = func, False
+        uid = next(self._uids)
+        self._observer_list(name).append((callback, largs, kwargs, is_ref, uid))
+        return uid
+
+    def bind(self, **kwargs):
+        for name, func in kwargs.items():
+            self.fbind(name, func)
+
+    def funbind(self, name, func, *largs, **kwargs):
+        observers = self._observer_list(name)
+        for i, (callback, cb_largs, cb_kwargs, is_ref, _uid) in enumerate(observers):
+            target = callback() if is_ref else callback
+            if target == func and cb_largs == largs and cb_kwargs == kwargs:
+                del observers[i]
+                return
+
+    def unbind(self, **kwargs):
+        for name, func in kwargs.items():
+            self.funbind(name, func)
+
+    def unbind_uid(self, name, uid):
+        observers = self._observer_list(name)
+        observers[:] = [o for o in observers if o[4] != uid]
+
+    def get_property_observers(self, name, args=False):
+        observers = list(self._observers.get(name, ()))
+        if args:
+            return observers
+        return [o[0] for o in observers]
+
+    def _live_observers(self, name):
+        for callback, largs, kwargs, is_ref, _uid in self.get_property_observers(name, args=True):
+            func = callback() if is_ref else callback
+            if func is not None:
+                yield func, largs, kwargs
+
+    def _dispatch_property(self, name, value):
+        for func, largs, kwargs in self._live_observers(name):
+            func(*largs, self, value, **kwargs)
+        default = getattr(self, f'on_{name}', None)
+        if default is not None:
+            default(self, value)
+
+    def dispatch(self, event_type, *args, **kwargs):
+        for func, largs, bound_kwargs in reversed(list(self._live_observers(event_type))):
+            if func(*largs, self, *args, **{**bound_kwargs, **kwargs}):
+                return True
+        return getattr(self, event_type)(*args, **kwargs)
+
+    def setter(self, name):
+        return partial(setattr, self, name)
+
+
+class JsonStore:
+    """File-backed key/value store with kivy JsonStore's API and file format."""
+
+    def __init__(self, filename: str, indent=None, sort_keys=False):
+        self.filename = filename
+        self._indent = indent
+        self._sort_keys = sort_keys
+        self._data: dict[str, dict[str, Any]] = {}
+        if os.path.exists(filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = f.read()
+            if data:
+                self._data = json.loads(data)
+
+    def _sync(self):
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, indent=self._indent, sort_keys=self._sort_keys)
+
+    def exists(self, key: str) -> bool:
+        return key in self._data
+
+    def get(self, key: str) -> dict[str, Any]:
+        return self._data[key]
+
+    def put(self, key: str, **values):
+        self._data[key] = values
+        self._sync()
+        return True
+
+    def delete(self, key: str):
+        del self._data[key]
+        self._sync()
+        return True
+
+    def keys(self):
+        return self._data.keys()
+
+    def count(self) -> int:
+        return len(self._data)
+
+
+def escape_markup(text: str) -> str:
+    return text.replace('&', '&amp;').replace('[', '&bl;').replace(']', '&br;')
+
+
+def get_color_from_hex(s: str) -> list[float]:
+    if s.startswith('#'):
+        s = s[1:]
+    value = [int(s[i:i + 2], 16) / 255.0 for i in range(0, len(s), 2)]
+    if len(value) == 3:
+        value.append(1.0)
+    return value
+
+
+Logger = logging.getLogger('tor_dashboard')
@@ -0,0 +1,63 @@
+"""Kivy or headless implementations of the primitives the core depends on.
+
+Services, stores and the event bus import ``Clock``, ``EventDispatcher``,
+the property types, ``JsonStore`` and ``Logger`` from here instead of from
+Kivy. With ``TOR_DASHBOARD_HEADLESS=1`` in the environment they come from
+``src.utils.headless`` and Kivy is never imported, so the messaging core
+can run as a daemon or in benchmarks with an asyncio-driven clock.
+"""
+import os
+import sys
+
+HEADLESS = os.environ.get('TOR_DASHBOARD_HEADLESS', '').lower() in ('1', 'true', 'yes')
+
+if HEADLESS:
+    from src.utils.headless import (  # noqa: F401
+        BooleanProperty,
+        ColorProperty,
+        HeadlessClock,
+        HeadlessEventDispatcher as EventDispatcher,
+        JsonStore,
+        ListProperty,
+        Logger,
+        NumericProperty,
+        ObjectProperty,
+        OptionProperty,
+        StringProperty,
+        escape_markup,
+        get_color_from_hex,
+    )
+
+    Clock = HeadlessClock()
+else:
+    from kivy.clock import Clock  # noqa: F401
+    from kivy.event import EventDispatcher  # noqa: F401
+    from kivy.logger import Logger  # noqa: F401
+    from kivy.properties import (  # noqa: F401
+        BooleanProperty,
+        ColorProperty,
+        ListProperty,
+        NumericProperty,
+        ObjectProperty,
+        OptionProperty,
+        StringProperty,
+    )
+    from kivy.storage.jsonstore import JsonStore  # noqa: F401
+    from kivy.utils import escape_markup, get_color_from_hex  # noqa: F401
+
+
+def running_app():
+    """The running Kivy App, or None; never imports kivy.app itself."""
+    app_module = sys.modules.get('kivy.app')
+    return app_module.App.get_running_app() if app_module is not None else None
+
+
+def user_data_dir(fallback: str) -> str:
+    """The running app's ``user_data_dir``, else ``~/<fallback>``; created if missing."""
+    app = running_app()
+    if app is not None and getattr(app, 'user_data_dir', None):
+        base_dir = app.user_data_dir
+    else:
+        base_dir = os.path.join(os.path.expanduser('~'), fallback)
+    os.makedirs(base_dir, exist_ok=True)
+    return base_dir
@@ -0,0 +1,69 @@
+import weakref
+from typing import Any, Callable
+
+from src.utils.runtime import EventDispatcher
+
+
+def _unbind(dispatcher: EventDispatcher, name: str, uid: int):
+    dispatcher.unbind_uid(name, uid)
+
+
+class Subscription:
+    """Disposable handle for a binding that must not outlive its owner.
+
+    The binding is removed when ``dispose()`` is called or as soon as the
+    owner is garbage collected, whichever comes first.
+    """
+
+    def __init__(self, dispatcher: EventDispatcher, name: str, uid: int, owner: Any):
+        self.name = name
+        self._finalizer = weakref.finalize(owner, _unbind, dispatcher, name, uid)
+
+    @property
+    def alive(self) -> bool:
+        return self._finalizer.alive
+
+    def dispose(self):
+        self._finalizer()
+
+
+def bind_weak(dispatcher: EventDispatcher, name: str, method: Callable[..., Any]) -> Subscription:
+    """Bind a bound method to an event or property without keeping its object alive."""
+    owner_ref = weakref.ref(method.__self__)
+    func = method.__func__
+
+    def _call(*args, **kwargs):
+        owner = owner_ref()
+        if owner is not None:
+            return func(owner, *args, **kwargs)
+
+    uid = dispatcher.fbind(name, _call)
+    return Subscription(dispatcher, name, uid, method.__self__)
+
+
+def bind_weak_setter(dispatcher: EventDispatcher, name: str, target: Any, target_prop: str) -> Subscription:
+    """Weak replacement for ``dispatcher.bind(name=target.setter(target_prop))``."""
+    target_ref = weakref.ref(target)
+
+    def _set(instance, value):
+        obj = target_ref()
+        if obj is not None:
+            setattr(obj, target_prop, value)
+
+    uid = dispatcher.fbind(name, _set)
+    return Subscription(dispatcher, name, uid, target)
+
+
+def live_subscriber_counts(dispatcher: EventDispatcher) -> dict[str, int]:
+    """Count the bindings per event/property whose callbacks are still alive."""
+    names = list(dispatcher.properties())
+    names.extend(n for n in dir(dispatcher) if n.startswith('on_') and dispatcher.is_event_type(n))
+    counts = {}
+    for name in names:
+        live = 0
+        for callback, _largs, _kwargs, is_ref, _uid in dispatcher.get_property_observers(name, args=True):
+            if not is_ref or callback() is not None:
+                live += 1
+        if live:
+            counts[name] = live
+    return counts
@@ -0,0 +1,176 @@
+from collections import OrderedDict
+
+from kivy.clock import Clock
+from kivy.core.text import DEFAULT_FONT, Label as CoreLabel
+from kivy.core.text.markup import MarkupLabel
+from kivy.graphics import Color, Rectangle
+from kivy.metrics import dp
+from kivy.properties import BooleanProperty, ColorProperty, ListProperty, NumericProperty, ObjectProperty, OptionProperty, StringProperty
+from kivy.uix.widget import Widget
+
+
+class TextLayoutCache:
+    """Rendered, wrapped text shared by every bubble that shows it.
+
+    Entries are keyed by ``(hash(text), width bucket, font size, halign,
+    font name, bold, markup)`` and hold the texture and its size. Text is wrapped at the bucket width
+    rather than the exact one, so every width inside a bucket gets the same
+    texture: recycled rows and re-layouts after a resize reuse it instead
+    of rasterizing again. Textures are rendered white and tinted when
+    drawn, so colours and theme switches don't need their own entries.
+
+    The cache is bounded by total texture pixels and evicts the least
+    recently used entries first.
+    """
+
+    def __init__(self, max_pixels=4_000_000, bucket=None):
+        self.max_pixels = int(max_pixels)
+        self.bucket_size = bucket or dp(8)
+        self._entries: OrderedDict = OrderedDict()
+        self._pixels = 0
+        self.hits = 0
+        self.misses = 0
+
+    def bucket(self, width) -> float:
+        """The wrap width used for ``width``; never less than one bucket."""
+        step = self.bucket_size
+        return max(step, (int(width) // int(step)) * step)
+
+    def key(self, text, width, font_size, halign='left', font_name=DEFAULT_FONT, bold=False, markup=False) -> tuple:
+        return (hash(text), self.bucket(width), float(font_size), halign, font_name, bool(bold), bool(markup))
+
+    def render(self, text, width, font_size, halign='left', font_name=DEFAULT_FONT, bold=False, markup=False):
+        """The texture for ``text`` wrapped at ``width``; ``None`` for empty text."""
+        if not text:
+            return None
+        key = self.key(text, width, font_size, halign, font_name, bold, markup)
+        entry = self._entries.get(key)
+        # The text is kept alongside the texture so a hash collision is a miss.
+        if entry is not None and entry[0] == text:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        label_class = MarkupLabel if markup else CoreLabel
+        label = label_class(
+            text=text,
+            font_size=font_size,
+            font_name=font_name,
+            bold=bold,
+            text_size=(key[1], None),
+            halign=halign,
+        )
+        label.refresh()
+        texture = label.texture
+        if entry is not None:
+            self._pixels -= self._area(entry[1])
+        self._entries[key] = (text, texture)
+        self._entries.move_to_end(key)
+        self._pixels += self._area(texture)
+        while self._pixels > self.max_pixels and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._pixels -= self._area(evicted)
+        return texture
+
+    def measure(self, text, width, font_size, halign='left', font_name=DEFAULT_FONT, bold=False, markup=False) -> tuple:
+        """``(width, height)`` of ``text`` wrapped at ``width``."""
+        texture = self.render(text, width, font_size, halign, font_name, bold, markup)
+        return tuple(texture.size) if texture is not None else (0, 0)
+
+    @staticmethod
+    def _area(texture):
+        return texture.width * texture.height
+
+    def clear(self):
+        self._entries.clear()
+        self._pixels = 0
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'pixels': self._pixels,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+text_cache = TextLayoutCache()
+
+
+class CachedText(Widget):
+    """Wrapped label drawn from ``text_cache``.
+
+    A drop-in for the ``Label`` + ``text_size=(width, None)`` +
+    ``height = texture_size[1]`` pattern used in chat bubbles. Like a
+    Label, changes are applied once per frame; call ``texture_update()``
+    to apply them immediately. ``height`` follows the text when
+    ``size_hint_y`` is None. Markup colours are tinted by ``color``.
+    """
+
+    text = StringProperty('')
+    color = ColorProperty([1, 1, 1, 1])
+    font_size = NumericProperty(dp(15))
+    halign = OptionProperty('left', options=['left', 'center', 'right'])
+    font_name = StringProperty(DEFAULT_FONT)
+    bold = BooleanProperty(False)
+    markup = BooleanProperty(False)
+    texture = ObjectProperty(None, allownone=True)
+    texture_size = ListProperty([0, 0])
+
+    def __init__(self, cache=None, **kwargs):
+        self._cache = cache if cache is not None else text_cache
+        self._rendered_bucket = None
+        self._trigger_texture = Clock.create_trigger(self.texture_update, -1)
+        super().__init__(**kwargs)
+        with self.canvas:
+            self._color_instruction = Color(rgba=self.color)
+            self._rect = Rectangle(size=(0, 0))
+        self.fbind('text', self._trigger_texture)
+        self.fbind('font_size', self._trigger_texture)
+        self.fbind('halign', self._trigger_texture)
+        self.fbind('font_name', self._trigger_texture)
+        self.fbind('bold', self._trigger_texture)
+        self.fbind('markup', self._trigger_texture)
+        self.fbind('width', self._on_width)
+        self.fbind('color', self._on_color)
+        self.fbind('pos', self._update_rect)
+        self.fbind('height', self._update_rect)
+        self.texture_update()
+
+    def _on_width(self, instance, width):
+        # Widths inside the rendered bucket wrap the same way.
+        if self._cache.bucket(width) != self._rendered_bucket:
+            self._trigger_texture()
+        else:
+            self._update_rect()
+
+    def _on_color(self, instance, color):
+        self._color_instruction.rgba = color
+
+    def texture_update(self, *args):
+        self._trigger_texture.cancel()
+        texture = self._cache.render(
+            self.text, self.width, self.font_size, self.halign, self.font_name, self.bold, self.markup
+        )
+        self._rendered_bucket = self._cache.bucket(self.width)
+        self.texture = texture
+        self.texture_size = list(texture.size) if texture is not None else [0, 0]
+        self._rect.texture = texture
+        self._rect.size = self.texture_size
+        if self.size_hint_y is None:
+            self.height = self.texture_size[1]
+        self._update_rect()
+
+    def _update_rect(self, *args):
+        texture_width = self.texture_size[0]
+        if self.halign == 'right':
+            x = self.right - texture_width
+        elif self.halign == 'center':
+            x = self.center_x - texture_width / 2
+        else:
+            x = self.x
+        self._rect.pos = (x, self.top - self.texture_size[1])
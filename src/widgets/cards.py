@@ -2,6 +2,7 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.graphics import Color, Rectangle
 from src.theming.theme_manager import theme_manager
+from src.utils.weak_binding import bind_weak, bind_weak_setter
 
 
 class Card(BoxLayout):
@@ -13,7 +14,7 @@ class Card(BoxLayout):
         self.size_hint_y = None
         self.bind(minimum_height=self.setter('height'))
 
-        theme_manager.bind(surface_color=self.update_bg)
+        bind_weak(theme_manager, 'surface_color', self.update_bg)
         self.bind(pos=self.update_rect, size=self.update_rect)
 
         with self.canvas.before:
@@ -30,7 +31,7 @@ class Card(BoxLayout):
             color=theme_manager.text_color,
         )
         self.title_label.bind(size=lambda inst, val: setattr(inst, 'text_size', val))
-        theme_manager.bind(text_color=self.title_label.setter('color'))
+        bind_weak_setter(theme_manager, 'text_color', self.title_label, 'color')
 
         self.content_label = None
         self.body = body
@@ -44,7 +45,7 @@ class Card(BoxLayout):
                 color=theme_manager.text_color,
             )
             self.content_label.bind(size=lambda inst, val: setattr(inst, 'text_size', val))
-            theme_manager.bind(text_color=self.content_label.setter('color'))
+            bind_weak_setter(theme_manager, 'text_color', self.content_label, 'color')
 
         self.add_widget(self.title_label)
         if self.body is not None:
@@ -12,6 +12,8 @@ from kivy.core.window import Window
 from kivy.input.motionevent import MotionEvent
 from src.theming.theme_manager import theme_manager
 from src.theming.tokens import ColorPalette
+from src.utils.weak_binding import bind_weak
+from src.widgets.cached_text import CachedText
 
 
 def format_timestamp(dt=None):
@@ -94,14 +96,12 @@ class ChatBubble(BoxLayout):
         
         message_box.bind(pos=self._update_bubble_rect, size=self._update_bubble_rect)
         
-        msg_label = Label(
+        msg_label = CachedText(
             text=text,
             font_size=theme_manager.typography.BODY1,
             color=ColorPalette.LIGHT_ON_PRIMARY if is_outgoing else theme_manager.text_color,
-            markup=False,
             size_hint_y=None,
         )
-        msg_label.bind(size=lambda inst, val: setattr(inst, 'text_size', val))
         msg_label.bind(texture_size=lambda inst, val: self._update_message_height(message_box, msg_label))
         message_box.add_widget(msg_label)
         
@@ -248,7 +248,7 @@ class PinnedMessageBanner(BoxLayout):
         self.spacing = dp(12)
         
         with self.canvas.before:
-            self.bg_color = Color(rgba=theme_manager.primary_color + (0.1,))
+            self.bg_color = Color(rgba=list(theme_manager.primary_color[:3]) + [0.1])
             self.bg_rect = Rectangle(pos=self.pos, size=self.size)
         
         self.bind(pos=self._update_rect, size=self._update_rect)
@@ -308,11 +308,12 @@ class MessageActionMenu(Popup):
 class MessageComposer(BoxLayout):
     """Input area for composing messages with send, attach, and disappearing message toggle."""
     
-    def __init__(self, on_send=None, on_attach=None, on_disappearing=None, **kwargs):
+    def __init__(self, on_send=None, on_attach=None, on_disappearing=None, on_typing=None, **kwargs):
         super().__init__(**kwargs)
         self.orientation = 'horizontal'
         self.size_hint_y = None
         self.height = dp(56)
+        self.on_typing = on_typing
         self.padding = dp(12)
         self.spacing = dp(8)
         
@@ -321,7 +322,7 @@ class MessageComposer(BoxLayout):
             self.bg_rect = Rectangle(pos=self.pos, size=self.size)
         
         self.bind(pos=self._update_rect, size=self._update_rect)
-        theme_manager.bind(surface_color=self._update_bg_color)
+        bind_weak(theme_manager, 'surface_color', self._update_bg_color)
         
         # Attach button
         attach_btn = Button(
@@ -340,6 +341,7 @@ class MessageComposer(BoxLayout):
             height=dp(40),
             font_size=theme_manager.typography.BODY1,
         )
+        self.message_input.bind(text=self._on_text_changed)
         self.add_widget(self.message_input)
         
         # Disappearing message toggle
@@ -368,6 +370,11 @@ class MessageComposer(BoxLayout):
     def _update_bg_color(self, instance, value):
         self.bg_color.rgba = value
 
+    def _on_text_changed(self, instance, value):
+        # Fires per keystroke; the receiver is expected to throttle.
+        if self.on_typing:
+            self.on_typing(bool(value.strip()))
+
 
 class MessageSearchBar(BoxLayout):
     """Inline message search with filtering and navigation."""
@@ -1,159 +1,290 @@
+from bisect import bisect_left
+from functools import total_ordering
+
+from kivy.graphics import Color, Rectangle
 from kivy.metrics import dp
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.label import Label
 from kivy.uix.button import Button
-from kivy.uix.image import Image
-from kivy.graphics import Color, Rectangle
+from kivy.uix.label import Label
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.widget import Widget
+
 from src.theming.theme_manager import theme_manager
-from src.utils.event_bus import event_bus
+from src.utils.weak_binding import bind_weak
+
+
+@total_ordering
+class _Descending:
+    """Inverts the order of a value inside an otherwise ascending key."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+
+def contact_sort_key(contact_id: str, contact: dict, sort_by: str = 'alphabetical') -> tuple:
+    """Display-order key; the id breaks ties so every key is unique."""
+    name = (contact.get('name') or '').lower()
+    if sort_by == 'recent':
+        return (_Descending(contact.get('last_message_time') or ''), name, contact_id)
+    return (name, contact_id)
+
+
+class SortedContactModel:
+    """Contacts kept in display order, updated by key.
+
+    ``upsert`` and ``remove`` find rows with a binary search over the sort
+    keys and report the positions they touched, so the view can move a
+    single row when a contact changes instead of rebuilding the list.
+    """
+
+    def __init__(self, sort_by: str = 'alphabetical'):
+        self.sort_by = sort_by
+        self._keys: list = []
+        self._ids: list = []
+        self._contacts: dict = {}
+        self._key_of: dict = {}
+
+    def key(self, contact_id: str, contact: dict) -> tuple:
+        return contact_sort_key(contact_id, contact, self.sort_by)
+
+    def reset(self, contacts: dict, sort_by: str | None = None):
+        if sort_by is not None:
+            self.sort_by = sort_by
+        entries = sorted((self.key(cid, c), cid) for cid, c in contacts.items())
+        self._keys = [key for key, _ in entries]
+        self._ids = [cid for _, cid in entries]
+        self._contacts = dict(contacts)
+        self._key_of = {cid: key for key, cid in entries}
+
+    def index(self, contact_id: str) -> int | None:
+        key = self._key_of.get(contact_id)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key)
+
+    def upsert(self, contact_id: str, contact: dict) -> tuple[int | None, int]:
+        """Insert or re-place a contact; returns ``(old_index, new_index)``."""
+        old_index = self.remove(contact_id)
+        key = self.key(contact_id, contact)
+        index = bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._ids.insert(index, contact_id)
+        self._contacts[contact_id] = contact
+        self._key_of[contact_id] = key
+        return old_index, index
+
+    def remove(self, contact_id: str) -> int | None:
+        index = self.index(contact_id)
+        if index is None:
+            return None
+        del self._keys[index]
+        del self._ids[index]
+        del self._contacts[contact_id]
+        del self._key_of[contact_id]
+        return index
+
+    def get(self, contact_id: str) -> dict | None:
+        return self._contacts.get(contact_id)
+
+    def ids(self) -> list:
+        return list(self._ids)
+
+    def __contains__(self, contact_id):
+        return contact_id in self._key_of
 
+    def __len__(self):
+        return len(self._ids)
 
-class ContactListItem(BoxLayout):
-    def __init__(self, contact_id: str, contact: dict, on_select=None, **kwargs):
+
+def _status_color(status):
+    if status == 'online':
+        return (0.2, 0.9, 0.3, 1.0)  # Green
+    elif status == 'connecting':
+        return (1.0, 0.7, 0.0, 1.0)  # Orange
+    else:
+        return (0.5, 0.5, 0.5, 1.0)  # Gray
+
+
+class ContactListItem(RecycleDataViewBehavior, BoxLayout):
+    """Recycled contact row; rebinding only updates texts and colours."""
+
+    def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.contact_id = contact_id
-        self.contact = contact
-        self.on_select = on_select
         self.orientation = 'horizontal'
         self.padding = dp(12)
         self.spacing = dp(12)
         self.size_hint_y = None
         self.height = dp(72)
 
-        theme_manager.bind(surface_color=self.update_bg)
-        self.bind(pos=self.update_rect, size=self.update_rect)
+        self.contact_list = None
+        self.contact_id = None
 
         with self.canvas.before:
             self.bg_color_instruction = Color(rgba=theme_manager.surface_color)
             self.bg_rect = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self.update_rect, size=self.update_rect)
 
-        # Status indicator circle
+        # Status indicator
         status_container = BoxLayout(size_hint_x=None, width=dp(12))
-        self.status_indicator = BoxLayout()
+        self.status_indicator = Widget()
         with self.status_indicator.canvas:
-            status_color = self._get_status_color(contact.get('presence_status', 'offline'))
-            Color(rgba=status_color)
-            Rectangle(pos=self.status_indicator.pos, size=self.status_indicator.size)
+            self.status_color_instruction = Color(rgba=_status_color('offline'))
+            self.status_rect = Rectangle()
+        self.status_indicator.bind(pos=self._update_status_rect, size=self._update_status_rect)
         status_container.add_widget(self.status_indicator)
         self.add_widget(status_container)
 
         # Contact info
         info_container = BoxLayout(orientation='vertical', spacing=dp(4))
 
-        # Name + badges
         name_row = BoxLayout(size_hint_y=None, height=dp(24), spacing=dp(8))
         self.name_label = Label(
-            text=contact.get('nickname') or contact.get('name', 'Unknown'),
             font_size=theme_manager.typography.BODY1,
-            color=theme_manager.text_color,
             halign='left',
             valign='middle',
         )
         self.name_label.bind(size=lambda inst, val: setattr(inst, 'text_size', val))
-        theme_manager.bind(text_color=self.name_label.setter('color'))
         name_row.add_widget(self.name_label)
-
-        # Badges
-        badge_container = BoxLayout(size_hint_x=None, width=dp(80), spacing=dp(4))
-        if contact_id in [cid for cid in [] if False]:  # Placeholder for blocked/muted checks
-            pass
-        badge_container.add_widget(BoxLayout())  # Spacer
-        name_row.add_widget(badge_container)
-
+        name_row.add_widget(BoxLayout(size_hint_x=None, width=dp(80)))  # Badge space
         info_container.add_widget(name_row)
 
-        # Last message preview
-        preview_text = contact.get('last_message_preview', '')
-        if not preview_text:
-            preview_text = contact.get('onion_address', '')[:20] + '...'
-
         self.preview_label = Label(
-            text=preview_text[:40],
             font_size=theme_manager.typography.CAPTION,
-            color=theme_manager.text_color,
             halign='left',
             valign='top',
             opacity=0.7,
         )
         self.preview_label.bind(size=lambda inst, val: setattr(inst, 'text_size', val))
-        theme_manager.bind(text_color=self.preview_label.setter('color'))
         info_container.add_widget(self.preview_label)
 
         self.add_widget(info_container)
 
-        # Select button
         select_btn = Button(text='', size_hint_x=None, width=dp(44), background_color=(0, 0, 0, 0))
         select_btn.bind(on_press=lambda *_: self._on_select())
         self.add_widget(select_btn)
 
-    def _get_status_color(self, status):
-        if status == 'online':
-            return (0.2, 0.9, 0.3, 1.0)  # Green
-        elif status == 'connecting':
-            return (1.0, 0.7, 0.0, 1.0)  # Orange
-        else:
-            return (0.5, 0.5, 0.5, 1.0)  # Gray
+    def refresh_view_attrs(self, rv, index, data):
+        self.contact_list = rv
+        self.contact_id = data['contact_id']
+        self.bg_color_instruction.rgba = theme_manager.surface_color
+        self.status_color_instruction.rgba = _status_color(data['presence_status'])
+        self.name_label.text = data['name']
+        self.name_label.color = theme_manager.text_color
+        self.preview_label.text = data['preview']
+        self.preview_label.color = theme_manager.text_color
 
     def _on_select(self):
-        if self.on_select:
-            self.on_select(self.contact_id, self.contact)
-
-    def update_bg(self, instance, value):
-        self.bg_color_instruction.rgba = value
+        if self.contact_list is not None and self.contact_id is not None:
+            self.contact_list.select(self.contact_id)
 
     def update_rect(self, instance, value):
         self.bg_rect.pos = instance.pos
         self.bg_rect.size = instance.size
 
-    def update_contact(self, contact: dict):
-        self.contact = contact
-        self.name_label.text = contact.get('nickname') or contact.get('name', 'Unknown')
-        self.preview_label.text = contact.get('last_message_preview', '')[:40]
+    def _update_status_rect(self, instance, value):
+        self.status_rect.pos = instance.pos
+        self.status_rect.size = instance.size
+
 
+class ContactList(RecycleView):
+    """Virtualized contact list over a ``SortedContactModel``.
 
-class ContactList(GridLayout):
-    def __init__(self, contacts: dict = None, on_select=None, **kwargs):
+    Only visible rows exist as widgets. ``set_contacts`` reloads the list
+    but keeps the row dicts of unchanged contacts; ``upsert`` and
+    ``remove_contact`` move, insert or drop a single row, which is what
+    presence, favorite and profile updates use.
+    """
+
+    def __init__(self, contacts: dict = None, on_select=None, sort_by: str = 'alphabetical', **kwargs):
         super().__init__(**kwargs)
-        self.cols = 1
-        self.spacing = 0
-        self.padding = 0
-        self.size_hint_y = None
+        self.do_scroll_x = False
         self.on_select = on_select
-        self._items = {}
+        self.model = SortedContactModel(sort_by)
+
+        self.layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, dp(72)),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+        )
+        self.layout.bind(minimum_height=self.layout.setter('height'))
+        self.add_widget(self.layout)
+        self.viewclass = ContactListItem
 
-        self.bind(minimum_height=self.setter('height'))
+        # One binding for the list rather than several per row.
+        bind_weak(theme_manager, 'surface_color', self._on_theme_color)
+        bind_weak(theme_manager, 'text_color', self._on_theme_color)
 
         if contacts:
             self.set_contacts(contacts)
 
-    def set_contacts(self, contacts: dict):
-        self.clear_widgets()
-        self._items = {}
-        for contact_id, contact in contacts.items():
-            item = ContactListItem(
-                contact_id=contact_id,
-                contact=contact,
-                on_select=self.on_select,
-            )
-            self._items[contact_id] = item
-            self.add_widget(item)
+    @staticmethod
+    def _row_data(contact_id: str, contact: dict) -> dict:
+        preview = contact.get('last_message_preview') or ''
+        if not preview:
+            preview = (contact.get('onion_address') or '')[:20] + '...'
+        return {
+            'contact_id': contact_id,
+            'name': contact.get('nickname') or contact.get('name', 'Unknown'),
+            'preview': preview[:40],
+            'presence_status': contact.get('presence_status', 'offline'),
+        }
+
+    def set_contacts(self, contacts: dict, sort_by: str | None = None):
+        """Show ``contacts``, reusing rows whose display hasn't changed."""
+        previous = {row['contact_id']: row for row in self.data}
+        self.model.reset(contacts, sort_by)
+        rows = []
+        for contact_id in self.model.ids():
+            row = self._row_data(contact_id, contacts[contact_id])
+            old = previous.get(contact_id)
+            rows.append(old if old == row else row)
+        if len(rows) == len(self.data) and all(a is b for a, b in zip(rows, self.data)):
+            return
+        self.data = rows
+
+    def upsert(self, contact_id: str, contact: dict):
+        old_index, index = self.model.upsert(contact_id, contact)
+        row = self._row_data(contact_id, contact)
+        if old_index is None:
+            self.data.insert(index, row)
+        elif old_index == index:
+            if self.data[index] != row:
+                self.data[index] = row
+        else:
+            del self.data[old_index]
+            self.data.insert(index, row)
+
+    def add_contact(self, contact_id: str, contact: dict):
+        if contact_id not in self.model:
+            self.upsert(contact_id, contact)
 
     def update_contact(self, contact_id: str, contact: dict):
-        if contact_id in self._items:
-            self._items[contact_id].update_contact(contact)
+        if contact_id in self.model:
+            self.upsert(contact_id, contact)
 
     def remove_contact(self, contact_id: str):
-        if contact_id in self._items:
-            self.remove_widget(self._items[contact_id])
-            del self._items[contact_id]
+        index = self.model.remove(contact_id)
+        if index is not None:
+            del self.data[index]
 
-    def add_contact(self, contact_id: str, contact: dict):
-        if contact_id not in self._items:
-            item = ContactListItem(
-                contact_id=contact_id,
-                contact=contact,
-                on_select=self.on_select,
-            )
-            self._items[contact_id] = item
-            self.add_widget(item)
+    def contact_ids(self) -> list:
+        return self.model.ids()
+
+    def select(self, contact_id: str):
+        contact = self.model.get(contact_id)
+        if self.on_select and contact is not None:
+            self.on_select(contact_id, contact)
+
+    def _on_theme_color(self, *args):
+        self.refresh_from_data()
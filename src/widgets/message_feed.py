@@ -0,0 +1,535 @@
+from bisect import bisect_right
+
+from kivy.clock import Clock
+from kivy.graphics import Color, RoundedRectangle
+from kivy.metrics import dp
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.widget import Widget
+
+from src.theming.theme_manager import theme_manager
+from src.theming.tokens import ColorPalette
+from src.utils.weak_binding import bind_weak
+from src.widgets.cached_text import CachedText
+from src.widgets.chat_components import format_timestamp
+
+
+class MessageRow(RecycleDataViewBehavior, BoxLayout):
+    """Recycled chat bubble.
+
+    The widget tree is built once with every optional part; binding a new
+    row only updates text, colours and which optional parts are attached,
+    so scrolling never constructs widgets or canvas instructions.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
+        self.size_hint_y = None
+        self.padding = dp(8)
+        self.spacing = dp(4)
+
+        self.feed = None
+        self.index = -1
+        self.message_id = None
+
+        self.bubble_container = BoxLayout(orientation='horizontal', size_hint_y=None, spacing=dp(8))
+        # Fixed avatar gap for incoming messages, flexible for outgoing ones
+        self.lead = Widget(size_hint_x=None, width=dp(36))
+        self.bubble_layout = BoxLayout(orientation='vertical', size_hint_x=0.7, size_hint_y=None)
+        self.bubble_layout.bind(minimum_height=self.bubble_layout.setter('height'))
+        self.bubble_layout.bind(height=self.bubble_container.setter('height'))
+        self.bubble_container.add_widget(self.lead)
+        self.bubble_container.add_widget(self.bubble_layout)
+        self.add_widget(self.bubble_container)
+
+        self.pinned_label = Label(
+            text='📌 Pinned',
+            font_size=theme_manager.typography.CAPTION,
+            color=theme_manager.primary_color,
+            size_hint_y=None,
+            height=dp(24),
+        )
+
+        self.message_box = BoxLayout(orientation='vertical', padding=dp(12), spacing=dp(4), size_hint_y=None)
+        self.message_box.bind(minimum_height=self.message_box.setter('height'))
+        with self.message_box.canvas.before:
+            self.bubble_color_instruction = Color(rgba=ColorPalette.LIGHT_SURFACE)
+            self.bubble_rect = RoundedRectangle(radius=[dp(12)])
+        self.message_box.bind(pos=self._update_bubble_rect, size=self._update_bubble_rect)
+        self.bubble_layout.add_widget(self.message_box)
+
+        # Wrapped text comes from the shared texture cache, so rebinding a
+        # row to a message that was on screen before doesn't rasterize it.
+        self.msg_label = CachedText(font_size=theme_manager.typography.BODY1, size_hint_y=None)
+        self.message_box.add_widget(self.msg_label)
+
+        self.attachments_label = CachedText(font_size=theme_manager.typography.CAPTION, size_hint_y=None)
+
+        footer = BoxLayout(size_hint_y=None, height=dp(20), spacing=dp(4))
+        self.footer_label = Label(font_size=theme_manager.typography.CAPTION, size_hint_y=None, height=dp(16))
+        self.state_label = Label(font_size=theme_manager.typography.CAPTION, size_hint_y=None, height=dp(16))
+        footer.add_widget(self.footer_label)
+        footer.add_widget(self.state_label)
+        self.message_box.add_widget(footer)
+
+        self.reactions_row = BoxLayout(size_hint_y=None, height=dp(32), spacing=dp(4), padding=[dp(12), 0])
+        self.reactions_label = Label(
+            font_size=theme_manager.typography.CAPTION,
+            size_hint_y=None,
+            height=dp(24),
+            halign='left',
+        )
+        self.reactions_label.bind(size=lambda inst, val: setattr(inst, 'text_size', val))
+        self.reactions_row.add_widget(self.reactions_label)
+        self.reactions_row.add_widget(Button(
+            text='➕',
+            size_hint_x=None,
+            width=dp(30),
+            size_hint_y=None,
+            height=dp(24),
+            on_release=lambda *_: self._on_action('react'),
+        ))
+
+        self.add_widget(Button(
+            text='⋮',
+            size_hint_x=None,
+            width=dp(40),
+            size_hint_y=None,
+            height=dp(32),
+            on_release=lambda *_: self._on_action('menu'),
+        ))
+
+        self.bind(minimum_height=self.setter('height'))
+        self.bind(height=self._on_height)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.feed = rv
+        self.index = index
+        self.message_id = data['message_id']
+
+        is_outgoing = data['is_outgoing']
+        dark = theme_manager.theme_mode == 'dark'
+        if is_outgoing:
+            bubble_color = ColorPalette.PRIMARY
+            text_color = ColorPalette.LIGHT_ON_PRIMARY
+        else:
+            bubble_color = ColorPalette.DARK_SURFACE if dark else ColorPalette.LIGHT_SURFACE
+            text_color = theme_manager.text_color
+
+        self.lead.size_hint_x = 1 if is_outgoing else None
+        self.bubble_color_instruction.rgba = bubble_color
+        self.pinned_label.color = theme_manager.primary_color
+        self._attach(self.bubble_layout, self.pinned_label, data['is_pinned'], index=1)
+
+        self.msg_label.text = data['text']
+        self.msg_label.color = text_color
+
+        attachments = data['attachments']
+        self.attachments_label.text = '\n'.join(f'📎 {a.get("name", "File")}' for a in attachments)
+        self.attachments_label.color = text_color
+        self._attach(self.message_box, self.attachments_label, bool(attachments), index=1)
+
+        self.footer_label.text = data['timestamp']
+        self.footer_label.color = ColorPalette.LIGHT_ON_PRIMARY if is_outgoing else (0.5, 0.5, 0.5, 1)
+        state = data['delivery_state']
+        self.state_label.text = ('✓' if state == 'sent' else ('✓✓' if state == 'read' else '⏱')) if is_outgoing else ''
+        self.state_label.color = ColorPalette.PRIMARY if state == 'read' else (0.5, 0.5, 0.5, 1)
+
+        reactions = data['reactions']
+        self.reactions_label.text = '  '.join(f'{r["emoji"]} {r.get("count", 1)}' for r in reactions)
+        self.reactions_label.color = theme_manager.text_color
+        self._attach(self, self.reactions_row, bool(reactions), index=1)
+        rv.schedule_measure()
+
+    @staticmethod
+    def _attach(parent, child, visible, index=0):
+        """Add or remove an optional part; ``index`` counts from the bottom, as in add_widget."""
+        if visible and child.parent is None:
+            parent.add_widget(child, index=index)
+        elif not visible and child.parent is not None:
+            parent.remove_widget(child)
+
+    def _update_bubble_rect(self, instance, value):
+        self.bubble_rect.pos = instance.pos
+        self.bubble_rect.size = instance.size
+
+    def _on_height(self, *args):
+        if self.feed is not None:
+            self.feed.schedule_measure()
+
+    def _on_action(self, action):
+        if self.feed is not None and self.message_id is not None:
+            self.feed.dispatch_action(action, self.message_id)
+
+
+class MessageFeed(RecycleView):
+    """Virtualized message list fed from ``messaging_service`` message dicts.
+
+    Only rows in the viewport exist as widgets. ``data`` is kept keyed by
+    message id so ``sync``, ``upsert`` and ``remove`` touch just the rows
+    that changed. Measured row heights are cached per message (for the
+    current width) and handed back to the layout in ``data``, so rows that
+    scroll back into view, or survive a reload, are placed at their real
+    height immediately instead of the default one.
+
+    The feed holds a window of at most ``max_rows`` messages. ``prepend``
+    and ``append_page`` add history pages and evict rows at the far end;
+    ``has_older``/``has_newer`` say whether the window stops short of
+    either end of the conversation, and ``edge_handler('older'|'newer')``
+    is called when the viewport comes within a screen of such an edge.
+    The scroll position is kept as a distance from the bottom of the
+    content, so prepending above the viewport leaves the visible rows where
+    they are, and new messages only scroll the view if it was at the bottom.
+    """
+
+    def __init__(self, action_handler=None, edge_handler=None, max_rows=200, **kwargs):
+        super().__init__(**kwargs)
+        self.action_handler = action_handler
+        self.edge_handler = edge_handler
+        self.max_rows = int(max_rows)
+        self.has_older = False
+        self.has_newer = False
+        self.do_scroll_x = False
+        # Rows without a cached height are laid out at initial_size until
+        # they have measured themselves.
+        self.layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, None),
+            initial_size=(dp(100), dp(72)),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+            spacing=dp(8),
+            padding=dp(12),
+        )
+        self.layout.bind(minimum_height=self.layout.setter('height'))
+        self.add_widget(self.layout)
+        self.viewclass = MessageRow
+
+        self._ids: list = []
+        self._index: dict = {}
+        self._sources: dict = {}
+        self._heights: dict = {}
+        self._measured_width = None
+        self._bottom_offset = 0.0
+        self._restoring = False
+
+        # Rows are measured once the layout has been quiet for a moment;
+        # while labels and nested boxes are still catching up, recycled
+        # rows briefly carry the previous message's height.
+        self._trigger_measure = Clock.create_trigger(self._measure_visible_rows, 0.1)
+        self._trigger_width = Clock.create_trigger(self._on_width_settled, 0.1)
+        self.bind(width=lambda *_: self._trigger_width())
+        self.bind(scroll_y=self._on_scroll_y, height=self._restore_scroll)
+        self.layout.bind(height=self._restore_scroll)
+        bind_weak(theme_manager, 'theme_mode', self._on_theme_mode)
+
+    # Data ------------------------------------------------------------
+
+    def _row_data(self, message):
+        row = {
+            'message_id': message['id'],
+            'sort_key': (message['timestamp'], message['id']),
+            'text': message['text'],
+            'is_outgoing': bool(message['is_outgoing']),
+            'timestamp': format_timestamp(message['timestamp']),
+            'delivery_state': message.get('delivery_state', 'sent'),
+            # Copied per reaction: the service bumps counts in place.
+            'reactions': [dict(r) for r in message.get('reactions') or []],
+            'is_pinned': bool(message.get('is_pinned')),
+            'attachments': list(message.get('attachments') or []),
+        }
+        height = self._heights.get(message['id'])
+        if height is not None:
+            row['height'] = height
+        return row
+
+    def _reindex(self, start=0):
+        ids = self._ids
+        index = self._index
+        for i in range(start, len(ids)):
+            index[ids[i]] = i
+
+    def message_ids(self) -> list:
+        return list(self._ids)
+
+    def __contains__(self, message_id):
+        return message_id in self._index
+
+    def row(self, message_id):
+        index = self._index.get(message_id)
+        return self.data[index] if index is not None else None
+
+    def first_id(self):
+        return self._ids[0] if self._ids else None
+
+    def last_id(self):
+        return self._ids[-1] if self._ids else None
+
+    def set_messages(self, messages, has_older=False):
+        """Replace the whole feed with the newest messages, reusing cached heights."""
+        self._sources = {m['id']: m for m in messages}
+        self._ids = list(self._sources)
+        self._index = {}
+        self._reindex()
+        self.has_older = bool(has_older)
+        self.has_newer = False
+        self.data = [self._row_data(m) for m in messages]
+        self.scroll_to_bottom()
+
+    def prepend(self, messages, has_more=False) -> int:
+        """Add an older page above the first row; returns the rows added."""
+        self.has_older = bool(has_more)
+        data = self.data
+        first = data[0]['sort_key'] if data else None
+        fresh = [
+            m for m in messages
+            if m['id'] not in self._index and (first is None or (m['timestamp'], m['id']) < first)
+        ]
+        if not fresh:
+            return 0
+        rows = [self._row_data(m) for m in fresh]
+        kept = list(data)
+        overflow = len(rows) + len(kept) - self.max_rows
+        if overflow > 0:
+            # Far below the viewport: drop them and page them back in later.
+            evicted = kept[len(kept) - overflow:]
+            del kept[len(kept) - overflow:]
+            self._forget(evicted)
+            self._bottom_offset = max(0.0, self._bottom_offset - self._extent(evicted))
+            self.has_newer = True
+        for m in fresh:
+            self._sources[m['id']] = m
+        self._ids = [row['message_id'] for row in rows + kept]
+        self._index = {}
+        self._reindex()
+        self.data = rows + kept
+        return len(rows)
+
+    def append_page(self, messages, has_more=False) -> int:
+        """Add a newer page below the last row; returns the rows added."""
+        self.has_newer = bool(has_more)
+        data = self.data
+        last = data[-1]['sort_key'] if data else None
+        fresh = [
+            m for m in messages
+            if m['id'] not in self._index and (last is None or (m['timestamp'], m['id']) > last)
+        ]
+        if not fresh:
+            return 0
+        rows = [self._row_data(m) for m in fresh]
+        for m in fresh:
+            self._sources[m['id']] = m
+        count = len(self._ids)
+        self._ids.extend(m['id'] for m in fresh)
+        self._reindex(count)
+        # Rows arrive below the viewport; keep the visible ones in place.
+        self._bottom_offset += self._extent(rows)
+        data.extend(rows)
+        overflow = len(data) - self.max_rows
+        if overflow > 0:
+            self._forget(data[:overflow])
+            del self._ids[:overflow]
+            self._index = {}
+            self._reindex()
+            del data[:overflow]
+            self.has_older = True
+        return len(rows)
+
+    def _forget(self, rows):
+        for row in rows:
+            message_id = row['message_id']
+            self._index.pop(message_id, None)
+            self._sources.pop(message_id, None)
+            self._heights.pop(message_id, None)
+
+    def _extent(self, rows):
+        """Layout height of ``rows``: measured where known, else the estimate."""
+        estimate = self.layout.initial_size[1]
+        spacing = self.layout.spacing
+        return sum((row.get('height') or self._heights.get(row['message_id']) or estimate) + spacing for row in rows)
+
+    def sync(self, messages):
+        """Bring the feed in line with ``messages`` (oldest first).
+
+        Rows that are gone are removed, rows whose message dict changed are
+        replaced in place and new rows at the end are appended; anything
+        else (reordering, inserts in the middle) falls back to
+        ``set_messages``.
+        """
+        ids = [m['id'] for m in messages]
+        wanted = set(ids)
+        for message_id in [i for i in self._ids if i not in wanted]:
+            self.remove(message_id)
+        count = len(self._ids)
+        if ids[:count] != self._ids:
+            self.set_messages(messages)
+            return
+        for message in messages[:count]:
+            self.upsert(message)
+        if len(ids) > count:
+            for message in messages[count:]:
+                self._sources[message['id']] = message
+            self._ids.extend(ids[count:])
+            self._reindex(count)
+            self._extend_at_bottom(self._row_data(m) for m in messages[count:])
+
+    def upsert(self, message) -> bool:
+        """Update ``message``'s row in place, or insert it in timestamp order.
+
+        Messages outside the loaded window (older than the first row, or
+        newer than the last while newer pages are still unloaded) are left
+        out; returns whether the feed now shows the message.
+        """
+        message_id = message['id']
+        index = self._index.get(message_id)
+        if index is not None:
+            self._replace(index, message)
+            return True
+
+        data = self.data
+        sort_key = (message['timestamp'], message_id)
+        if data and sort_key < data[0]['sort_key']:
+            return False
+        if self.has_newer and data and sort_key > data[-1]['sort_key']:
+            # Beyond the loaded window; it arrives with the next newer page.
+            return False
+        self._sources[message_id] = message
+        position = bisect_right(data, sort_key, key=lambda row: row['sort_key'])
+        self._ids.insert(position, message_id)
+        self._reindex(position)
+        if position == len(data):
+            self._extend_at_bottom([self._row_data(message)])
+        else:
+            data.insert(position, self._row_data(message))
+        return True
+
+    def patch(self, message_id, **fields) -> bool:
+        """Change individual fields of a row, e.g. ``delivery_state`` from a receipt."""
+        index = self._index.get(message_id)
+        if index is None:
+            return False
+        current = self.data[index]
+        if all(current.get(k) == v for k, v in fields.items()):
+            return True
+        # The source dict no longer describes the row.
+        self._sources[message_id] = None
+        self._set_row(index, {**current, **fields})
+        return True
+
+    def _replace(self, index, message):
+        message_id = message['id']
+        if self._sources.get(message_id) is message:
+            return
+        self._sources[message_id] = message
+        self._set_row(index, self._row_data(message))
+
+    def _set_row(self, index, row):
+        current = self.data[index]
+        if {k: v for k, v in current.items() if k != 'height'} == {k: v for k, v in row.items() if k != 'height'}:
+            return
+        # Content changed, so the cached height no longer applies.
+        self._heights.pop(row['message_id'], None)
+        row.pop('height', None)
+        self.data[index] = row
+
+    def _extend_at_bottom(self, rows):
+        # At the bottom the view follows new rows; otherwise it stays put.
+        if self._bottom_offset > 1:
+            self._bottom_offset += self._extent(rows)
+        self.data.extend(rows)
+
+    def remove(self, message_id):
+        index = self._index.pop(message_id, None)
+        if index is None:
+            return
+        del self._ids[index]
+        self._sources.pop(message_id, None)
+        self._heights.pop(message_id, None)
+        self._reindex(index)
+        del self.data[index]
+
+    def clear(self):
+        self._ids = []
+        self._index = {}
+        self._sources = {}
+        self.data = []
+
+    # Heights -----------------------------------------------------------
+
+    def remember_height(self, message_id, height):
+        if message_id in self._index and height > 0:
+            self._heights[message_id] = height
+
+    def schedule_measure(self):
+        self._trigger_measure.cancel()
+        self._trigger_measure()
+
+    def _measure_visible_rows(self, *args):
+        padding_left, _, padding_right, _ = self.layout.padding
+        row_width = self.layout.width - padding_left - padding_right
+        for view, index in list(self.layout.view_indices.items()):
+            # Skip rows not yet at the layout's width or still resizing to content.
+            if index >= len(self.data) or abs(view.width - row_width) >= 1 or view.height != view.minimum_height:
+                continue
+            self.remember_height(self.data[index]['message_id'], view.height)
+
+    def cached_height(self, message_id):
+        return self._heights.get(message_id)
+
+    def _on_width_settled(self, *args):
+        width = round(self.width)
+        if self._measured_width == width:
+            return
+        first = self._measured_width is None
+        self._measured_width = width
+        if first:
+            return
+        # Text wraps differently at the new width; let every row re-measure.
+        self._heights.clear()
+        self.data = [{k: v for k, v in row.items() if k != 'height'} for row in self.data]
+
+    def _on_theme_mode(self, *args):
+        self.refresh_from_data()
+
+    # Scrolling -----------------------------------------------------------
+
+    def scroll_to_bottom(self):
+        self._bottom_offset = 0.0
+        self._restore_scroll()
+
+    def _scrollable(self):
+        return max(self.layout.height - self.height, 0)
+
+    def _on_scroll_y(self, *args):
+        if self._restoring:
+            return
+        self._bottom_offset = self.scroll_y * self._scrollable()
+        self._check_edges()
+
+    def _restore_scroll(self, *args):
+        """Re-derive scroll_y from the distance to the bottom after a size change."""
+        scrollable = self._scrollable()
+        self._bottom_offset = min(self._bottom_offset, scrollable)
+        self._restoring = True
+        try:
+            self.scroll_y = self._bottom_offset / scrollable if scrollable > 0 else 1.0
+        finally:
+            self._restoring = False
+        self._check_edges()
+
+    def _check_edges(self):
+        if self.edge_handler is None or not self.data:
+            return
+        if self.has_older and self._scrollable() - self._bottom_offset < self.height:
+            self.edge_handler('older')
+        if self.has_newer and self._bottom_offset < self.height:
+            self.edge_handler('newer')
+
+    def dispatch_action(self, action, message_id):
+        if self.action_handler is not None:
+            self.action_handler(action, message_id)
@@ -2,23 +2,49 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.anchorlayout import AnchorLayout
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.button import Button
+from kivy.clock import Clock
 from kivy.core.window import Window
 from kivy.metrics import dp
 from kivy.properties import StringProperty, ObjectProperty
 from kivy.graphics import Color, Rectangle
 from src.theming.theme_manager import theme_manager
+from src.utils.boot_trace import boot_tracer
 
 class NavigationItem:
-    def __init__(self, name, text, icon=None, screen=None):
+    """A navigation entry and its screen.
+
+    Pass either a built ``screen`` or a ``factory`` that returns one; a
+    factory is only called the first time the item is needed. ``prewarm``
+    marks likely destinations that the shell builds in idle time.
+    """
+
+    def __init__(self, name, text, icon=None, screen=None, factory=None, prewarm=False):
+        if screen is None and factory is None:
+            raise ValueError('NavigationItem needs a screen or a factory')
         self.name = name
         self.text = text
         self.screen = screen
+        self.factory = factory
+        self.prewarm = prewarm
+
+    @property
+    def is_built(self):
+        return self.screen is not None
+
+    def build(self):
+        if self.screen is None:
+            with boot_tracer.span(f'screen {self.name}', 'screen'):
+                self.screen = self.factory()
+        return self.screen
 
 class ResponsiveShell(BoxLayout):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.orientation = 'vertical'
         self.nav_items = []
+        # Seconds of quiet after a navigation before building prewarm screens.
+        self.prewarm_delay = 1.0
+        self._prewarm_event = None
         
         # Screen Manager area
         self.screen_manager = ScreenManager()
@@ -51,9 +77,40 @@ class ResponsiveShell(BoxLayout):
 
     def add_nav_item(self, item):
         self.nav_items.append(item)
-        self.screen_manager.add_widget(item.screen)
+        # The first screen is the one shown, so it cannot wait.
+        if item.is_built or not self.screen_manager.screens:
+            self._attach(item)
+        elif item.prewarm:
+            self.schedule_prewarm()
         self.rebuild_nav_ui()
 
+    def get_nav_item(self, name):
+        for item in self.nav_items:
+            if item.name == name:
+                return item
+        return None
+
+    def _attach(self, item):
+        screen = item.build()
+        if screen.parent is None:
+            self.screen_manager.add_widget(screen)
+        return screen
+
+    def schedule_prewarm(self):
+        if self._prewarm_event is not None:
+            self._prewarm_event.cancel()
+        self._prewarm_event = Clock.schedule_once(self._prewarm_next, self.prewarm_delay)
+
+    def _prewarm_next(self, dt):
+        self._prewarm_event = None
+        pending = [item for item in self.nav_items if item.prewarm and not item.is_built]
+        if not pending:
+            return
+        # One screen per idle slot keeps each build off the next frame.
+        self._attach(pending[0])
+        if len(pending) > 1:
+            self.schedule_prewarm()
+
     def rebuild_nav_ui(self):
         self.bottom_nav.clear_widgets()
         self.side_nav.clear_widgets()
@@ -68,7 +125,12 @@ class ResponsiveShell(BoxLayout):
             self.side_nav.add_widget(btn_side)
 
     def switch_screen(self, name):
-        self.screen_manager.current = name
+        item = self.get_nav_item(name)
+        if item is None:
+            self.screen_manager.current = name
+            return
+        self.screen_manager.current = self._attach(item).name
+        self.schedule_prewarm()
 
     def on_window_resize(self, window, size):
         self.update_layout()
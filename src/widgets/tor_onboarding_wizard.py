@@ -40,11 +40,11 @@ class TorOnboardingWizard(ModalView):
         self.sm.add_widget(self.bootstrap_screen)
         root.add_widget(self.sm)
 
+        self._state = {}
         root.add_widget(self._build_footer())
         self.add_widget(root)
 
         self._apply_settings_to_form(tor_settings_store.get_settings())
-        self._state = {}
 
     def open(self, *largs):
         event_bus.bind(on_tor_state_update=self._on_tor_state_update)
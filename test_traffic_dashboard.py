@@ -86,11 +86,13 @@ def test_event_bus():
     def on_traffic_update(instance, state):
         received_events.append(state)
     
+    event_bus.flush()  # deliver state queued by the agent test first
     event_bus.bind(on_traffic_obfuscation_update=on_traffic_update)
     
     # Trigger an event
     test_state = {'mode': 'test', 'packets': 100}
     event_bus.emit_traffic_obfuscation_update(test_state)
+    event_bus.flush()  # state topics are coalesced once per frame
     
     assert len(received_events) > 0, "Event should be received"
     assert received_events[-1]['mode'] == 'test', "Event data should match"
@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from src.utils.boot_trace import BootTracer
+
+
+class TestBootTracer(unittest.TestCase):
+    def test_disabled_tracer_records_nothing(self):
+        tracer = BootTracer()
+        with tracer.span('build'):
+            pass
+        tracer.mark('first_frame')
+        self.assertEqual(tracer.events(), [])
+
+    def test_spans_and_marks_become_chrome_trace(self):
+        tracer = BootTracer()
+        tracer.enable(trace_imports=False)
+        with tracer.span('service contact_service', 'service', trigger='access'):
+            with tracer.span('screen dashboard', 'screen'):
+                pass
+        tracer.mark('first_frame')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'trace.json')
+            tracer.write(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                trace = json.load(f)
+
+        events = {e['name']: e for e in trace['traceEvents']}
+        outer, inner = events['service contact_service'], events['screen dashboard']
+        self.assertEqual((outer['ph'], outer['args']), ('X', {'trigger': 'access'}))
+        self.assertLessEqual(outer['ts'], inner['ts'])
+        self.assertGreaterEqual(outer['ts'] + outer['dur'], inner['ts'] + inner['dur'])
+        self.assertEqual(events['first_frame']['ph'], 'i')
+        self.assertEqual(events['process_name']['ph'], 'M')
+
+    def test_import_hook_records_new_modules_only(self):
+        sys.modules.pop('colorsys', None)
+        tracer = BootTracer()
+        tracer.enable()
+        try:
+            import colorsys  # noqa: F401
+            import json as _json  # noqa: F401
+        finally:
+            tracer.uninstall_import_hook()
+        names = [e['name'] for e in tracer.events() if e['cat'] == 'import']
+        self.assertEqual(names, ['import colorsys'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+from kivy.clock import Clock
+from kivy.core.window import Window  # noqa: F401  (text rendering needs a GL context)
+
+from src.widgets.cached_text import CachedText, TextLayoutCache
+
+LONG = 'the quick brown fox jumps over the lazy dog ' * 4
+
+
+class TestTextLayoutCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = TextLayoutCache(bucket=8)
+
+    def test_widths_in_one_bucket_share_a_texture(self):
+        texture = self.cache.render(LONG, 200, 15)
+        self.assertIs(self.cache.render(LONG, 205, 15), texture)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertIsNot(self.cache.render(LONG, 120, 15), texture)
+        self.assertIsNot(self.cache.render(LONG, 200, 18), texture)
+        self.assertEqual(self.cache.stats()['misses'], 3)
+
+    def test_font_name_bold_and_markup_get_their_own_entries(self):
+        plain = self.cache.render('[b]hi[/b]', 200, 15)
+        self.assertIsNot(self.cache.render('[b]hi[/b]', 200, 15, bold=True), plain)
+        self.assertIsNot(self.cache.render('[b]hi[/b]', 200, 15, font_name='DejaVuSans'), plain)
+        self.assertIsNot(self.cache.render('[b]hi[/b]', 200, 15, markup=True), plain)
+        self.assertEqual(self.cache.stats()['misses'], 4)
+
+    def test_narrower_width_wraps_to_more_lines(self):
+        _, wide = self.cache.measure(LONG, 400, 15)
+        _, narrow = self.cache.measure(LONG, 100, 15)
+        self.assertGreater(narrow, wide)
+        self.assertEqual(self.cache.measure('', 100, 15), (0, 0))
+        self.assertIsNone(self.cache.render('', 100, 15))
+
+    def test_hash_collisions_are_misses(self):
+        texture = self.cache.render('first', 100, 15)
+        key = self.cache.key('second', 100, 15)
+        self.cache._entries[key] = ('first', texture)
+        self.assertIsNot(self.cache.render('second', 100, 15), texture)
+
+    def test_least_recently_used_entries_are_evicted_by_pixels(self):
+        first = self.cache.render('one', 96, 15)
+        self.cache.max_pixels = first.width * first.height * 2
+        self.cache.render('two', 96, 15)
+        self.cache.render('one', 96, 15)
+        self.cache.render('three', 96, 15)
+        self.assertEqual(len(self.cache), 2)
+        self.assertIs(self.cache.render('one', 96, 15), first)
+        self.assertLessEqual(self.cache.stats()['pixels'], self.cache.max_pixels)
+
+
+class TestCachedText(unittest.TestCase):
+    def setUp(self):
+        self.cache = TextLayoutCache(bucket=8)
+
+    def test_height_follows_the_wrapped_text(self):
+        label = CachedText(cache=self.cache, text=LONG, font_size=15, size_hint_y=None, width=300)
+        label.texture_update()
+        self.assertEqual(label.height, label.texture_size[1])
+        tall = label.height
+
+        label.width = 120
+        Clock.tick()
+        self.assertGreater(label.height, tall)
+
+    def test_rows_showing_the_same_text_share_one_render(self):
+        a = CachedText(cache=self.cache, text=LONG, size_hint_y=None, width=300)
+        b = CachedText(cache=self.cache, size_hint_y=None, width=302)
+        b.text = LONG
+        b.color = (1, 0, 0, 1)
+        Clock.tick()
+        self.assertIs(a.texture, b.texture)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+        # Moving within the bucket only repositions the texture
+        b.width = 298
+        Clock.tick()
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+
+from kivy.clock import Clock
+
+from src.widgets.contact_list import ContactList, ContactListItem, SortedContactModel
+
+
+def _contact(contact_id, name, **extra):
+    contact = {
+        'id': contact_id,
+        'name': name,
+        'onion_address': f'{contact_id}.onion',
+        'nickname': '',
+        'last_message_preview': '',
+        'last_message_time': None,
+        'presence_status': 'offline',
+    }
+    contact.update(extra)
+    return contact
+
+
+class TestSortedContactModel(unittest.TestCase):
+    def test_upsert_places_by_binary_search_and_reports_moves(self):
+        model = SortedContactModel()
+        model.reset({'b': _contact('b', 'Bob'), 'd': _contact('d', 'dave')})
+        self.assertEqual(model.upsert('c', _contact('c', 'Carol')), (None, 1))
+        self.assertEqual(model.upsert('a', _contact('a', 'Alice')), (None, 0))
+        self.assertEqual(model.ids(), ['a', 'b', 'c', 'd'])
+
+        # Renaming moves the one contact
+        self.assertEqual(model.upsert('a', _contact('a', 'Zed')), (0, 3))
+        self.assertEqual(model.ids(), ['b', 'c', 'd', 'a'])
+        self.assertEqual(model.remove('c'), 1)
+        self.assertIsNone(model.remove('c'))
+        self.assertEqual(model.ids(), ['b', 'd', 'a'])
+
+    def test_same_names_stay_distinct(self):
+        model = SortedContactModel()
+        model.reset({'x2': _contact('x2', 'Sam'), 'x1': _contact('x1', 'sam')})
+        self.assertEqual(model.ids(), ['x1', 'x2'])
+        self.assertEqual(model.index('x2'), 1)
+
+    def test_recent_sorts_newest_first_with_unknown_times_last(self):
+        model = SortedContactModel('recent')
+        model.reset({
+            'a': _contact('a', 'Alice', last_message_time='2024-01-01T10:00:00'),
+            'b': _contact('b', 'Bob'),
+            'c': _contact('c', 'Carol', last_message_time='2024-01-02T10:00:00'),
+        })
+        self.assertEqual(model.ids(), ['c', 'a', 'b'])
+        self.assertEqual(model.upsert('b', _contact('b', 'Bob', last_message_time='2024-01-03T00:00:00')), (2, 0))
+        self.assertEqual(model.ids(), ['b', 'c', 'a'])
+
+
+class TestContactList(unittest.TestCase):
+    def setUp(self):
+        self.selected = []
+        self.contacts = {f'c{i:03d}': _contact(f'c{i:03d}', f'Contact {i:03d}') for i in range(300)}
+        self.list = ContactList(on_select=lambda cid, c: self.selected.append(cid))
+        self.list.size = (400, 600)
+
+    def test_only_visible_rows_are_instantiated(self):
+        self.list.set_contacts(self.contacts)
+        for _ in range(3):
+            Clock.tick()
+        rows = [w for w in self.list.layout.children if isinstance(w, ContactListItem)]
+        self.assertTrue(rows)
+        self.assertLess(len(rows), 20)
+        self.assertEqual(len(self.list.data), 300)
+
+    def test_reload_keeps_rows_of_unchanged_contacts(self):
+        self.list.set_contacts(self.contacts)
+        before = list(self.list.data)
+        contacts = dict(self.contacts, c005=dict(self.contacts['c005'], presence_status='online'))
+        self.list.set_contacts(contacts)
+        self.assertIs(self.list.data[4], before[4])
+        self.assertEqual(self.list.data[5]['presence_status'], 'online')
+
+    def test_update_moves_a_single_row(self):
+        self.list.set_contacts(self.contacts)
+        untouched = self.list.data[1]
+        self.list.update_contact('c000', _contact('c000', 'Zoe'))
+        self.assertEqual(self.list.contact_ids()[-1], 'c000')
+        self.assertEqual(self.list.data[-1]['name'], 'Zoe')
+        self.assertIs(self.list.data[0], untouched)
+        self.assertEqual(len(self.list.data), 300)
+
+        # Updates for contacts that aren't shown are ignored; adds insert in order
+        self.list.update_contact('missing', _contact('missing', 'Nobody'))
+        self.list.add_contact('new', _contact('new', 'Contact 001a'))
+        self.assertEqual(self.list.contact_ids()[:2], ['c001', 'new'])
+        self.list.remove_contact('new')
+        self.assertNotIn('new', [row['contact_id'] for row in self.list.data])
+
+    def test_row_shows_nickname_and_reports_selection(self):
+        self.list.set_contacts({'a': _contact('a', 'Alice', nickname='Al', last_message_preview='hi')})
+        row = ContactListItem()
+        row.refresh_view_attrs(self.list, 0, self.list.data[0])
+        self.assertEqual(row.name_label.text, 'Al')
+        self.assertEqual(row.preview_label.text, 'hi')
+        row._on_select()
+        self.assertEqual(self.selected, ['a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,10 @@ import unittest
 import os
 import tempfile
 import json
+import time
 from unittest.mock import patch, MagicMock
 from src.services.contact_service import ContactService
+from src.utils.event_bus import event_bus
 
 
 class TestContactService(unittest.TestCase):
@@ -312,6 +314,118 @@ class TestContactService(unittest.TestCase):
         contact = self.contact_service.get_contact('id1')
         self.assertEqual(contact['last_message_preview'], 'Hey Alice!')
 
+    def test_only_bulk_changes_announce_contacts_updated(self):
+        bulk, single = [], []
+
+        def on_bulk(instance):
+            bulk.append(True)
+
+        def on_single(instance, contact_id, contact):
+            single.append(contact_id)
+
+        event_bus.bind(on_contacts_updated=on_bulk, on_contact_updated=on_single)
+        try:
+            self.contact_service.add_contact('id1', 'Alice', 'alice.onion')
+            self.contact_service.add_to_group('id1', 'Work')
+            self.contact_service.set_last_message_preview('id1', 'hi')
+            self.contact_service.set_presence_status('id1', 'online')
+            self.assertEqual(bulk, [])
+            self.assertEqual(single, ['id1', 'id1'])
+
+            self.assertTrue(self.contact_service.import_backup(self.contact_service.export_backup()))
+            self.assertEqual(bulk, [True])
+        finally:
+            event_bus.unbind(on_contacts_updated=on_bulk, on_contact_updated=on_single)
+
+
+class TestContactJournal(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.test_dir, 'contacts.enc')
+        self.journal_path = os.path.join(self.test_dir, 'contacts.journal')
+        self.service = self._open()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _open(self):
+        with patch.object(ContactService, '_get_store_path', return_value=self.store_path):
+            return ContactService()
+
+    def test_mutations_append_records_and_replay_on_load(self):
+        self.service.add_contact('id1', 'Alice', 'alice.onion')
+        self.service.add_contact('id2', 'Bob', 'bob.onion')
+        self.service.add_to_favorite('id1')
+        self.service.mute_contact('id2')
+        self.service.add_to_group('id1', 'Work')
+        self.service.set_presence_status('id1', 'online')
+        self.service.set_verification_fingerprint('id2', 'AB:CD', verified=True)
+        request_id = self.service.create_contact_request('id2', 'self')
+        self.service.delete_contact('id2')
+
+        self.assertFalse(os.path.exists(self.store_path))
+        size = os.path.getsize(self.journal_path)
+        self.service.set_presence_status('id1', 'offline')
+        # One record per change, whatever the number of contacts
+        self.assertLess(os.path.getsize(self.journal_path) - size, 1024)
+
+        reloaded = self._open()
+        self.assertEqual(list(reloaded.get_all_contacts()), ['id1'])
+        self.assertEqual(reloaded.get_contact('id1')['presence_status'], 'offline')
+        self.assertEqual(reloaded.get_contact('id1')['groups'], ['Work'])
+        self.assertTrue(reloaded.is_favorite('id1'))
+        self.assertFalse(reloaded.is_muted('id2'))
+        self.assertEqual(reloaded.get_verification_fingerprint('id2'), {})
+        self.assertIn(request_id, reloaded.get_pending_requests())
+
+    def test_compaction_folds_the_journal_into_a_snapshot(self):
+        self.service.add_contact('id1', 'Alice', 'alice.onion')
+        self.service.add_to_favorite('id1')
+        self.service.compact(wait=True)
+        self.assertTrue(os.path.exists(self.store_path))
+        self.assertEqual(os.path.getsize(self.journal_path), 0)
+
+        self.service.block_contact('id1')
+        reloaded = self._open()
+        self.assertTrue(reloaded.is_favorite('id1'))
+        self.assertTrue(reloaded.is_blocked('id1'))
+
+    def test_compaction_starts_after_enough_records(self):
+        self.service.compact_after = 5
+        self.service.add_contact('id1', 'Alice', 'alice.onion')
+        for i in range(6):
+            self.service.set_presence_status('id1', f'status {i}')
+        for _ in range(100):
+            if not self.service._compacting:
+                break
+            time.sleep(0.01)
+        self.assertTrue(os.path.exists(self.store_path))
+        self.assertLess(self.service._journal_records, 5)
+        self.assertEqual(self._open().get_contact('id1')['presence_status'], 'status 5')
+
+    def test_partial_trailing_record_is_skipped(self):
+        self.service.add_contact('id1', 'Alice', 'alice.onion')
+        with open(self.journal_path, 'ab') as f:
+            f.write(b'gAAAAAB-cut-short')
+        self.assertIn('id1', self._open().get_all_contacts())
+
+    def test_append_after_a_torn_tail_is_kept(self):
+        self.service.add_contact('id1', 'Alice', 'alice.onion')
+        with open(self.journal_path, 'ab') as f:
+            f.write(b'gAAAAAB-cut-short')
+        reopened = self._open()
+        reopened.add_contact('id2', 'Bob', 'bob.onion')
+        self.assertEqual(sorted(self._open().get_all_contacts()), ['id1', 'id2'])
+
+    def test_import_backup_replaces_the_journal_with_a_snapshot(self):
+        self.service.add_contact('id1', 'Alice', 'alice.onion')
+        backup = self.service.export_backup()
+        self.service.add_contact('id2', 'Bob', 'bob.onion')
+        self.assertTrue(self.service.import_backup(backup))
+        self.assertEqual(os.path.getsize(self.journal_path), 0)
+        self.assertEqual(list(self._open().get_all_contacts()), ['id1'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,255 @@
+import threading
+import time
+import unittest
+
+from kivy.clock import Clock
+
+from src.utils.event_bus import event_bus
+
+
+def _forget_state(event_type='on_tor_state_update'):
+    # State topics replay their last payload on bind; start each test clean.
+    event_bus.set_sticky(event_type, False)
+    event_bus.set_sticky(event_type, True)
+
+
+class TestEventBusCoalescing(unittest.TestCase):
+    def setUp(self):
+        _forget_state()
+        self.seen = []
+
+    def _record(self, instance, *args):
+        self.seen.append(args)
+
+    def test_state_topic_delivers_latest_once_per_frame(self):
+        event_bus.bind(on_tor_state_update=self._record)
+        try:
+            for i in range(5):
+                event_bus.emit_tor_state({'tick': i})
+            self.assertEqual(self.seen, [])
+
+            Clock.tick()
+            self.assertEqual(self.seen, [({'tick': 4},)])
+
+            Clock.tick()
+            self.assertEqual(len(self.seen), 1)
+        finally:
+            event_bus.unbind(on_tor_state_update=self._record)
+
+    def test_batch_topic_concatenates_per_leading_args(self):
+        event_bus.set_coalescing('on_message_batch', 'concat')
+        event_bus.bind(on_message_batch=self._record)
+        try:
+            event_bus.emit_message_batch('c1', [1, 2])
+            event_bus.emit_message_batch('c2', [9])
+            event_bus.emit_message_batch('c1', [3])
+            event_bus.flush()
+            self.assertEqual(self.seen, [('c1', [1, 2, 3]), ('c2', [9])])
+        finally:
+            event_bus.unbind(on_message_batch=self._record)
+            event_bus.set_coalescing('on_message_batch', None)
+
+    def test_disabling_coalescing_delivers_pending_and_goes_sync(self):
+        event_bus.set_coalescing('on_receipt_update', 'latest')
+        event_bus.bind(on_receipt_update=self._record)
+        try:
+            event_bus.emit_receipt_update('c1', 'm1', 'sent')
+            event_bus.set_coalescing('on_receipt_update', None)
+            self.assertEqual(self.seen, [('c1', 'm1', 'sent')])
+
+            event_bus.emit_receipt_update('c1', 'm1', 'read')
+            self.assertEqual(self.seen[-1], ('c1', 'm1', 'read'))
+        finally:
+            event_bus.unbind(on_receipt_update=self._record)
+
+
+class TestEventBusThreadsafeEmit(unittest.TestCase):
+    def setUp(self):
+        _forget_state()
+        self.seen = []
+        event_bus.bind(on_contact_deleted=self._record, on_tor_state_update=self._record)
+
+    def tearDown(self):
+        event_bus.unbind(on_contact_deleted=self._record, on_tor_state_update=self._record)
+        event_bus.threadsafe_limit = 4096
+        event_bus.threadsafe_dropped = 0
+
+    def _record(self, instance, *args):
+        self.seen.append((threading.get_ident(), args))
+
+    def test_worker_emits_are_delivered_on_main_thread(self):
+        def _produce():
+            for i in range(100):
+                event_bus.emit_threadsafe('on_contact_deleted', f'c{i}')
+                event_bus.emit_threadsafe('on_tor_state_update', {'tick': i})
+
+        workers = [threading.Thread(target=_produce) for _ in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        self.assertEqual(self.seen, [])
+
+        Clock.tick()
+        main = threading.get_ident()
+        self.assertTrue(all(ident == main for ident, _ in self.seen))
+        deleted = [args for _, args in self.seen if isinstance(args[0], str)]
+        states = [args for _, args in self.seen if isinstance(args[0], dict)]
+        self.assertEqual(len(deleted), 400)
+        self.assertEqual(states, [({'tick': 99},)])
+
+    def test_overflow_drops_oldest_plain_emits(self):
+        event_bus.threadsafe_limit = 3
+        for i in range(5):
+            event_bus.emit_threadsafe('on_contact_deleted', f'c{i}')
+        event_bus.flush()
+        self.assertEqual([args for _, args in self.seen], [('c2',), ('c3',), ('c4',)])
+        self.assertEqual(event_bus.threadsafe_dropped, 2)
+
+
+class TestEventBusKeyedSubscriptions(unittest.TestCase):
+    def setUp(self):
+        self.seen = []
+
+    def _record(self, instance, *args):
+        self.seen.append(args)
+
+    def test_only_matching_key_is_called(self):
+        event_bus.subscribe('on_message_deleted', self._record, key='c1')
+        event_bus.subscribe('on_message_received', self._record, key='c1')
+        try:
+            event_bus.emit_message_deleted('c2', 'm1')
+            event_bus.emit_message_deleted('c1', 'm2')
+            event_bus.dispatch('on_message_received', {'conversation_id': 'c2', 'id': 'm3'})
+            event_bus.dispatch('on_message_received', {'conversation_id': 'c1', 'id': 'm4'})
+            self.assertEqual(self.seen, [('c1', 'm2'), ({'conversation_id': 'c1', 'id': 'm4'},)])
+        finally:
+            event_bus.unsubscribe('on_message_deleted', self._record, key='c1')
+            event_bus.unsubscribe('on_message_received', self._record, key='c1')
+
+        event_bus.emit_message_deleted('c1', 'm5')
+        self.assertEqual(len(self.seen), 2)
+
+    def test_coalesced_topics_reach_keyed_subscribers_on_flush(self):
+        event_bus.set_coalescing('on_message_batch', 'concat')
+        event_bus.subscribe('on_message_batch', self._record, key='c1')
+        try:
+            event_bus.emit_message_batch('c1', [1])
+            event_bus.emit_message_batch('c1', [2])
+            event_bus.emit_message_batch('c2', [3])
+            event_bus.flush()
+            self.assertEqual(self.seen, [('c1', [1, 2])])
+        finally:
+            event_bus.unsubscribe('on_message_batch', self._record, key='c1')
+            event_bus.set_coalescing('on_message_batch', None)
+
+    def test_unkeyed_event_types_are_rejected(self):
+        with self.assertRaises(ValueError):
+            event_bus.subscribe('on_theme_changed', self._record, key='dark')
+
+
+class TestEventBusInstrumentation(unittest.TestCase):
+    def setUp(self):
+        _forget_state()
+        self.metrics = event_bus.enable_instrumentation(slow_handler_ms=5.0)
+        self.calls = []
+
+    def tearDown(self):
+        event_bus.disable_instrumentation()
+
+    def _fast(self, instance, *args):
+        self.calls.append(('fast', args))
+
+    def _slow(self, instance, *args):
+        self.calls.append(('slow', args))
+        time.sleep(0.01)
+
+    def test_counts_rates_and_slow_handlers(self):
+        event_bus.bind(on_contact_deleted=self._fast)
+        event_bus.bind(on_contact_deleted=self._slow)
+        event_bus.bind(on_tor_state_update=self._fast)
+        try:
+            for i in range(3):
+                event_bus.emit_contact_deleted(f'c{i}')
+                event_bus.emit_tor_state({'tick': i})
+            event_bus.flush()
+        finally:
+            event_bus.unbind(on_contact_deleted=self._fast, on_tor_state_update=self._fast)
+            event_bus.unbind(on_contact_deleted=self._slow)
+
+        # Newest binding first, exactly like an uninstrumented dispatch.
+        self.assertEqual(self.calls[:2], [('slow', ('c0',)), ('fast', ('c0',))])
+
+        snap = event_bus.instrumentation_snapshot()
+        deleted = snap['events']['on_contact_deleted']
+        self.assertEqual((deleted['emitted'], deleted['delivered']), (3, 3))
+        self.assertGreater(deleted['payload_max_bytes'], 0)
+        tor = snap['events']['on_tor_state_update']
+        self.assertEqual((tor['emitted'], tor['delivered']), (3, 1))
+
+        slow = snap['handlers'][f'{__name__}.TestEventBusInstrumentation._slow']
+        self.assertEqual(slow['slow'], 3)
+        self.assertGreaterEqual(slow['latency']['max_ms'], 10.0)
+        fast = snap['handlers'][f'{__name__}.TestEventBusInstrumentation._fast']
+        self.assertEqual((fast['slow'], fast['latency']['count']), (0, 4))
+
+    def test_disabled_snapshot_is_empty(self):
+        event_bus.disable_instrumentation()
+        self.assertEqual(event_bus.instrumentation_snapshot(), {})
+
+
+class TestEventBusStickyState(unittest.TestCase):
+    def setUp(self):
+        _forget_state('on_max_ai_state_update')
+        self.seen = []
+
+    def _record(self, instance, *args):
+        self.seen.append(args)
+
+    def test_late_binder_receives_last_state(self):
+        event_bus.emit_max_ai_state({'enabled': True})
+        event_bus.flush()
+        self.assertEqual(event_bus.last_value('on_max_ai_state_update'), ({'enabled': True},))
+
+        event_bus.bind(on_max_ai_state_update=self._record)
+        try:
+            self.assertEqual(self.seen, [({'enabled': True},)])
+        finally:
+            event_bus.unbind(on_max_ai_state_update=self._record)
+
+        replayed = []
+        uid = event_bus.fbind('on_max_ai_state_update', lambda *args: replayed.append(args), 'extra')
+        event_bus.unbind_uid('on_max_ai_state_update', uid)
+        self.assertEqual(replayed, [('extra', event_bus, {'enabled': True})])
+
+    def test_pending_coalesced_state_is_not_replayed(self):
+        event_bus.emit_max_ai_state({'enabled': False})
+        event_bus.bind(on_max_ai_state_update=self._record)
+        try:
+            self.assertEqual(self.seen, [])
+            event_bus.flush()
+            self.assertEqual(self.seen, [({'enabled': False},)])
+        finally:
+            event_bus.unbind(on_max_ai_state_update=self._record)
+
+    def test_publish_state_skips_repeats(self):
+        event_bus.bind(on_max_ai_state_update=self._record)
+        try:
+            self.assertTrue(event_bus.publish_state('on_max_ai_state_update', {'v': 1}))
+            self.assertFalse(event_bus.publish_state('on_max_ai_state_update', {'v': 1}))
+            self.assertTrue(event_bus.publish_state('on_max_ai_state_update', {'v': 2}))
+            event_bus.flush()
+            self.assertEqual(self.seen, [({'v': 2},)])
+        finally:
+            event_bus.unbind(on_max_ai_state_update=self._record)
+
+    def test_non_sticky_topics_do_not_replay(self):
+        event_bus.emit_contact_deleted('c1')
+        event_bus.bind(on_contact_deleted=self._record)
+        event_bus.unbind(on_contact_deleted=self._record)
+        self.assertEqual(self.seen, [])
+        self.assertIsNone(event_bus.last_value('on_contact_deleted'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+
+from src.utils.headless import (
+    ColorProperty,
+    HeadlessClock,
+    HeadlessEventDispatcher,
+    JsonStore,
+    NumericProperty,
+    OptionProperty,
+)
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Widgetless(HeadlessEventDispatcher):
+    size = NumericProperty(1)
+    mode = OptionProperty('a', options=['a', 'b'])
+    color = ColorProperty('#ff0000')
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.register_event_type('on_ping')
+
+    def on_ping(self, *args):
+        pass
+
+
+class TestHeadlessClock(unittest.TestCase):
+    def setUp(self):
+        self.clock = HeadlessClock()
+        self.calls = []
+
+    def test_zero_timeout_runs_on_next_tick(self):
+        self.clock.schedule_once(lambda dt: self.calls.append('once'))
+        trigger = self.clock.create_trigger(lambda dt: self.calls.append('trigger'))
+        trigger()
+        trigger()
+        self.assertEqual(self.calls, [])
+        self.clock.tick()
+        self.assertEqual(self.calls, ['once', 'trigger'])
+        self.clock.tick()
+        self.assertEqual(len(self.calls), 2)
+
+    def test_interval_stops_on_false_and_cancel(self):
+        counts = {'a': 0, 'b': 0}
+
+        def _a(dt):
+            counts['a'] += 1
+            return counts['a'] < 3
+
+        self.clock.schedule_interval(_a, 0)
+        event = self.clock.schedule_interval(lambda dt: counts.__setitem__('b', counts['b'] + 1), 0)
+        for _ in range(5):
+            self.clock.tick()
+        event.cancel()
+        self.clock.tick()
+        self.assertEqual(counts, {'a': 3, 'b': 5})
+        self.assertIsNone(self.clock.next_deadline())
+
+    def test_serve_sleeps_until_deadlines(self):
+        started = time.perf_counter()
+        self.clock.schedule_once(lambda dt: self.calls.append(dt), 0.05)
+        self.clock.run(until=lambda: bool(self.calls))
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+        self.assertGreaterEqual(self.calls[0], 0.05)
+
+
+class TestHeadlessEventDispatcher(unittest.TestCase):
+    def test_events_run_newest_first_and_stop_on_true(self):
+        d = _Widgetless()
+        seen = []
+        d.bind(on_ping=lambda inst, x: seen.append(('first', x)))
+        uid = d.fbind('on_ping', lambda tag, inst, x: seen.append((tag, x)) or True, 'second')
+        d.dispatch('on_ping', 1)
+        d.unbind_uid('on_ping', uid)
+        d.dispatch('on_ping', 2)
+        self.assertEqual(seen, [('second', 1), ('first', 2)])
+
+    def test_properties_dispatch_on_change_only(self):
+        d = _Widgetless(size=2)
+        seen = []
+        d.bind(size=lambda inst, v: seen.append(v), color=lambda inst, v: seen.append(v))
+        d.size = 2
+        d.size = 3
+        d.color = [0, 1, 0]
+        self.assertEqual(seen, [3, [0.0, 1.0, 0.0, 1.0]])
+        self.assertEqual(d.color, [0.0, 1.0, 0.0, 1.0])
+        with self.assertRaises(ValueError):
+            d.mode = 'c'
+        self.assertIn('size', d.properties())
+
+    def test_bound_methods_are_weak(self):
+        class _Listener:
+            def on_size(self, inst, value):
+                pass
+
+        d = _Widgetless()
+        listener = _Listener()
+        d.bind(size=listener.on_size)
+        del listener
+        (callback, _, _, is_ref, _), = d.get_property_observers('size', args=True)
+        self.assertTrue(is_ref)
+        self.assertIsNone(callback())
+        d.size = 5
+
+
+class TestHeadlessJsonStore(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'store.json')
+            JsonStore(path).put('settings', a=1, b='x')
+            store = JsonStore(path)
+            self.assertTrue(store.exists('settings'))
+            self.assertEqual(store.get('settings'), {'a': 1, 'b': 'x'})
+
+
+class TestHeadlessCore(unittest.TestCase):
+    def test_core_runs_without_kivy(self):
+        script = textwrap.dedent(
+            '''
+            import sys
+            from src.services.message_store import MessageStore
+            from src.services.app_state_store import AppStateStore
+            from src.services.contact_service import ContactService
+            from src.services.preferences_store import preferences_store
+            from src.services.messaging_service import MessagingService
+            from src.utils.event_bus import event_bus
+            from src.utils.runtime import Clock
+
+            seen = []
+            event_bus.bind(on_tor_state_update=lambda bus, state: seen.append(state))
+            event_bus.emit_tor_state({'tick': 1})
+            event_bus.emit_tor_state({'tick': 2})
+            Clock.run(until=lambda: bool(seen))
+
+            store = MessageStore(key='k')
+            store.close()
+            AppStateStore()
+            ContactService()
+            preferences_store.theme_mode = 'dark'
+            MessagingService().get_conversations()
+
+            assert seen == [{'tick': 2}], seen
+            kivy = sorted(m for m in sys.modules if m == 'kivy' or m.startswith('kivy.'))
+            assert not kivy, kivy
+            print('ok')
+            '''
+        )
+        with tempfile.TemporaryDirectory() as home:
+            env = dict(os.environ, TOR_DASHBOARD_HEADLESS='1', HOME=home, PYTHONPATH=REPO_ROOT)
+            result = subprocess.run(
+                [sys.executable, '-c', script],
+                cwd=REPO_ROOT,
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=60,
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), 'ok')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from kivy.clock import Clock
+
+from src.services.history_pager import HistoryPager
+
+
+class TestHistoryPager(unittest.TestCase):
+    def setUp(self):
+        self.ids = [f'm{i:03d}' for i in range(12)]
+        self.calls = []
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.executor.shutdown)
+        self.pager = HistoryPager('c1', page_size=4, fetch=self._fetch, executor=self.executor)
+
+    def _fetch(self, conversation_id, before=None, after=None, limit=None):
+        with self.lock:
+            self.calls.append((before, after))
+        if before is not None:
+            end = self.ids.index(before)
+            return [{'id': i} for i in self.ids[max(0, end - limit):end]]
+        if after is not None:
+            start = self.ids.index(after) + 1
+            return [{'id': i} for i in self.ids[start:start + limit]]
+        return [{'id': i} for i in self.ids[-limit:]]
+
+    def _wait_for(self, pages, count=1):
+        deadline = time.perf_counter() + 2
+        while len(pages) < count and time.perf_counter() < deadline:
+            Clock.tick()
+            time.sleep(0.005)
+        self.assertGreaterEqual(len(pages), count)
+
+    def test_latest_and_has_more(self):
+        page = self.pager.latest()
+        self.assertEqual([m['id'] for m in page], self.ids[-4:])
+        self.assertTrue(self.pager.has_more(page))
+        self.assertFalse(self.pager.has_more(page[:3]))
+        self.assertFalse(self.pager.has_more(None))
+
+    def test_request_delivers_on_main_thread_and_prefetches_next_page(self):
+        pages, threads = [], []
+
+        def on_page(page):
+            threads.append(threading.current_thread())
+            pages.append(page)
+
+        self.pager.request('older', 'm008', on_page)
+        self._wait_for(pages)
+        self.assertEqual([m['id'] for m in pages[0]], ['m004', 'm005', 'm006', 'm007'])
+        self.assertIs(threads[0], threading.main_thread())
+
+        # The page beyond is already being read; asking for it reuses that read
+        self.pager.request('older', 'm004', pages.append)
+        self._wait_for(pages, 2)
+        self.assertEqual([m['id'] for m in pages[1]], ['m000', 'm001', 'm002', 'm003'])
+        self.assertEqual(self.calls.count(('m004', None)), 1)
+
+    def test_newer_pages_and_short_page_stops_prefetch(self):
+        pages = []
+        self.pager.request('newer', 'm007', pages.append)
+        self._wait_for(pages)
+        self.assertEqual([m['id'] for m in pages[0]], ['m008', 'm009', 'm010', 'm011'])
+        self.pager.request('newer', 'm011', pages.append)
+        self._wait_for(pages, 2)
+        self.assertEqual(pages[1], [])
+        self.assertNotIn(('m011', None), self.calls)
+
+    def test_failed_read_delivers_none(self):
+        def broken(*args, **kwargs):
+            raise RuntimeError('db closed')
+
+        pager = HistoryPager('c1', page_size=4, fetch=broken, executor=self.executor)
+        pages = []
+        pager.request('older', 'm004', pages.append)
+        self._wait_for(pages)
+        self.assertEqual(pages, [None])
+
+    def test_closed_pager_drops_pages(self):
+        pages = []
+        self.pager.request('older', 'm008', pages.append)
+        self.pager.close()
+        self.executor.shutdown(wait=True)
+        for _ in range(3):
+            Clock.tick()
+        self.assertEqual(pages, [])
+        self.pager.request('older', 'm008', pages.append)
+        self.assertEqual(self.calls, [('m008', None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
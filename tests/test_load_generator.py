@@ -0,0 +1,55 @@
+import random
+import unittest
+from itertools import islice
+
+from src.services.load_generator import LoadGenerator, LoadProfile, arrival_gaps, messaging_service_target
+from src.services.messaging_service import MessagingService
+
+
+class TestLoadGenerator(unittest.TestCase):
+    def test_rate_profiles_average_to_target_rate(self):
+        rng = random.Random(7)
+        steady = list(islice(arrival_gaps(LoadProfile(kind='steady', rate=100), rng), 100))
+        self.assertAlmostEqual(sum(steady), 1.0)
+
+        bursty = list(islice(arrival_gaps(LoadProfile(kind='bursty', rate=100, burst_size=10), rng), 100))
+        self.assertAlmostEqual(sum(bursty), 1.0)
+        self.assertEqual(bursty[:3], [0.1, 0.0, 0.0])
+
+        poisson = list(islice(arrival_gaps(LoadProfile(kind='poisson', rate=100), rng), 5000))
+        self.assertAlmostEqual(sum(poisson) / len(poisson), 0.01, delta=0.001)
+
+    def test_blocking_run_records_latency_and_distribution(self):
+        seen = []
+        profile = LoadProfile(kind='steady', rate=400, duration=0.1, conversations=3, size_mean=20, size_stddev=0, seed=1)
+        report = LoadGenerator(profile, lambda cid, mid, body: seen.append((cid, body))).run_blocking()
+
+        self.assertGreaterEqual(report['sent'], 35)
+        self.assertEqual(report['sent'], len(seen))
+        self.assertEqual(report['errors'], 0)
+        self.assertEqual(report['latency']['count'], report['sent'])
+        self.assertTrue(all(len(body) == 20 for _, body in seen))
+        self.assertLessEqual({cid for cid, _ in seen}, {'load_0', 'load_1', 'load_2'})
+
+    def test_drives_messaging_service(self):
+        service = object.__new__(MessagingService)
+        service.__init__()
+        before = len(service.get_conversation_messages('conv_3'))
+
+        profile = LoadProfile(kind='bursty', rate=1000, burst_size=25, duration=0.01, conversations=1, seed=3)
+        report = LoadGenerator(profile, messaging_service_target(service), conversation_ids=['conv_3']).run_blocking()
+
+        self.assertEqual(report['errors'], 0)
+        self.assertEqual(len(service.get_conversation_messages('conv_3')), before + report['sent'])
+
+
+    def test_rejected_messages_count_as_errors(self):
+        service = MessagingService()
+        profile = LoadProfile(kind='bursty', rate=1000, burst_size=10, duration=0.005, conversations=2, seed=5)
+        report = LoadGenerator(profile, messaging_service_target(service)).run_blocking()
+
+        self.assertGreater(report['sent'], 0)
+        self.assertEqual(report['errors'], report['sent'])
+
+if __name__ == '__main__':
+    unittest.main()
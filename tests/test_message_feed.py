@@ -0,0 +1,168 @@
+import time
+import unittest
+from datetime import datetime
+
+from kivy.clock import Clock
+
+from src.services.messaging_service import MessagingService
+from src.widgets.message_feed import MessageFeed, MessageRow
+
+
+def _message(message_id, text='hello', **extra):
+    message = {
+        'id': message_id,
+        'conversation_id': 'c1',
+        'text': text,
+        'is_outgoing': False,
+        'timestamp': datetime(2024, 1, 1, 12, 0),
+        'delivery_state': 'sent',
+        'reactions': [],
+        'is_pinned': False,
+        'attachments': [],
+    }
+    message.update(extra)
+    return message
+
+
+class TestMessageFeed(unittest.TestCase):
+    def setUp(self):
+        self.actions = []
+        self.feed = MessageFeed(action_handler=lambda action, mid: self.actions.append((action, mid)))
+        self.feed.size = (400, 300)
+        self.messages = [_message(f'm{i}', f'message {i}') for i in range(200)]
+
+    def _settle(self):
+        for _ in range(3):
+            Clock.tick()
+
+    def test_only_visible_rows_are_instantiated(self):
+        self.feed.set_messages(self.messages)
+        self._settle()
+        rows = [w for w in self.feed.layout.children if isinstance(w, MessageRow)]
+        self.assertTrue(rows)
+        self.assertLess(len(rows), 20)
+        self.assertEqual(len(self.feed.data), 200)
+
+    def test_sync_updates_rows_in_place(self):
+        self.feed.set_messages(self.messages)
+        first_rows = list(self.feed.data)
+
+        changed = dict(self.messages[5], reactions=[{'emoji': '👍', 'count': 1}])
+        updated = self.messages[:5] + [changed] + self.messages[6:] + [_message('m200')]
+        self.feed.sync(updated)
+
+        self.assertEqual(len(self.feed.data), 201)
+        self.assertEqual(self.feed.data[5]['reactions'], [{'emoji': '👍', 'count': 1}])
+        self.assertEqual(self.feed.data[200]['message_id'], 'm200')
+        # Untouched rows keep their dicts
+        self.assertIs(self.feed.data[4], first_rows[4])
+        self.assertIs(self.feed.data[6], first_rows[6])
+
+    def test_sync_removes_missing_messages(self):
+        self.feed.set_messages(self.messages[:5])
+        self.feed.sync(self.messages[:2] + self.messages[3:5])
+        self.assertEqual(self.feed.message_ids(), ['m0', 'm1', 'm3', 'm4'])
+
+    def test_upsert_inserts_in_timestamp_order(self):
+        self.feed.set_messages([_message('a', timestamp=datetime(2024, 1, 1, 12, 0)),
+                                _message('c', timestamp=datetime(2024, 1, 1, 12, 2))])
+        self.assertTrue(self.feed.upsert(_message('b', timestamp=datetime(2024, 1, 1, 12, 1))))
+        self.assertTrue(self.feed.upsert(_message('d', timestamp=datetime(2024, 1, 1, 12, 3))))
+        # Older than the loaded window: belongs to unloaded history
+        self.assertFalse(self.feed.upsert(_message('z', timestamp=datetime(2023, 1, 1))))
+        self.assertEqual(self.feed.message_ids(), ['a', 'b', 'c', 'd'])
+        self.assertEqual(self.feed.row('c')['message_id'], 'c')
+
+    def test_patch_changes_single_fields(self):
+        self.feed.set_messages(self.messages[:3])
+        self.feed.remember_height('m1', 90)
+        untouched = self.feed.data[0]
+        self.assertTrue(self.feed.patch('m1', delivery_state='read'))
+        self.assertEqual(self.feed.row('m1')['delivery_state'], 'read')
+        self.assertIsNone(self.feed.cached_height('m1'))
+        self.assertIs(self.feed.data[0], untouched)
+        self.assertFalse(self.feed.patch('missing', delivery_state='read'))
+
+    def test_visible_rows_are_measured_once_settled(self):
+        self.feed.set_messages(self.messages)
+        deadline = time.perf_counter() + 1.0
+        while time.perf_counter() < deadline:
+            Clock.tick()
+            time.sleep(0.01)
+            rows = {w.message_id: w.height for w in self.feed.layout.children if isinstance(w, MessageRow)}
+            if rows and all(self.feed.cached_height(mid) is not None for mid in rows):
+                break
+        self.assertTrue(rows)
+        for message_id, height in rows.items():
+            self.assertEqual(self.feed.cached_height(message_id), height)
+
+    def test_heights_are_cached_until_content_changes(self):
+        self.feed.set_messages(self.messages[:3])
+        self.feed.remember_height('m1', 120)
+        self.feed.set_messages(self.messages[:3])
+        self.assertEqual(self.feed.data[1]['height'], 120)
+
+        self.feed.sync([self.messages[0], dict(self.messages[1], text='edited'), self.messages[2]])
+        self.assertIsNone(self.feed.cached_height('m1'))
+        self.assertNotIn('height', self.feed.data[1])
+
+    def test_pages_extend_the_window_and_evict_the_far_edge(self):
+        feed = MessageFeed(max_rows=6)
+        feed.size = (400, 300)
+        stamp = lambda i: datetime(2024, 1, 1, 12, i)
+        history = [_message(f'm{i}', timestamp=stamp(i)) for i in range(10)]
+        feed.set_messages(history[6:], has_older=True)
+
+        self.assertEqual(feed.prepend(history[2:6] + history[7:8], has_more=True), 4)
+        self.assertEqual(feed.message_ids(), ['m2', 'm3', 'm4', 'm5', 'm6', 'm7'])
+        self.assertTrue(feed.has_older)
+        self.assertTrue(feed.has_newer)
+        self.assertNotIn('m9', feed)
+
+        self.assertEqual(feed.append_page(history[8:], has_more=False), 2)
+        self.assertEqual(feed.message_ids(), ['m4', 'm5', 'm6', 'm7', 'm8', 'm9'])
+        self.assertFalse(feed.has_newer)
+        self.assertEqual(feed.row('m8')['message_id'], 'm8')
+        self.assertEqual(feed.prepend([], has_more=False), 0)
+        self.assertFalse(feed.has_older)
+
+    def test_appended_page_keeps_distance_from_bottom(self):
+        self.feed.set_messages(self.messages[:100])
+        self._settle()
+        self.feed.scroll_y = 0.5
+        before = self.feed._bottom_offset
+        self.feed.append_page([_message(f'n{i}') for i in range(3)])
+        self.assertAlmostEqual(self.feed._bottom_offset, before + 3 * (self.feed.layout.initial_size[1] + self.feed.layout.spacing))
+
+    def test_repeated_reaction_bumps_the_row_count(self):
+        service = MessagingService()
+        conversation_id = service.get_conversations()[0]['id']
+        message = next(m for m in service.get_conversation_messages(conversation_id) if not m['reactions'])
+        self.feed.set_messages([message])
+
+        for expected in (1, 2):
+            before = self.feed.data[0]
+            self.assertTrue(service.add_reaction(conversation_id, message['id'], '👍'))
+            self.feed.upsert(service.get_message(conversation_id, message['id']))
+            # A new row dict is what makes the RecycleView rebind the row.
+            self.assertIsNot(self.feed.data[0], before)
+            self.assertEqual(self.feed.data[0]['reactions'], [{'emoji': '👍', 'count': expected}])
+
+    def test_recycled_row_rebinds_and_reports_actions(self):
+        self.feed.set_messages(self.messages[:2])
+        row = MessageRow()
+        row.refresh_view_attrs(self.feed, 0, dict(self.feed.data[0], is_pinned=True, reactions=[{'emoji': '🔥'}]))
+        self.assertIsNotNone(row.pinned_label.parent)
+        self.assertIsNotNone(row.reactions_row.parent)
+
+        row.refresh_view_attrs(self.feed, 1, self.feed.data[1])
+        self.assertEqual(row.msg_label.text, 'message 1')
+        self.assertIsNone(row.pinned_label.parent)
+        self.assertIsNone(row.reactions_row.parent)
+
+        row._on_action('menu')
+        self.assertEqual(self.actions, [('menu', 'm1')])
+
+
+if __name__ == '__main__':
+    unittest.main()
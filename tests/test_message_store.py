@@ -141,6 +141,114 @@ class TestMessageStore(unittest.TestCase):
             self.assertIn(store.get_message('m1')['status'], {'sent', 'delivered'})
             store.close()
 
+    def test_delta_sync_exchanges_only_new_messages(self):
+        with tempfile.TemporaryDirectory() as td:
+            alice_store = MessageStore(key='k1', db_path=os.path.join(td, 'alice.db'))
+            bob_store = MessageStore(key='k2', db_path=os.path.join(td, 'bob.db'))
+            alice = MessageSyncService(alice_store)
+            bob = MessageSyncService(bob_store)
+
+            base = time.time() - 100
+            for i in range(5):
+                alice_store.upsert_message('c1', f'a{i}', sender_id='alice', body=f'hi {i}', created_at=base + i)
+
+            request = bob.build_sync_request('c1', 'alice', limit=3)
+            self.assertEqual(request['since'], 0)
+            response = alice.handle_sync_request('bob', request)
+            self.assertTrue(response['has_more'])
+            self.assertEqual(bob.apply_sync_response('alice', response), 3)
+
+            response = alice.handle_sync_request('bob', bob.build_sync_request('c1', 'alice', limit=3))
+            self.assertFalse(response['has_more'])
+            self.assertEqual(bob.apply_sync_response('alice', response), 2)
+            self.assertEqual(len(bob_store.fetch_history('c1', limit=50)), 5)
+
+            # Reconnect with nothing new: the range is empty.
+            response = alice.handle_sync_request('bob', bob.build_sync_request('c1', 'alice'))
+            self.assertEqual(response['messages'], [])
+            self.assertEqual(alice_store.get_sync_cursor('c1', 'bob')['acked_seq'], response['high_water'])
+
+            # Only the delta crosses, and bob's own messages are not echoed back.
+            alice_store.upsert_message('c1', 'b0', sender_id='bob', body='from bob', created_at=base + 10)
+            alice_store.upsert_message('c1', 'a5', sender_id='alice', body='new', created_at=base + 11)
+            response = alice.handle_sync_request('bob', bob.build_sync_request('c1', 'alice'))
+            self.assertEqual([p['message_id'] for p in response['messages']], ['a5'])
+            self.assertEqual(bob.apply_sync_response('alice', response), 1)
+
+            alice_store.close()
+            bob_store.close()
+
+    def test_unacked_sends_are_recovered_from_journal(self):
+        with tempfile.TemporaryDirectory() as td:
+            db_path = os.path.join(td, 'messages.db')
+            store = MessageStore(key='k1', db_path=db_path)
+            lost = []
+            sync = MessageSyncService(store, transport=lambda msg, done: lost.append(done))
+
+            sync.queue_outgoing_message('c1', 'm1', sender_id='me', body='one')
+            sync.queue_outgoing_message('c2', 'm2', sender_id='me', body='two')
+            sync.set_online(True)
+            self.assertEqual(len(lost), 2)
+            lost[1](True)
+            self.assertEqual(store.get_message('m2')['status'], 'delivered')
+            store.close()
+
+            # Process "crashed" with m1 handed off but never acked.
+            store = MessageStore(key='k1', db_path=db_path)
+            self.assertEqual(store.get_unacked_sends(), ['m1'])
+            resent = []
+            sync = MessageSyncService(store, transport=lambda msg, done: resent.append(msg['id']))
+            self.assertEqual(sync.recover_in_flight(), 1)
+            self.assertEqual(store.get_message('m1')['status'], 'queued')
+            self.assertEqual(store.get_unacked_sends(), [])
+
+            sync.set_online(True)
+            self.assertEqual(resent, ['m1'])
+            store.close()
+
+    def test_backed_off_head_holds_its_conversation_after_restart(self):
+        with tempfile.TemporaryDirectory() as td:
+            db_path = os.path.join(td, 'messages.db')
+            store = MessageStore(key='k1', db_path=db_path)
+            base = time.time() - 10
+            for i in range(3):
+                store.upsert_message(
+                    'c1', f'm{i}', sender_id='me', body=f'one {i}', created_at=base + i, is_outgoing=True, status='queued'
+                )
+            store.upsert_message('c2', 'n0', sender_id='me', body='two', created_at=base, is_outgoing=True, status='queued')
+            store.mark_retry('m0', delay_seconds=60, retry_count=1)
+            store.close()
+
+            store = MessageStore(key='k1', db_path=db_path)
+            sent = []
+            sync = MessageSyncService(store, transport=lambda msg, done: sent.append(msg['id']))
+            sync.set_online(True)
+            self.assertEqual(sent, ['n0'])
+
+            store.mark_retry('m0', delay_seconds=-1)
+            sync.flush_outgoing_queue()
+            self.assertEqual(sent, ['n0', 'm0'])
+            store.close()
+
+    def test_ack_and_delivered_status_are_written_together(self):
+        with tempfile.TemporaryDirectory() as td:
+            store = MessageStore(key='k1', db_path=os.path.join(td, 'messages.db'))
+            store.upsert_message('c1', 'm1', sender_id='me', body='one', created_at=time.time(), status='sent')
+            store.append_send_journal('m1', 'handoff')
+
+            self.assertTrue(store.finish_send('m1', True))
+            self.assertEqual(store.get_message('m1')['status'], 'delivered')
+            self.assertEqual(store.get_unacked_sends(), [])
+            # A late duplicate ack doesn't move the status again
+            self.assertFalse(store.finish_send('m1', True))
+
+            store.upsert_message('c1', 'm2', sender_id='me', body='two', created_at=time.time(), status='sent')
+            store.append_send_journal('m2', 'handoff')
+            self.assertFalse(store.finish_send('m2', False))
+            self.assertEqual(store.get_message('m2')['status'], 'sent')
+            self.assertEqual(store.get_unacked_sends(), [])
+            store.close()
+
 
 if __name__ == '__main__':
     unittest.main()
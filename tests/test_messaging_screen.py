@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+
+from kivy.clock import Clock
+
+from src.screens.messaging_screen import MessagingScreen
+from src.services.registry import services
+from src.utils.event_bus import event_bus
+
+
+class TestMessagingScreenEvents(unittest.TestCase):
+    def setUp(self):
+        self.service = services.get('messaging_service')
+        self.screen = MessagingScreen()
+        Clock.tick()
+        self.conversation_id = self.screen.current_conversation_id
+        self.feed = self.screen.message_feed
+        fetch = mock.patch.object(self.service, 'fetch_page', wraps=self.service.fetch_page)
+        self.fetch = fetch.start()
+        self.addCleanup(fetch.stop)
+        self.addCleanup(self._unsubscribe)
+
+    def _unsubscribe(self):
+        # The Window keeps old screens alive; stop them reacting to later tests.
+        for event_type, handler in self.screen._conversation_handlers.items():
+            event_bus.unsubscribe(event_type, handler, key=self.conversation_id)
+
+    def _settle(self):
+        for _ in range(3):
+            Clock.tick()
+
+    def test_events_patch_rows_without_refetching(self):
+        first = self.feed.message_ids()[0]
+        self.service.receive_message(self.conversation_id, 'new one')
+        self.service.add_reaction(self.conversation_id, first, '🔥')
+        self.service.pin_message(self.conversation_id, first)
+        self._settle()
+
+        self.assertEqual(self.feed.data[-1]['text'], 'new one')
+        self.assertIn({'emoji': '🔥', 'count': 1}, self.feed.row(first)['reactions'])
+        self.assertTrue(self.feed.row(first)['is_pinned'])
+        self.assertEqual(self.screen.pinned_banner.message_id, first)
+
+        self.service.delete_message(self.conversation_id, first)
+        self._settle()
+        self.assertNotIn(first, self.feed)
+        self.assertIsNone(self.screen.pinned_banner)
+        self.fetch.assert_not_called()
+
+    def test_events_for_another_conversation_are_ignored(self):
+        rows = list(self.feed.data)
+        event_bus.dispatch('on_read_receipt', {
+            'conversation_id': 'elsewhere',
+            'message_id': self.feed.message_ids()[0],
+            'state': 'read',
+        })
+        self._settle()
+        self.assertEqual(list(self.feed.data), rows)
+
+    def test_incoming_messages_in_the_open_conversation_are_read(self):
+        def unread():
+            for conv in self.service.get_conversations():
+                if conv['id'] == self.conversation_id:
+                    return conv['unread_count']
+
+        self.assertEqual(unread(), 0)
+        self.service.receive_message(self.conversation_id, 'one')
+        self.service.receive_message(self.conversation_id, 'two')
+        self._settle()
+        self.assertEqual(unread(), 0)
+
+    def test_dropped_events_trigger_a_refetch(self):
+        event_bus.threadsafe_dropped += 1
+        self.addCleanup(setattr, event_bus, 'threadsafe_dropped', event_bus.threadsafe_dropped - 1)
+        self.service.receive_message(self.conversation_id, 'after a gap')
+        self._settle()
+        self.fetch.assert_called_once()
+        self.assertEqual(self.feed.data[-1]['text'], 'after a gap')
+
+
+if __name__ == '__main__':
+    unittest.main()
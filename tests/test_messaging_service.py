@@ -0,0 +1,307 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from src.services.message_search_index import MessageSearchIndex
+from src.services.message_store import MessageStore
+from src.services.message_sync_service import MessageSyncService
+from src.services.messaging_service import Conversation, Message, MessagingService
+from src.utils.event_bus import event_bus
+
+
+def _fresh_service():
+    # MessagingService is a singleton; tests get their own instance.
+    service = object.__new__(MessagingService)
+    service.__init__()
+    return service
+
+
+class TestConversationModel(unittest.TestCase):
+    def setUp(self):
+        self.conv = Conversation('c1', 'Chat')
+        for i in range(10):
+            self.conv.add_message(Message(f'm{i}', f'text {i}', is_outgoing=i % 2 == 0))
+
+    def test_windowed_slices(self):
+        self.assertEqual([m.id for m in self.conv.get_window(limit=3)], ['m7', 'm8', 'm9'])
+        self.assertEqual([m.id for m in self.conv.get_window(limit=2, before='m5')], ['m3', 'm4'])
+        self.assertEqual([m.id for m in self.conv.get_window(limit=2, after='m5')], ['m6', 'm7'])
+        self.assertEqual(len(self.conv.get_window()), 10)
+
+    def test_pinning_keeps_single_pinned_pointer(self):
+        self.assertTrue(self.conv.pin_message('m2'))
+        self.assertTrue(self.conv.pin_message('m4'))
+        self.assertEqual(self.conv.get_pinned_message().id, 'm4')
+        self.assertFalse(self.conv.get_message('m2').to_dict()['is_pinned'])
+
+        self.conv.unpin_message('m4')
+        self.assertIsNone(self.conv.get_pinned_message())
+        self.assertFalse(self.conv.pin_message('missing'))
+
+    def test_reaction_invalidates_cached_dict(self):
+        before = self.conv.get_message('m1').to_dict()
+        self.assertIs(before, self.conv.get_message('m1').to_dict())
+
+        self.conv.add_reaction('m1', '👍')
+        self.conv.add_reaction('m1', '👍')
+        after = self.conv.get_message('m1').to_dict()
+        self.assertEqual(after['reactions'], [{'emoji': '👍', 'count': 2}])
+
+    def test_remove_message_reindexes(self):
+        self.conv.pin_message('m3')
+        self.conv.remove_message('m3')
+        self.assertIsNone(self.conv.get_pinned_message())
+        self.assertEqual([m.id for m in self.conv.get_window(limit=2, before='m5')], ['m2', 'm4'])
+        self.assertEqual(len(self.conv.messages), 9)
+
+
+class TestMessageSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = MessageSearchIndex()
+        self.index.add('m1', 'c1', 'Meeting at 3 PM', 1.0)
+        self.index.add('m2', 'c2', 'meet me at the [cafe]', 2.0)
+        self.index.add('m3', 'c2', 'Coffee tomorrow?', 3.0)
+
+    def test_prefix_query_across_conversations(self):
+        results = self.index.search('mee')
+        self.assertEqual({r['message_id'] for r in results}, {'m1', 'm2'})
+        self.assertEqual(self.index.search('mee', conversation_id='c2')[0]['message_id'], 'm2')
+
+    def test_exact_hits_rank_above_prefix_hits(self):
+        results = self.index.search('meet')
+        self.assertEqual([r['message_id'] for r in results], ['m2', 'm1'])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual([r['message_id'] for r in self.index.search('meet cafe')], ['m2'])
+        self.assertEqual(self.index.search('meet coffee'), [])
+
+    def test_highlight_uses_token_offsets_case_insensitively(self):
+        result = self.index.search('MEETING')[0]
+        self.assertEqual(result['spans'], [(0, 7)])
+        self.assertEqual(result['highlighted'], '[b]Meeting[/b] at 3 PM')
+
+        cafe = self.index.search('caf')[0]
+        self.assertEqual(cafe['highlighted'], 'meet me at the &bl;[b]caf[/b]e&br;')
+
+    def test_remove_and_update(self):
+        self.index.remove('m1')
+        self.assertEqual([r['message_id'] for r in self.index.search('meeting')], [])
+        self.index.add('m3', 'c2', 'Tea tomorrow?', 3.0)
+        self.assertEqual(self.index.search('coffee'), [])
+        self.assertEqual(self.index.search('tea')[0]['message_id'], 'm3')
+
+
+class TestMockMessagingServiceSearch(unittest.TestCase):
+    def test_search_covers_new_and_deleted_messages(self):
+        service = _fresh_service()
+        self.assertTrue(service.send_message('conv_2', 'Lunch on Friday?'))
+        results = service.search_messages(None, 'lunch')
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['conversation_id'], 'conv_2')
+
+        self.assertEqual(len(service.search_messages('conv_1', 'lunch')), 0)
+
+        self.assertTrue(service.delete_message('conv_2', results[0]['message_id']))
+        self.assertEqual(service.search_messages(None, 'lunch'), [])
+
+
+class TestMockMessagingServiceSummaries(unittest.TestCase):
+    def test_unread_follows_receive_read_and_delete(self):
+        service = _fresh_service()
+        unread = {c['id']: c['unread_count'] for c in service.get_conversations()}
+        self.assertEqual(unread, {'conv_1': 0, 'conv_2': 0, 'conv_3': 1})
+
+        service.receive_message('conv_1', 'first', message_id='in1')
+        service.receive_message('conv_1', 'second', message_id='in2')
+        service.send_message('conv_1', 'reply')
+        conv = service.get_conversations()[0]
+        self.assertEqual((conv['unread_count'], conv['last_message']), (2, 'reply'))
+
+        self.assertTrue(service.delete_message('conv_1', 'in2'))
+        self.assertEqual(service.get_conversations()[0]['unread_count'], 1)
+
+        self.assertEqual(service.mark_read_up_to('conv_1', 'in1'), 1)
+        self.assertEqual(service.mark_read_up_to('conv_1', 'in1'), 0)
+        self.assertEqual(service.get_conversations()[0]['unread_count'], 0)
+
+    def test_ids_are_not_reused_after_a_delete(self):
+        service = _fresh_service()
+        self.assertTrue(service.send_message('conv_1', 'one'))
+        first = service.get_conversation_messages('conv_1')[-1]['id']
+        self.assertTrue(service.delete_message('conv_1', first))
+        self.assertTrue(service.send_message('conv_1', 'two'))
+        second = service.get_conversation_messages('conv_1')[-1]
+        self.assertNotEqual(second['id'], first)
+        self.assertEqual(second['text'], 'two')
+
+        self.assertTrue(service.receive_message('conv_1', 'hi', message_id='in1'))
+        self.assertFalse(service.receive_message('conv_1', 'hi again', message_id='in1'))
+        self.assertEqual(service.get_message('conv_1', 'in1')['text'], 'hi')
+
+    def test_summaries_since_token_return_only_changes(self):
+        service = _fresh_service()
+        full = service.get_conversation_summaries()
+        self.assertEqual(len(full['conversations']), 3)
+
+        idle = service.get_conversation_summaries(full['version'])
+        self.assertEqual(idle, {'version': full['version'], 'conversations': []})
+
+        first = service.get_conversations()[1]
+        self.assertIs(first, service.get_conversations()[1])
+        service.receive_message('conv_2', 'ping')
+        delta = service.get_conversation_summaries(full['version'])
+        self.assertEqual([c['id'] for c in delta['conversations']], ['conv_2'])
+        self.assertEqual(delta['conversations'][0]['last_message'], 'ping')
+        self.assertGreater(delta['version'], full['version'])
+
+        # Reading nothing new does not produce a change.
+        service.mark_read_up_to('conv_1', 'msg_1_4')
+        self.assertEqual(service.get_conversation_summaries(delta['version'])['conversations'], [])
+
+
+class TestStoreBackedMessagingService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = MessageStore(key='k1', db_path=os.path.join(self.tmp.name, 'messages.db'))
+        self.store.upsert_conversation('c1', title='Chat')
+        base = time.time() - 100
+        for i in range(5):
+            self.store.upsert_message('c1', f'm{i}', sender_id='alice', body=f'msg {i}', created_at=base + i)
+
+        self.service = _fresh_service()
+        self.service.page_size = 3
+        self.service.attach_store(self.store, sync_service=MessageSyncService(self.store))
+
+    def tearDown(self):
+        self.service.detach_store()
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_lazy_window_and_paging(self):
+        summary = self.service.get_conversations()
+        self.assertEqual(summary[0]['name'], 'Chat')
+        self.assertEqual(summary[0]['last_message'], 'msg 4')
+
+        window = self.service.get_conversation_messages('c1')
+        self.assertEqual([m['id'] for m in window], ['m2', 'm3', 'm4'])
+
+        older = self.service.load_older_messages('c1')
+        self.assertEqual([m['id'] for m in older], ['m0', 'm1'])
+        self.assertEqual(len(self.service.get_conversation_messages('c1')), 5)
+        self.assertEqual(self.service.load_older_messages('c1'), [])
+
+    def test_unread_state_comes_from_the_persisted_read_marker(self):
+        self.assertEqual(self.service.get_conversations()[0]['unread_count'], 5)
+        self.assertEqual(self.service.mark_read_up_to('c1', 'm2'), 3)
+
+        # Loading the window doesn't re-count messages that were read.
+        self.service.get_conversation_messages('c1')
+        self.assertEqual(self.service.get_conversations()[0]['unread_count'], 2)
+
+        self.service.detach_store()
+        self.service.attach_store(self.store, sync_service=MessageSyncService(self.store))
+        self.assertEqual(self.service.get_conversations()[0]['unread_count'], 2)
+        self.service.get_conversation_messages('c1')
+        self.assertEqual(self.service.get_conversations()[0]['unread_count'], 2)
+        # The marker never moves back.
+        self.assertEqual(self.service.mark_read_up_to('c1', 'm0'), 0)
+        self.assertEqual(self.store.get_conversation('c1')['read_up_to_id'], 'm2')
+
+    def test_attach_hydrates_every_conversation_without_per_conversation_reads(self):
+        self.store.upsert_conversation('c2', title='Empty')
+        self.store.upsert_conversation('c3', title='Read')
+        self.store.upsert_message('c3', 'n0', sender_id='bob', body='old', created_at=time.time() - 50)
+        self.store.upsert_message('c3', 'n1', sender_id='bob', body='new', created_at=time.time() - 40)
+        self.store.set_read_marker('c3', self.store.get_message('n0')['created_at'], 'n0')
+
+        self.service.detach_store()
+        with mock.patch.object(self.store, 'fetch_history', side_effect=AssertionError('per-conversation read')), \
+                mock.patch.object(self.store, 'list_unread', side_effect=AssertionError('per-conversation read')):
+            self.service.attach_store(self.store, sync_service=MessageSyncService(self.store))
+
+        summaries = {c['id']: c for c in self.service.get_conversations()}
+        self.assertEqual((summaries['c1']['last_message'], summaries['c1']['unread_count']), ('msg 4', 5))
+        self.assertEqual((summaries['c2']['last_message'], summaries['c2']['unread_count']), ('', 0))
+        self.assertEqual((summaries['c3']['last_message'], summaries['c3']['unread_count']), ('new', 1))
+
+    def test_get_message_falls_back_to_store(self):
+        self.service.get_conversation_messages('c1')
+        self.assertEqual(self.service.get_message('c1', 'm4')['text'], 'msg 4')
+        self.assertEqual(self.service.get_message('c1', 'm0')['text'], 'msg 0')
+        self.assertIsNone(self.service.get_message('other', 'm0'))
+
+    def test_fetch_page_reads_cursor_pages_without_growing_the_window(self):
+        self.service.get_conversation_messages('c1')
+        latest = self.service.fetch_page('c1')
+        self.assertEqual([m['id'] for m in latest], ['m2', 'm3', 'm4'])
+        older = self.service.fetch_page('c1', before='m2')
+        self.assertEqual([m['id'] for m in older], ['m0', 'm1'])
+        newer = self.service.fetch_page('c1', after='m0', limit=2)
+        self.assertEqual([m['id'] for m in newer], ['m1', 'm2'])
+        # Cached messages come back as the same dicts
+        self.assertIs(newer[1], self.service.get_message('c1', 'm2'))
+        self.assertEqual(len(self.service.get_conversation_messages('c1')), 3)
+        self.assertEqual(self.service.fetch_page('c1', before='missing'), [])
+
+    def test_page_reader_leaves_cached_state_to_the_main_thread(self):
+        self.service.get_conversation_messages('c1')
+        in_window = self.service.page_reader('c1', before='m2')
+        past_window = self.service.page_reader('c1', before='m1')
+        # The reads don't look at the conversations at all.
+        with mock.patch.object(self.service, '_conversations', {}):
+            records = in_window()
+            self.assertEqual([r['id'] for r in past_window()], ['m0'])
+        self.assertEqual([r['id'] for r in records], ['m0', 'm1'])
+
+        page = self.service.build_page('c1', self.service.page_reader('c1', after='m1', limit=1)())
+        self.assertIs(page[0], self.service.get_message('c1', 'm2'))
+
+    def test_writes_go_through_store_and_refresh_cache_from_events(self):
+        self.service.get_conversation_messages('c1')
+        received = []
+
+        def _on_received(instance, message):
+            received.append(message)
+
+        event_bus.bind(on_message_received=_on_received)
+        try:
+            self.assertTrue(self.service.send_message('c1', 'hello'))
+        finally:
+            event_bus.unbind(on_message_received=_on_received)
+
+        self.assertEqual(received[-1]['text'], 'hello')
+        self.assertEqual(received[-1]['conversation_id'], 'c1')
+        self.assertEqual(self.store.fetch_history('c1', limit=1)[0]['body'], 'hello')
+        self.assertEqual(self.service.get_conversation_messages('c1')[-1]['text'], 'hello')
+
+        self.assertTrue(self.service.pin_message('c1', 'm3'))
+        self.assertTrue(self.store.get_message('m3')['is_pinned'])
+        self.assertEqual(self.service._conversations['c1'].get_pinned_message().id, 'm3')
+
+        self.store.delete_message('m4')
+        self.assertNotIn('m4', [m['id'] for m in self.service.get_conversation_messages('c1')])
+
+    def test_cold_conversation_tracks_unread_and_preview(self):
+        # The seeded history has no read marker yet, so it starts unread.
+        self.assertEqual(self.service.mark_read_up_to('c1', 'm4'), 5)
+        now = time.time()
+        self.store.upsert_message('c1', 'n1', sender_id='alice', body='new one', created_at=now)
+        self.store.upsert_message('c1', 'n2', sender_id='alice', body='new two', created_at=now + 1)
+        summary = self.service.get_conversations()[0]
+        self.assertEqual((summary['unread_count'], summary['last_message']), (2, 'new two'))
+
+        self.store.update_message_status('n1', 'delivered')
+        self.assertEqual(self.service.get_conversations()[0]['unread_count'], 2)
+
+        self.store.delete_message('n2')
+        summary = self.service.get_conversations()[0]
+        self.assertEqual((summary['unread_count'], summary['last_message']), (1, 'new one'))
+
+        self.assertEqual(self.service.mark_read_up_to('c1', 'n1'), 1)
+        self.assertEqual(self.service.get_conversations()[0]['unread_count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -331,10 +331,13 @@ class TestPreferencesStore(unittest.TestCase):
         """Test that PreferencesStore follows singleton pattern."""
         # Get another reference to the same store
         from src.services.preferences_store import PreferencesStore
+        from src.services.registry import services
         store2 = PreferencesStore()
         
-        # Both should be the same instance
-        self.assertIs(preferences_store, store2)
+        # The module attribute is a lazy proxy for the same instance
+        self.assertIs(services.get('preferences_store'), store2)
+        self.assertIs(PreferencesStore(), store2)
+        self.assertEqual(preferences_store.theme_mode, store2.theme_mode)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,80 @@
+import unittest
+
+from src.services.send_scheduler import SendScheduler
+
+
+def _msg(mid, conversation_id, created_at=0.0):
+    return {'id': mid, 'conversation_id': conversation_id, 'created_at': created_at}
+
+
+class TestSendScheduler(unittest.TestCase):
+    def setUp(self):
+        self.handed = []
+        self.pending_done = {}
+        self.failed = []
+
+        def _send(msg, done):
+            self.handed.append(msg['id'])
+            self.pending_done[msg['id']] = done
+
+        self.scheduler = SendScheduler(
+            _send,
+            max_in_flight=3,
+            window=1,
+            base_retry_delay=0.0,
+            on_failed=lambda msg, delay, attempts: self.failed.append((msg['id'], attempts)),
+        )
+
+    def test_slow_conversation_does_not_block_others(self):
+        for i in range(3):
+            self.scheduler.enqueue(_msg(f'a{i}', 'slow'))
+        self.scheduler.enqueue(_msg('b0', 'fast'))
+        self.scheduler.enqueue(_msg('b1', 'fast'))
+
+        self.scheduler.pump()
+        self.assertEqual(self.handed, ['a0', 'b0'])
+
+        # Fast conversation keeps moving while 'slow' still waits on a0.
+        self.pending_done['b0'](True)
+        self.assertEqual(self.handed, ['a0', 'b0', 'b1'])
+
+        self.pending_done['a0'](True)
+        self.assertEqual(self.handed[-1], 'a1')
+
+    def test_global_cap_and_fifo_within_partition(self):
+        for conv in ('c1', 'c2', 'c3', 'c4'):
+            self.scheduler.enqueue(_msg(f'{conv}-0', conv))
+            self.scheduler.enqueue(_msg(f'{conv}-1', conv))
+
+        self.scheduler.pump()
+        self.assertEqual(self.scheduler.in_flight, 3)
+        self.assertEqual(self.handed, ['c1-0', 'c2-0', 'c3-0'])
+
+        self.pending_done['c1-0'](True)
+        self.assertEqual(self.handed[-1], 'c4-0')
+        self.assertEqual(self.scheduler.in_flight, 3)
+
+    def test_failed_send_is_retried_before_later_messages(self):
+        self.scheduler.enqueue(_msg('m0', 'c1'))
+        self.scheduler.enqueue(_msg('m1', 'c1'))
+        self.scheduler.pump()
+        self.pending_done.pop('m0')(False)
+
+        self.assertEqual(self.failed, [('m0', 1)])
+        self.assertEqual(self.handed, ['m0', 'm0'])
+
+    def test_stats_report_depth_and_age(self):
+        self.scheduler.enqueue(_msg('m0', 'c1', created_at=1.0))
+        self.scheduler.enqueue(_msg('m1', 'c1', created_at=2.0))
+        self.scheduler.pump()
+
+        stats = self.scheduler.stats()['c1']
+        self.assertEqual(stats['queued'], 1)
+        self.assertEqual(stats['in_flight'], 1)
+        self.assertGreater(stats['oldest_age'], 0.0)
+
+        self.assertFalse(self.scheduler.enqueue(_msg('m1', 'c1')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import time
+import unittest
+
+from kivy.clock import Clock
+
+from src.services.registry import ServiceProxy, ServiceRegistry
+
+
+class _Service:
+    def __init__(self, log, name, delay=0.0):
+        log.append(name)
+        self.name = name
+        self.value = 0
+        time.sleep(delay)
+
+    def ping(self):
+        return f'pong from {self.name}'
+
+
+class TestServiceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ServiceRegistry()
+        self.built = []
+
+    def _register(self, name, delay=0.0, depends=()):
+        return self.registry.register(name, lambda: _Service(self.built, name, delay), depends=depends)
+
+    def test_construction_waits_for_first_access(self):
+        proxy = self._register('store')
+        self.assertIsInstance(proxy, ServiceProxy)
+        self.assertEqual(self.built, [])
+        self.assertIn('pending', repr(proxy))
+
+        self.assertEqual(proxy.ping(), 'pong from store')
+        proxy.value = 3
+        self.assertEqual(self.registry.get('store').value, 3)
+        self.assertEqual(self.built, ['store'])
+
+    def test_proxy_stands_in_for_the_instance(self):
+        proxy = self._register('store')
+        instance = self.registry.get('store')
+        self.assertIsInstance(proxy, _Service)
+        self.assertTrue(proxy)
+        self.assertEqual(proxy, instance)
+        self.assertEqual(hash(proxy), hash(instance))
+        self.assertIn(proxy, {instance})
+
+        items = self.registry.register('items', lambda: ['a', 'b'])
+        self.assertEqual((len(items), list(items), 'a' in items), (2, ['a', 'b'], True))
+
+    def test_dependencies_are_built_first_and_excluded_from_self_time(self):
+        self._register('settings', delay=0.02)
+        manager = self._register('manager', depends=('settings',))
+        manager.ping()
+        self.assertEqual(self.built, ['settings', 'manager'])
+
+        report = {row['name']: row for row in self.registry.startup_report()}
+        self.assertEqual(report['settings']['trigger'], 'dependency of manager')
+        self.assertGreaterEqual(report['manager']['total_ms'], 20.0)
+        self.assertLess(report['manager']['self_ms'], report['manager']['total_ms'])
+
+    def test_cycles_and_duplicates_are_rejected(self):
+        self._register('a', depends=('b',))
+        self._register('b', depends=('a',))
+        with self.assertRaises(RuntimeError):
+            self.registry.get('a')
+        with self.assertRaises(ValueError):
+            self._register('a')
+
+    def test_warm_up_builds_one_service_per_frame(self):
+        for name in ('one', 'two', 'three'):
+            self._register(name)
+        self.registry.get('two')
+        self.registry.warm_up()
+        Clock.tick()
+        self.assertEqual(self.built, ['two', 'one'])
+        Clock.tick()
+        self.assertEqual(self.built, ['two', 'one', 'three'])
+        triggers = [row['trigger'] for row in self.registry.startup_report()]
+        self.assertEqual(triggers, ['access', 'warm-up', 'warm-up'])
+        self.assertIn('three', self.registry.format_startup_report())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from kivy.clock import Clock
+from kivy.uix.screenmanager import Screen
+
+from src.widgets.shell import NavigationItem, ResponsiveShell
+
+
+class TestDeferredScreens(unittest.TestCase):
+    def setUp(self):
+        self.built = []
+        self.shell = ResponsiveShell()
+        self.shell.prewarm_delay = 0
+
+    def _factory(self, screen_name):
+        def _build():
+            self.built.append(screen_name)
+            return Screen(name=screen_name)
+        return _build
+
+    def test_screens_are_built_on_first_navigation(self):
+        self.shell.add_nav_item(NavigationItem('home', 'Home', factory=self._factory('home')))
+        self.shell.add_nav_item(NavigationItem('obfuscation', 'Obfuscation', factory=self._factory('obfuscation_settings')))
+        self.assertEqual(self.built, ['home'])
+        self.assertEqual(self.shell.screen_manager.current, 'home')
+
+        self.shell.switch_screen('obfuscation')
+        self.shell.switch_screen('home')
+        self.shell.switch_screen('obfuscation')
+        self.assertEqual(self.built, ['home', 'obfuscation_settings'])
+        self.assertEqual(self.shell.screen_manager.current, 'obfuscation_settings')
+
+    def test_prewarm_builds_one_screen_per_idle_slot(self):
+        self.shell.add_nav_item(NavigationItem('home', 'Home', screen=Screen(name='home')))
+        self.shell.add_nav_item(NavigationItem('a', 'A', factory=self._factory('a'), prewarm=True))
+        self.shell.add_nav_item(NavigationItem('b', 'B', factory=self._factory('b'), prewarm=True))
+        self.shell.add_nav_item(NavigationItem('c', 'C', factory=self._factory('c')))
+        self.assertEqual(self.built, [])
+
+        Clock.tick()
+        self.assertEqual(self.built, ['a'])
+        Clock.tick()
+        Clock.tick()
+        self.assertEqual(self.built, ['a', 'b'])
+        self.assertTrue(self.shell.screen_manager.has_screen('b'))
+        self.assertFalse(self.shell.get_nav_item('c').is_built)
+
+    def test_item_requires_screen_or_factory(self):
+        with self.assertRaises(ValueError):
+            NavigationItem('x', 'X')
+
+
+if __name__ == '__main__':
+    unittest.main()
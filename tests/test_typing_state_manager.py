@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+from src.services.message_store import MessageStore
+from src.services.message_sync_service import MessageSyncService
+from src.services.typing_state_manager import TypingStateManager
+from src.utils.event_bus import event_bus
+
+
+class TestTypingStateManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = TypingStateManager(send_interval=3.0, local_idle_timeout=5.0, remote_ttl=6.0)
+        self.sent = []
+        self.manager.set_signal_sender(lambda cid, typing: self.sent.append((cid, typing)))
+
+        self.events = []
+        event_bus.bind(on_typing_state=self._on_typing_state)
+
+    def tearDown(self):
+        event_bus.unbind(on_typing_state=self._on_typing_state)
+
+    def _on_typing_state(self, instance, conversation_id, peer_id, is_typing):
+        self.events.append((conversation_id, peer_id, is_typing))
+
+    def test_local_typing_is_throttled_per_conversation(self):
+        for i in range(10):
+            self.manager.note_local_typing('c1', True, now=100.0 + i * 0.2)
+        self.manager.note_local_typing('c2', True, now=100.5)
+        self.assertEqual(self.sent, [('c1', True), ('c2', True)])
+
+        self.manager.note_local_typing('c1', True, now=103.5)
+        self.assertEqual(self.sent[-1], ('c1', True))
+        self.assertEqual(len(self.sent), 3)
+
+        self.manager.note_local_typing('c1', False, now=104.0)
+        self.manager.note_local_typing('c1', False, now=104.1)
+        self.assertEqual(self.sent[-1], ('c1', False))
+        self.assertEqual(len(self.sent), 4)
+
+    def test_idle_local_typing_sends_stop(self):
+        self.manager.note_local_typing('c1', True, now=100.0)
+        self.manager.tick(now=106.0)
+        self.assertEqual(self.sent, [('c1', True), ('c1', False)])
+
+    def test_remote_typing_emits_only_transitions_and_expires(self):
+        self.manager.apply_remote_typing('c1', 'bob', True, now=100.0)
+        self.manager.apply_remote_typing('c1', 'bob', True, now=102.0)
+        self.assertEqual(self.events, [('c1', 'bob', True)])
+        self.assertEqual(self.manager.typing_peers('c1'), ['bob'])
+
+        # Refreshed at 102, so still typing at 107.
+        self.manager.tick(now=107.0)
+        self.assertTrue(self.manager.is_peer_typing('c1', 'bob'))
+
+        self.manager.tick(now=108.5)
+        self.assertFalse(self.manager.is_peer_typing('c1', 'bob'))
+        self.assertEqual(self.events, [('c1', 'bob', True), ('c1', 'bob', False)])
+
+        self.manager.apply_remote_typing('c1', 'bob', False, now=109.0)
+        self.assertEqual(len(self.events), 2)
+
+
+class TestLocalTypingTransport(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = MessageStore(key='k1', db_path=os.path.join(tmp.name, 'messages.db'))
+        self.addCleanup(store.close)
+        self.signals = []
+        self.manager = TypingStateManager()
+        self.sync = MessageSyncService(
+            store,
+            typing_transport=lambda cid, typing: self.signals.append((cid, typing)),
+            typing_manager=self.manager,
+        )
+        self.sync.start()
+        self.addCleanup(self.sync.stop)
+        self.sync.set_online(True)
+
+    def test_composer_keystrokes_reach_the_transport_once_per_window(self):
+        for i in range(10):
+            self.manager.note_local_typing('c1', True, now=500.0 + i * 0.2)
+        self.assertEqual(self.signals, [('c1', True)])
+
+        self.manager.note_local_typing('c1', True, now=503.5)
+        self.manager.note_local_typing('c1', False, now=504.0)
+        self.assertEqual(self.signals, [('c1', True), ('c1', True), ('c1', False)])
+
+    def test_stopped_service_no_longer_sends(self):
+        self.sync.stop()
+        self.manager.note_local_typing('c2', True, now=600.0)
+        self.manager.note_local_typing('c2', False, now=600.1)
+        self.assertEqual(self.signals, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import gc
+import unittest
+import weakref
+
+from kivy.clock import Clock
+from kivy.uix.label import Label
+
+from src.theming.theme_manager import theme_manager
+from src.utils.event_bus import event_bus
+from src.utils.weak_binding import bind_weak, bind_weak_setter, live_subscriber_counts
+from src.widgets.contact_list import ContactList
+
+
+class _Listener:
+    def __init__(self):
+        self.seen = []
+
+    def on_color(self, instance, value):
+        self.seen.append(list(value))
+
+    def on_deleted(self, instance, contact_id):
+        self.seen.append(contact_id)
+
+
+class TestWeakBinding(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The first widget ever built opens the window and stays referenced
+        # from its start-up frames; build it outside the leak checks.
+        Label()
+
+    def tearDown(self):
+        theme_manager.theme_mode = 'light'
+
+    def test_binding_follows_owner_lifetime(self):
+        # Collect widgets left over from earlier tests so they do not drop out mid-count.
+        Clock.tick()
+        gc.collect()
+        before = live_subscriber_counts(theme_manager).get('text_color', 0)
+        listener = _Listener()
+        label = Label()
+        bind_weak(theme_manager, 'text_color', listener.on_color)
+        bind_weak_setter(theme_manager, 'text_color', label, 'color')
+        self.assertEqual(live_subscriber_counts(theme_manager)['text_color'], before + 2)
+
+        theme_manager.theme_mode = 'dark'
+        self.assertEqual(listener.seen, [list(theme_manager.text_color)])
+        self.assertEqual(list(label.color), list(theme_manager.text_color))
+
+        label_ref = weakref.ref(label)
+        del listener, label
+        Clock.tick()  # let the pending texture update release the label
+        gc.collect()
+        self.assertIsNone(label_ref())
+        self.assertEqual(live_subscriber_counts(theme_manager).get('text_color', 0), before)
+
+    def test_dispose_unbinds_early(self):
+        listener = _Listener()
+        sub = bind_weak(event_bus, 'on_contact_deleted', listener.on_deleted)
+        event_bus.emit_contact_deleted('c1')
+        sub.dispose()
+        sub.dispose()
+        event_bus.emit_contact_deleted('c2')
+        self.assertEqual(listener.seen, ['c1'])
+        self.assertFalse(sub.alive)
+
+    def test_discarded_lists_are_collected(self):
+        Clock.tick()
+        gc.collect()
+        before = live_subscriber_counts(theme_manager)
+        contact_list = ContactList({'id1': {'name': 'Alice'}})
+        self.assertNotEqual(live_subscriber_counts(theme_manager), before)
+        list_ref = weakref.ref(contact_list)
+        del contact_list
+        Clock.tick()
+        gc.collect()
+        self.assertIsNone(list_ref())
+        self.assertEqual(live_subscriber_counts(theme_manager), before)
+
+    def test_keyed_subscribers_are_weak(self):
+        listener = _Listener()
+        event_bus.subscribe('on_contact_deleted', listener.on_deleted, key='c1')
+        self.assertGreaterEqual(event_bus.subscriber_counts().get('on_contact_deleted', 0), 1)
+
+        event_bus.emit_contact_deleted('c1')
+        self.assertEqual(listener.seen, ['c1'])
+
+        before = event_bus.subscriber_counts().get('on_contact_deleted', 0)
+        del listener
+        gc.collect()
+        self.assertEqual(event_bus.subscriber_counts().get('on_contact_deleted', 0), before - 1)
+        event_bus.emit_contact_deleted('c1')
+        self.assertNotIn('on_contact_deleted', event_bus._keyed)
+
+
+if __name__ == '__main__':
+    unittest.main()